@@ -0,0 +1,34 @@
+"""exclude overlapping active bookings
+
+Revision ID: 20261015_3002
+Revises: 20251109_3001
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_3002"
+down_revision = "20251109_3001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # btree_gist: operador "=" para UUID dentro de um índice GiST
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        """
+        ALTER TABLE bookings
+        ADD CONSTRAINT ex_bookings_no_overlap EXCLUDE USING gist (
+            tenant_id WITH =,
+            resource_id WITH =,
+            tstzrange(start_time, end_time) WITH &&
+        ) WHERE (status IN ('pendente', 'confirmado'))
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ex_bookings_no_overlap", "bookings")
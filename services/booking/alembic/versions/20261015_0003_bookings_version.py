@@ -0,0 +1,27 @@
+"""booking version column for optimistic concurrency
+
+Revision ID: 20261015_3003
+Revises: 20261015_3002
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_3003"
+down_revision = "20261015_3002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "bookings",
+        sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("bookings", "version")
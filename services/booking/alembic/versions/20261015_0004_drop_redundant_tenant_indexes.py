@@ -0,0 +1,27 @@
+"""drop tenant_id indexes covered by composites or never queried
+
+Revision ID: 20261015_3004
+Revises: 20261015_3003
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_3004"
+down_revision = "20261015_3003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # prefixo (tenant_id, ...) de ix_bookings_resource_interval já atende filtros por tenant
+    op.drop_index("ix_bookings_tenant_id", table_name="bookings")
+    # booking_events só recebe INSERTs; nenhuma consulta filtra por tenant_id
+    op.drop_index("ix_booking_events_tenant_id", table_name="booking_events")
+
+
+def downgrade() -> None:
+    op.create_index("ix_booking_events_tenant_id", "booking_events", ["tenant_id"], unique=False)
+    op.create_index("ix_bookings_tenant_id", "bookings", ["tenant_id"], unique=False)
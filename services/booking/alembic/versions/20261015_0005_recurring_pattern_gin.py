@@ -0,0 +1,30 @@
+"""gin index on bookings.recurring_pattern
+
+Revision ID: 20261015_3005
+Revises: 20261015_3004
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_3005"
+down_revision = "20261015_3004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # jsonb_path_ops: metade do tamanho do jsonb_ops, suficiente para consultas com @>
+    op.create_index(
+        "ix_bookings_recurring_pattern_gin",
+        "bookings",
+        ["recurring_pattern"],
+        postgresql_using="gin",
+        postgresql_ops={"recurring_pattern": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_recurring_pattern_gin", table_name="bookings")
@@ -0,0 +1,30 @@
+"""brin index on booking_events.created_at
+
+Revision ID: 20261015_3006
+Revises: 20261015_3005
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_3006"
+down_revision = "20261015_3005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # booking_events é append-only: as linhas chegam em ordem de created_at
+    op.create_index(
+        "ix_booking_events_created_brin",
+        "booking_events",
+        ["created_at"],
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 32},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_events_created_brin", table_name="booking_events")
@@ -0,0 +1,30 @@
+"""partial index on active bookings
+
+Revision ID: 20261015_3007
+Revises: 20261015_3006
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_3007"
+down_revision = "20261015_3006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ix_bookings_resource_interval continua: atende a listagem por tenant em qualquer status
+    op.create_index(
+        "ix_bookings_active",
+        "bookings",
+        ["tenant_id", "resource_id", "start_time", "end_time"],
+        postgresql_where=sa.text("status IN ('pendente', 'confirmado')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bookings_active", table_name="bookings")
@@ -3,7 +3,9 @@
 import logging
 from typing import Dict, Any
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import cache
 from app.core.database import SessionLocal
 from app.models.booking import Booking, BookingStatus
 
@@ -25,34 +27,35 @@ async def handle_resource_deleted(event_type: str, payload: Dict[str, Any]) -> N
     if isinstance(resource_id, str):
         resource_id = UUID(resource_id)
     
-    db: Session = SessionLocal()
+    db: AsyncSession = SessionLocal()
     try:
-        # Buscar todas as reservas ativas (pendente/confirmado) do recurso
-        bookings = (
-            db.query(Booking)
-            .filter(Booking.resource_id == resource_id)
-            .filter(Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]))
-            .all()
+        # Um único UPDATE cancela todas as reservas ativas do recurso. O version
+        # é incrementado à mão: o versionamento do mapper só vale no flush
+        result = await db.execute(
+            update(Booking)
+            .where(Booking.resource_id == resource_id)
+            .where(Booking.status.in_(BookingStatus.ACTIVE))
+            .values(
+                status=BookingStatus.CANCELLED,
+                cancellation_reason=f"Recurso deletado (resource_id={resource_id})",
+                version=Booking.version + 1,
+            )
+            .execution_options(synchronize_session=False)
         )
         
-        if not bookings:
+        if not result.rowcount:
             logger.info(f"Nenhuma reserva ativa encontrada para resource_id={resource_id}")
             return
         
-        # Cancelar todas as reservas
-        for booking in bookings:
-            booking.status = BookingStatus.CANCELLED
-            booking.cancellation_reason = f"Recurso deletado (resource_id={resource_id})"
-        
-        db.commit()
-        logger.info(f"Canceladas {len(bookings)} reservas do resource_id={resource_id}")
+        await db.commit()
+        logger.info(f"Canceladas {result.rowcount} reservas do resource_id={resource_id}")
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Erro ao processar resource.deleted para resource_id={resource_id}: {e}")
         raise
     finally:
-        db.close()
+        await db.close()
 
 
 async def handle_user_deleted(event_type: str, payload: Dict[str, Any]) -> None:
@@ -70,34 +73,35 @@ async def handle_user_deleted(event_type: str, payload: Dict[str, Any]) -> None:
     if isinstance(user_id, str):
         user_id = UUID(user_id)
     
-    db: Session = SessionLocal()
+    db: AsyncSession = SessionLocal()
     try:
-        # Buscar todas as reservas ativas do usuário
-        bookings = (
-            db.query(Booking)
-            .filter(Booking.user_id == user_id)
-            .filter(Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]))
-            .all()
+        # Um único UPDATE cancela todas as reservas ativas do usuário. O version
+        # é incrementado à mão: o versionamento do mapper só vale no flush
+        result = await db.execute(
+            update(Booking)
+            .where(Booking.user_id == user_id)
+            .where(Booking.status.in_(BookingStatus.ACTIVE))
+            .values(
+                status=BookingStatus.CANCELLED,
+                cancellation_reason=f"Usuário deletado (user_id={user_id})",
+                version=Booking.version + 1,
+            )
+            .execution_options(synchronize_session=False)
         )
         
-        if not bookings:
+        if not result.rowcount:
             logger.info(f"Nenhuma reserva ativa encontrada para user_id={user_id}")
             return
         
-        # Cancelar todas as reservas
-        for booking in bookings:
-            booking.status = BookingStatus.CANCELLED
-            booking.cancellation_reason = f"Usuário deletado (user_id={user_id})"
-        
-        db.commit()
-        logger.info(f"Canceladas {len(bookings)} reservas do user_id={user_id}")
+        await db.commit()
+        logger.info(f"Canceladas {result.rowcount} reservas do user_id={user_id}")
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Erro ao processar user.deleted para user_id={user_id}: {e}")
         raise
     finally:
-        db.close()
+        await db.close()
 
 
 async def handle_tenant_deleted(event_type: str, payload: Dict[str, Any]) -> None:
@@ -114,26 +118,30 @@ async def handle_tenant_deleted(event_type: str, payload: Dict[str, Any]) -> Non
     # Converter string para UUID
     if isinstance(tenant_id, str):
         tenant_id = UUID(tenant_id)
+
+    # tenant removido deixa de ser válido para novas reservas neste worker
+    cache.tenant_cache.invalidate(str(tenant_id))
     
-    db: Session = SessionLocal()
+    db: AsyncSession = SessionLocal()
     try:
-        # Buscar TODAS as reservas do tenant (qualquer status)
-        bookings = db.query(Booking).filter(Booking.tenant_id == tenant_id).all()
+        # Um único DELETE para TODAS as reservas do tenant (qualquer status);
+        # booking_events cai junto pelo ON DELETE CASCADE
+        result = await db.execute(
+            delete(Booking)
+            .where(Booking.tenant_id == tenant_id)
+            .execution_options(synchronize_session=False)
+        )
         
-        if not bookings:
+        if not result.rowcount:
             logger.info(f"Nenhuma reserva encontrada para tenant_id={tenant_id}")
             return
         
-        # Deletar todas as reservas
-        for booking in bookings:
-            db.delete(booking)
-        
-        db.commit()
-        logger.info(f"Deletadas {len(bookings)} reservas do tenant_id={tenant_id}")
+        await db.commit()
+        logger.info(f"Deletadas {result.rowcount} reservas do tenant_id={tenant_id}")
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Erro ao processar tenant.deleted para tenant_id={tenant_id}: {e}")
         raise
     finally:
-        db.close()
+        await db.close()
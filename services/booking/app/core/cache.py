@@ -0,0 +1,6 @@
+from shared import TTLCache
+
+# Tenants validados recentemente (por processo): reservas em sequência do mesmo
+# tenant não repetem a chamada HTTP ao Tenant Service. tenant.deleted invalida.
+TENANT_CACHE_TTL = 60
+tenant_cache: TTLCache[dict] = TTLCache(maxsize=1024, ttl=TENANT_CACHE_TTL)
@@ -1,20 +1,42 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
-from shared import load_service_config
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from shared import database_pool_options, load_service_config
 
 _config = load_service_config("booking")
 
-engine = create_engine(
-    _config.database.url,
-    future=True,
-    pool_pre_ping=True,
+# A URL configurada continua síncrona (o Alembic usa psycopg2); o app troca
+# só o driver pelo equivalente assíncrono.
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str):
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    return parsed.set(drivername=driver) if driver else parsed
+
+
+engine = create_async_engine(
+    async_database_url(_config.database.url),
+    **database_pool_options(_config.database.url),
 )
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def begin_serializable(db: AsyncSession) -> None:
+    """Abre a próxima transação da sessão em SERIALIZABLE (só no Postgres).
+
+    Precisa ser chamada antes de qualquer consulta da transação; o nível volta
+    ao padrão (READ COMMITTED) quando a conexão retorna ao pool.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.connection(execution_options={"isolation_level": "SERIALIZABLE"})
+
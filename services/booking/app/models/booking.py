@@ -1,28 +1,69 @@
-import uuid
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, String, Text, JSON
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from enum import StrEnum, nonmember
+from sqlalchemy import DDL, Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, JSON, event, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, UUID, JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
+from shared import uuid7
 
 
-class BookingStatus:
+class BookingStatus(StrEnum):
     PENDING = "pendente"
     CONFIRMED = "confirmado"
     CANCELLED = "cancelado"
     COMPLETED = "concluido"
     NO_DATA = "sem_dados"
 
-    ALL = {PENDING, CONFIRMED, CANCELLED, COMPLETED, NO_DATA}
+    # nonmember: agrupamentos de valores, não status próprios
+    ALL = nonmember(frozenset({PENDING, CONFIRMED, CANCELLED, COMPLETED, NO_DATA}))
+    ACTIVE = nonmember((PENDING, CONFIRMED))
+
+
+# Nome da constraint que impede reservas ativas sobrepostas no mesmo recurso
+OVERLAP_CONSTRAINT = "ex_bookings_no_overlap"
+
+# Predicado das reservas ativas com os valores literais: é o mesmo texto do
+# WHERE dos índices parciais, para o planner conseguir casar consulta e índice
+# (com bind params ele não casa em planos genéricos)
+ACTIVE_STATUS_FILTER = f"status IN ('{BookingStatus.PENDING}', '{BookingStatus.CONFIRMED}')"
 
 
 class Booking(Base):
     __tablename__ = "bookings"
     __table_args__ = (
+        # Completo (todos os status): a listagem por tenant não filtra status
         Index("ix_bookings_resource_interval", "tenant_id", "resource_id", "start_time", "end_time"),
+        # Só no Postgres: o próprio INSERT/UPDATE rejeita sobreposição via índice GiST
+        ExcludeConstraint(
+            ("tenant_id", "="),
+            ("resource_id", "="),
+            (text("tstzrange(start_time, end_time)"), "&&"),
+            name=OVERLAP_CONSTRAINT,
+            using="gist",
+            where=text(ACTIVE_STATUS_FILTER),
+        ).ddl_if(dialect="postgresql"),
+        # Parcial: só reservas ativas, as únicas lidas na checagem de conflito;
+        # canceladas/concluídas (o histórico) ficam fora do índice
+        Index(
+            "ix_bookings_active",
+            "tenant_id",
+            "resource_id",
+            "start_time",
+            "end_time",
+            postgresql_where=text(ACTIVE_STATUS_FILTER),
+        ).ddl_if(dialect="postgresql"),
+        # jsonb_path_ops: índice menor, atende só consultas de contenção (@>)
+        Index(
+            "ix_bookings_recurring_pattern_gin",
+            "recurring_pattern",
+            postgresql_using="gin",
+            postgresql_ops={"recurring_pattern": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    # tenant_id sozinho é servido pelo prefixo de ix_bookings_resource_interval;
+    # resource_id mantém índice próprio (consumer de resource.deleted filtra só por ele)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
     resource_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     user_id = Column(UUID(as_uuid=True), nullable=False)
     client_id = Column(UUID(as_uuid=True), nullable=True)
@@ -42,13 +83,36 @@ class Booking(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Controle de concorrência otimista: todo UPDATE vira "... WHERE id = ? AND version = ?"
+    version = Column(Integer, nullable=False, server_default=text("1"))
+
+    __mapper_args__ = {"version_id_col": version}
+
 
 class BookingEvent(Base):
     __tablename__ = "booking_events"
+    __table_args__ = (
+        # Log só de INSERTs, já ordenado no disco por created_at: BRIN guarda
+        # min/max por faixa de páginas e fica ordens de grandeza menor que um btree
+        Index(
+            "ix_booking_events_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ).ddl_if(dialect="postgresql"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, index=True)
-    tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
     event_type = Column(String, nullable=False)
     payload = Column(JSONB().with_variant(JSON, "sqlite"), nullable=False, default=dict)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# btree_gist permite usar "=" em UUID dentro do índice GiST da constraint acima
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
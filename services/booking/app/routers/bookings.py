@@ -3,9 +3,12 @@ from zoneinfo import ZoneInfo
 from shared import ensure_timezone
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
 from app.core.auth_dependencies import get_current_token, TokenPayload, oauth2_scheme
 from app.services.tenant_validator import validar_tenant_existe
 from app.services.resource_validator import validar_recurso_existe
@@ -13,11 +16,13 @@ from app.services.user_validator import validar_usuario_existe
 from app.core.database import get_db
 from app.models.booking import BookingStatus
 from app.schemas.booking_schema import (
+    BOOKING_OUT_LIST,
     BookingCancelRequest,
     BookingConflict,
     BookingConflictResponse,
     BookingCreate,
     BookingOut,
+    BookingStaleResponse,
     BookingUpdate,
     BookingWithPolicy,
 )
@@ -48,11 +53,58 @@ def _parse_iso_datetime(value: Optional[str], field_name: str) -> Optional[datet
         raise HTTPException(400, f"{field_name} inválido") from exc
 
 
-@router.post("/", response_model=BookingOut, status_code=201)
+def _parse_if_match(value: Optional[str]) -> Optional[int]:
+    """Aceita If-Match como 3, "3" ou W/"3" (versão da reserva)."""
+    if value is None:
+        return None
+    try:
+        return int(value.strip().removeprefix("W/").strip('"'))
+    except ValueError as exc:
+        raise HTTPException(400, "If-Match inválido") from exc
+
+
+def _json_response(status_code: int, payload) -> Response:
+    # model_dump_json serializa direto no core (Rust) do Pydantic, sem dict +
+    # json.dumps intermediários; mesmo caminho das rotas com response_model
+    return Response(
+        status_code=status_code,
+        content=payload.model_dump_json(),
+        media_type="application/json",
+    )
+
+
+def _stale_response(booking) -> Response:
+    stale_payload = BookingStaleResponse(
+        success=False,
+        error="stale",
+        message="Reserva foi alterada por outra requisição; recarregue e tente novamente",
+        booking=BookingOut.model_validate(booking),
+    )
+    return _json_response(409, stale_payload)
+
+
+def _conflict_response(conflicts) -> Response:
+    conflict_payload = BookingConflictResponse(
+        success=False,
+        error="conflict",
+        message="Recurso já possui reserva neste intervalo",
+        conflicts=[
+            BookingConflict(
+                booking_id=b.id,
+                start_time=b.start_time,
+                end_time=b.end_time,
+            )
+            for b in conflicts
+        ],
+    )
+    return _json_response(409, conflict_payload)
+
+
+@router.post("/", response_model=BookingWithPolicy, status_code=201)
 async def create_booking(
     payload: BookingCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
     raw_token: str = Depends(oauth2_scheme),
 ):
@@ -81,7 +133,7 @@ async def create_booking(
         request.app.state,
         auth_token=raw_token,  # passa o token bruto (mesmo que hoje ele não seja usado no provider)
     )
-    settings = settings_provider(payload.tenant_id)
+    settings = await run_in_threadpool(settings_provider, payload.tenant_id)
 
     # descobre o fuso do tenant (ex.: America/Recife)
     zone = ensure_timezone(datetime.now(timezone.utc), settings.timezone).tzinfo
@@ -104,7 +156,8 @@ async def create_booking(
         await validar_tenant_existe(
             tenant_service,
             str(payload.tenant_id),
-            auth_token=raw_token, 
+            auth_token=raw_token,
+            cache=request.app.state.tenant_cache,
         )
 
         recurso_data = await validar_recurso_existe(
@@ -177,44 +230,40 @@ async def create_booking(
     start_utc = start_local.astimezone(timezone.utc)
     end_utc = end_local.astimezone(timezone.utc)
 
-    conflicts = crud.find_conflicts(
-        db,
-        payload.tenant_id,
-        payload.resource_id,
-        start_utc,
-        end_utc,
-    )
-
-    if conflicts:
-        conflict_payload = BookingConflictResponse(
-            success=False,
-            error="conflict",
-            message="Recurso já possui reserva neste intervalo",
-            conflicts=[
-                BookingConflict(
-                    booking_id=b.id,
-                    start_time=b.start_time,
-                    end_time=b.end_time,
-                )
-                for b in conflicts
-            ],
-        )
-        return JSONResponse(
-            status_code=409,
-            content=conflict_payload.model_dump(mode="json"),
+    # sem a constraint EXCLUDE (ex.: SQLite) o conflito é checado antes do INSERT
+    if not crud.has_overlap_constraint(db):
+        conflicts = await crud.find_conflicts(
+            db,
+            payload.tenant_id,
+            payload.resource_id,
+            start_utc,
+            end_utc,
         )
+        if conflicts:
+            return _conflict_response(conflicts)
 
     # salvar em UTC
     payload.start_time = start_utc
     payload.end_time = end_utc
 
     publisher = getattr(request.app.state, "event_publisher", None)
-    booking = crud.create_booking(db, payload, publisher=publisher)
-    return booking
+    try:
+        booking = await crud.create_booking(db, payload, publisher=publisher)
+    except IntegrityError as exc:
+        await db.rollback()
+        if not crud.is_overlap_violation(exc):
+            raise
+        return _conflict_response(
+            await crud.find_conflicts(db, payload.tenant_id, payload.resource_id, start_utc, end_utc)
+        )
+    return BookingWithPolicy(
+        **dict(BookingOut.model_validate(booking)),
+        can_cancel=can_cancel_booking(start_local, settings),
+    )
 
 
 @router.get("/", response_model=List[BookingWithPolicy])
-def list_bookings(
+async def list_bookings(
     request: Request,
     tenant_id: UUID = Query(...),
     resource_id: Optional[UUID] = Query(None),
@@ -222,7 +271,7 @@ def list_bookings(
     status_param: Optional[str] = Query(None, alias="status"),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
     raw_token: str = Depends(oauth2_scheme),
 ):
@@ -249,7 +298,7 @@ def list_bookings(
     if status_param and status_param not in BookingStatus.ALL:
         raise HTTPException(400, "Status inválido")
 
-    bookings = crud.list_bookings(
+    bookings = await crud.list_bookings(
         db=db,
         tenant_id=tenant_id,
         resource_id=resource_id,
@@ -266,16 +315,14 @@ def list_bookings(
         request.app.state,
         auth_token=raw_token,
     )
-    settings = settings_provider(tenant_id)
+    settings = await run_in_threadpool(settings_provider, tenant_id)
 
     tz = ZoneInfo(settings.timezone)
 
     enriched: list[BookingWithPolicy] = []
-    for item in bookings:
-        base_data = BookingOut.model_validate(item).model_dump(mode="python")
-
-        start_dt = base_data["start_time"]
-        end_dt = base_data["end_time"]
+    for item in BOOKING_OUT_LIST.validate_python(bookings, from_attributes=True):
+        start_dt = item.start_time
+        end_dt = item.end_time
 
         # 👉 Se vier sem tz, assumimos que está em UTC no banco
         if start_dt.tzinfo is None:
@@ -287,13 +334,14 @@ def list_bookings(
         local_start = start_dt.astimezone(tz).replace(tzinfo=None)
         local_end = end_dt.astimezone(tz).replace(tzinfo=None)
 
-        # Sobrescreve no dict que vai pro Pydantic
-        base_data["start_time"] = local_start
-        base_data["end_time"] = local_end
-
         enriched.append(
             BookingWithPolicy(
-                **base_data,
+                # dict() raso: evita o model_dump recursivo por item
+                **{
+                    **dict(item),
+                    "start_time": local_start,
+                    "end_time": local_end,
+                },
                 # can_cancel baseado no horário local
                 can_cancel=can_cancel_booking(local_start, settings),
             )
@@ -303,12 +351,12 @@ def list_bookings(
 
 
 @router.get("/{booking_id}", response_model=BookingOut)
-def get_booking(
+async def get_booking(
     booking_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
 ):
-    booking = crud.get_booking(db, booking_id)
+    booking = await crud.get_booking(db, booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Reserva não encontrada")
 
@@ -330,14 +378,17 @@ def get_booking(
 
 
 @router.put("/{booking_id}", response_model=BookingOut)
-def update_booking(
+async def update_booking(
     booking_id: UUID,
     payload: BookingUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
 ):
-    booking = crud.get_booking(db, booking_id)
+    expected_version = _parse_if_match(if_match)
+
+    booking = await crud.get_booking(db, booking_id)
     if not booking:
         raise HTTPException(404, "Reserva não encontrada")
 
@@ -353,6 +404,12 @@ def update_booking(
             detail="Você só pode alterar suas próprias reservas.",
         )
 
+    # cliente editou uma versão antiga: devolve o estado atual para ele refazer
+    if expected_version is not None and booking.version != expected_version:
+        return _stale_response(booking)
+    seen_version = booking.version
+    await crud.release_read(db, booking)
+
     raw_token = (
         request.headers.get("authorization", "")
         .removeprefix("Bearer ")
@@ -361,7 +418,7 @@ def update_booking(
     )
 
     settings_provider = resolve_settings_provider(request.app.state, auth_token=raw_token)
-    settings = settings_provider(booking.tenant_id)
+    settings = await run_in_threadpool(settings_provider, booking.tenant_id)
     zone = ensure_timezone(datetime.now(timezone.utc), settings.timezone).tzinfo
 
     new_start = payload.start_time or booking.start_time
@@ -383,36 +440,59 @@ def update_booking(
     new_start_utc = new_start_local.astimezone(timezone.utc)
     new_end_utc = new_end_local.astimezone(timezone.utc)
 
-    conflicts = crud.find_conflicts(
-        db,
-        booking.tenant_id,
-        payload.resource_id or booking.resource_id,
-        new_start_utc,
-        new_end_utc,
-        ignore_booking_id=booking_id,
-    )
-
-    if conflicts:
-        conflict_payload = BookingConflictResponse(
-            success=False,
-            error="conflict",
-            message="Recurso já possui reserva neste intervalo",
-            conflicts=[
-                BookingConflict(
-                    booking_id=i.id,
-                    start_time=i.start_time,
-                    end_time=i.end_time,
-                )
-                for i in conflicts
-            ],
+    resource_id = payload.resource_id or booking.resource_id
+    tenant_id = booking.tenant_id
+
+    if not crud.has_overlap_constraint(db):
+        conflicts = await crud.find_conflicts(
+            db,
+            tenant_id,
+            resource_id,
+            new_start_utc,
+            new_end_utc,
+            ignore_booking_id=booking_id,
         )
-        return JSONResponse(409, conflict_payload.model_dump(mode="json"))
+        if conflicts:
+            return _conflict_response(conflicts)
 
     payload.start_time = new_start_utc
     payload.end_time = new_end_utc
 
     publisher = getattr(request.app.state, "event_publisher", None)
-    updated = crud.update_booking(db, booking_id, payload, publisher=publisher)
+    try:
+        updated = await crud.update_booking(
+            db, booking_id, payload, publisher=publisher, expected_version=seen_version
+        )
+    except StaleDataError:
+        # outra requisição gravou entre a leitura e o UPDATE (version mudou)
+        await db.rollback()
+        current = await crud.get_booking(db, booking_id)
+        if not current:
+            raise HTTPException(404, "Reserva não encontrada")
+        return _stale_response(current)
+    except IntegrityError as exc:
+        await db.rollback()
+        if not crud.is_overlap_violation(exc):
+            raise
+        return _conflict_response(
+            await crud.find_conflicts(
+                db,
+                tenant_id,
+                resource_id,
+                new_start_utc,
+                new_end_utc,
+                ignore_booking_id=booking_id,
+            )
+        )
+    except DBAPIError as exc:
+        # SERIALIZABLE abortou por escrita concorrente: mesmo caso do version
+        await db.rollback()
+        if not crud.is_serialization_failure(exc):
+            raise
+        current = await crud.get_booking(db, booking_id)
+        if not current:
+            raise HTTPException(404, "Reserva não encontrada")
+        return _stale_response(current)
 
     return updated
 
@@ -422,14 +502,14 @@ def update_booking(
 # but /cancel provides clearer intent than a generic PATCH with a status field.
 # Alternative approaches could be: DELETE (for true deletion) or PATCH /{booking_id} with status in body.
 @router.patch("/{booking_id}/cancel", response_model=BookingOut)
-def cancel_booking(
+async def cancel_booking(
     booking_id: UUID,
     cancel_payload: BookingCancelRequest,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
 ):
-    booking = crud.get_booking(db, booking_id)
+    booking = await crud.get_booking(db, booking_id)
     if not booking:
         raise HTTPException(404, "Reserva não encontrada")
 
@@ -444,6 +524,8 @@ def cancel_booking(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você só pode cancelar suas próprias reservas.",
         )
+    seen_version = booking.version
+    await crud.release_read(db, booking)
 
     raw_token = (
         request.headers.get("authorization", "")
@@ -453,35 +535,48 @@ def cancel_booking(
     )
 
     settings_provider = resolve_settings_provider(request.app.state, auth_token=raw_token)
-    settings = settings_provider(booking.tenant_id)
+    settings = await run_in_threadpool(settings_provider, booking.tenant_id)
     validate_cancellation_window(booking.start_time, settings)
     
     publisher = getattr(request.app.state, "event_publisher", None)
 
     # Cancel the booking using crud function
-    booking = crud.cancel_booking(
-        db=db,
-        booking=booking,
-        reason=cancel_payload.reason,
-        cancelled_by=current_token.sub,
-        publisher=publisher,
-    )
-
-    return booking
+    try:
+        cancelled = await crud.cancel_booking(
+            db=db,
+            booking_id=booking_id,
+            reason=cancel_payload.reason,
+            cancelled_by=current_token.sub,
+            publisher=publisher,
+            expected_version=seen_version,
+        )
+    except (DBAPIError, StaleDataError) as exc:
+        # escrita concorrente: SERIALIZABLE abortou ou a versão mudou desde a leitura
+        await db.rollback()
+        if isinstance(exc, DBAPIError) and not crud.is_serialization_failure(exc):
+            raise
+        current = await crud.get_booking(db, booking_id)
+        if not current:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Reserva não encontrada")
+        return _stale_response(current)
+
+    if not cancelled:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Reserva não encontrada")
+    return cancelled
 
 
 @router.patch("/{booking_id}/status", response_model=BookingOut)
-def update_status(
+async def update_status(
     booking_id: UUID,
     request: Request,
     status_param: str = Query(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
 ):
     if status_param not in BookingStatus.ALL:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Status inválido")
 
-    booking = crud.get_booking(db, booking_id)
+    booking = await crud.get_booking(db, booking_id)
     if not booking:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Reserva não encontrada")
 
@@ -497,8 +592,33 @@ def update_status(
             detail="Você só pode alterar o status das suas próprias reservas.",
         )
 
+    # o rollback expira a instância: guarda o intervalo antes
+    interval = (booking.tenant_id, booking.resource_id, booking.start_time, booking.end_time)
+    seen_version = booking.version
+    await crud.release_read(db, booking)
+
     publisher = getattr(request.app.state, "event_publisher", None)
-    updated = crud.update_booking_status(db, booking_id, status_param, publisher=publisher)
+    try:
+        updated = await crud.update_booking_status(
+            db, booking_id, status_param, publisher=publisher, expected_version=seen_version
+        )
+    except IntegrityError as exc:
+        # reativar uma reserva cancelada pode colidir com outra já ativa
+        await db.rollback()
+        if not crud.is_overlap_violation(exc):
+            raise
+        return _conflict_response(
+            await crud.find_conflicts(db, *interval, ignore_booking_id=booking_id)
+        )
+    except (DBAPIError, StaleDataError) as exc:
+        # escrita concorrente: SERIALIZABLE abortou ou a versão mudou desde a leitura
+        await db.rollback()
+        if isinstance(exc, DBAPIError) and not crud.is_serialization_failure(exc):
+            raise
+        current = await crud.get_booking(db, booking_id)
+        if not current:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Reserva não encontrada")
+        return _stale_response(current)
     if not updated:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Reserva não encontrada")
 
@@ -1,78 +1,142 @@
+import asyncio
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
-from app.models.booking import Booking, BookingEvent, BookingStatus
+from sqlalchemy import Row, and_, func, literal, or_, select, text
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+from app.core.database import begin_serializable
+from app.models.booking import ACTIVE_STATUS_FILTER, OVERLAP_CONSTRAINT, Booking, BookingEvent, BookingStatus
 from app.schemas.booking_schema import BookingCreate, BookingUpdate
 from shared import EventPublisher
 
+# Tentativas (com backoff exponencial) quando o Postgres aborta uma transação
+# SERIALIZABLE por conflito com outra concorrente (SQLSTATE 40001)
+SERIALIZATION_ATTEMPTS = 3
+SERIALIZATION_BACKOFF_SECONDS = 0.05
+
+
+# Basta para montar a resposta 409; não precisa trazer todas as sobreposições
+MAX_CONFLICTS = 10
+
 
 def _conflict_query(
-    db: Session,
     tenant_id: UUID,
     resource_id: UUID,
     start_time: datetime,
     end_time: datetime,
     ignore_booking_id: Optional[UUID] = None,
+    *,
+    use_ranges: bool = False,
 ):
     query = (
-        db.query(Booking)
-        .filter(Booking.tenant_id == tenant_id)
-        .filter(Booking.resource_id == resource_id)
-        .filter(Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]))
-        .filter(Booking.end_time > start_time)
-        .filter(Booking.start_time < end_time)
+        select(Booking.id, Booking.start_time, Booking.end_time)
+        .where(Booking.tenant_id == tenant_id)
+        .where(Booking.resource_id == resource_id)
+        .where(text(ACTIVE_STATUS_FILTER))  # casa com ix_bookings_active
     )
+    if use_ranges:
+        # Mesmo predicado do ex_bookings_no_overlap: o Postgres resolve a
+        # sobreposição no índice GiST da constraint
+        query = query.where(
+            func.tstzrange(Booking.start_time, Booking.end_time).op("&&")(
+                func.tstzrange(
+                    literal(start_time, Booking.start_time.type),
+                    literal(end_time, Booking.end_time.type),
+                )
+            )
+        )
+    else:
+        query = query.where(Booking.end_time > start_time).where(Booking.start_time < end_time)
     if ignore_booking_id:
-        query = query.filter(Booking.id != ignore_booking_id)
-    return query
+        query = query.where(Booking.id != ignore_booking_id)
+    return query.order_by(Booking.start_time).limit(MAX_CONFLICTS)
 
 
-def find_conflicts(
-    db: Session,
+async def find_conflicts(
+    db: AsyncSession,
     tenant_id: UUID,
     resource_id: UUID,
     start_time: datetime,
     end_time: datetime,
     ignore_booking_id: Optional[UUID] = None,
-) -> List[Booking]:
-    return _conflict_query(db, tenant_id, resource_id, start_time, end_time, ignore_booking_id).all()
+) -> List[Row]:
+    """(id, start_time, end_time) das reservas ativas que se sobrepõem ao intervalo."""
+    query = _conflict_query(
+        tenant_id,
+        resource_id,
+        start_time,
+        end_time,
+        ignore_booking_id,
+        use_ranges=has_overlap_constraint(db),
+    )
+    return list(await db.execute(query))
+
+
+def has_overlap_constraint(db: AsyncSession) -> bool:
+    """No Postgres a constraint EXCLUDE barra sobreposições direto no banco."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def release_read(db: AsyncSession, *instances) -> None:
+    """Encerra a transação de leitura da rota, mantendo as instâncias já carregadas.
+
+    A conexão volta ao pool antes das chamadas HTTP da rota; a escrita abre
+    depois a própria transação SERIALIZABLE e relê a reserva nela.
+    """
+    for instance in instances:
+        db.expunge(instance)
+    await db.rollback()
+
 
+def _check_version(booking: Booking, expected_version: Optional[int]) -> None:
+    # a rota validou outra versão: alguém gravou entre a leitura dela e a escrita
+    if expected_version is not None and booking.version != expected_version:
+        raise StaleDataError(f"Booking {booking.id} changed since version {expected_version}")
 
-def _publish_event(
+
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    return OVERLAP_CONSTRAINT in str(exc.orig)
+
+
+def is_serialization_failure(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "pgcode", None) == "40001"
+
+
+def _publish_events(
     publisher: Optional[EventPublisher],
-    event_type: str,
-    payload: dict,
-    *,
-    tenant_id: UUID,
+    events: List[Tuple[str, dict, dict]],
 ) -> None:
-    if not publisher:
+    if not publisher or not events:
         return
-    publisher.publish(
-        event_type,
-        payload,
-        metadata={"tenant_id": str(tenant_id)},
-    )
+    # enqueue não faz I/O: o XADD sai na thread de flush do publisher, sem
+    # bloquear o event loop (o lifespan envia o que restar no shutdown)
+    for event_type, payload, metadata in events:
+        publisher.enqueue(event_type, payload, metadata=metadata)
 
 
-def _create_and_publish_event(
-    db: Session,
+def _create_event(
+    db: AsyncSession,
     booking: Booking,
     event_type: str,
     payload: dict,
-    publisher: Optional[EventPublisher] = None,
-) -> None:
+) -> Tuple[str, dict, dict]:
     """
-    Helper function to create a database event record and publish an external event.
+    Helper function to create a database event record and build the matching external event.
     This reduces code duplication across booking operations.
+
+    The external event is only published (via _publish_events) after the commit,
+    so a failed transaction never leaks an event to other services.
     
     Args:
         db: Database session
         booking: The booking instance for which the event is being created
         event_type: The type of event (e.g., "booking.deleted", "booking.cancelled")
         payload: The event payload dictionary
-        publisher: Optional event publisher for external events
+
+    Returns:
+        (event_type, payload, metadata) tuple ready for EventPublisher.enqueue
     """
     # Create database event record
     event = BookingEvent(
@@ -82,21 +146,36 @@ def _create_and_publish_event(
         payload=payload,
     )
     db.add(event)
-    
-    # Publish external event
-    _publish_event(
-        publisher,
-        event_type,
-        payload,
-        tenant_id=booking.tenant_id,
-    )
+
+    return event_type, payload, {"tenant_id": str(booking.tenant_id)}
 
 
-def create_booking(
-    db: Session,
+async def create_booking(
+    db: AsyncSession,
     payload: BookingCreate,
     publisher: Optional[EventPublisher] = None,
 ) -> Booking:
+    # SERIALIZABLE só a partir daqui: as validações HTTP da rota não seguram conexão
+    await begin_serializable(db)
+    for attempt in range(SERIALIZATION_ATTEMPTS):
+        try:
+            booking, event = await _insert_booking(db, payload)
+            await db.commit()
+            break
+        except DBAPIError as exc:
+            if not is_serialization_failure(exc) or attempt == SERIALIZATION_ATTEMPTS - 1:
+                raise
+            await db.rollback()
+            await begin_serializable(db)
+            await asyncio.sleep(SERIALIZATION_BACKOFF_SECONDS * 2**attempt)
+
+    await db.refresh(booking)
+    _publish_events(publisher, [event])
+
+    return booking
+
+
+async def _insert_booking(db: AsyncSession, payload: BookingCreate) -> Tuple[Booking, Tuple[str, dict, dict]]:
     booking = Booking(
         tenant_id=payload.tenant_id,
         resource_id=payload.resource_id,
@@ -110,10 +189,10 @@ def create_booking(
         recurring_pattern=payload.recurring_pattern.model_dump() if payload.recurring_pattern else None,
     )
     db.add(booking)
-    db.flush()
+    await db.flush()
 
     # Create event payload
-    payload = {
+    event_payload = {
         "booking_id": str(booking.id),
         "resource_id": str(booking.resource_id),
         "user_id": str(booking.user_id),
@@ -122,23 +201,12 @@ def create_booking(
         "end_time": booking.end_time.isoformat(),
     }
     
-    # Create database event and publish external event
-    _create_and_publish_event(
-        db,
-        booking,
-        "booking.created",
-        payload,
-        publisher,
-    )
-    
-    db.commit()
-    db.refresh(booking)
-
-    return booking
+    # Create database event; the external one is published after the commit
+    return booking, _create_event(db, booking, "booking.created", event_payload)
 
 
-def list_bookings(
-    db: Session,
+async def list_bookings(
+    db: AsyncSession,
     tenant_id: UUID,
     resource_id: Optional[UUID] = None,
     user_id: Optional[UUID] = None,
@@ -146,36 +214,39 @@ def list_bookings(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
 ):
-    query = db.query(Booking).filter(Booking.tenant_id == tenant_id)
+    query = select(Booking).where(Booking.tenant_id == tenant_id)
     if resource_id:
-        query = query.filter(Booking.resource_id == resource_id)
+        query = query.where(Booking.resource_id == resource_id)
     if user_id:
-        query = query.filter(Booking.user_id == user_id)
+        query = query.where(Booking.user_id == user_id)
     if status:
-        query = query.filter(Booking.status == status)
+        query = query.where(Booking.status == status)
     if start_date and end_date:
-        query = query.filter(
+        query = query.where(
             or_(
                 and_(Booking.start_time >= start_date, Booking.start_time < end_date),
                 and_(Booking.end_time > start_date, Booking.end_time <= end_date),
             )
         )
-    return query.order_by(Booking.start_time.asc()).all()
+    return list(await db.scalars(query.order_by(Booking.start_time.asc())))
 
 
-def get_booking(db: Session, booking_id: UUID) -> Optional[Booking]:
-    return db.query(Booking).filter(Booking.id == booking_id).first()
+async def get_booking(db: AsyncSession, booking_id: UUID) -> Optional[Booking]:
+    return await db.get(Booking, booking_id)
 
 
-def update_booking(
-    db: Session,
+async def update_booking(
+    db: AsyncSession,
     booking_id: UUID,
     payload: BookingUpdate,
     publisher: Optional[EventPublisher] = None,
+    expected_version: Optional[int] = None,
 ) -> Optional[Booking]:
-    booking = get_booking(db, booking_id)
+    await begin_serializable(db)
+    booking = await get_booking(db, booking_id)
     if not booking:
         return None
+    _check_version(booking, expected_version)
 
     update_data = payload.model_dump(exclude_unset=True)
 
@@ -193,30 +264,28 @@ def update_booking(
         "changed_fields": list(update_data.keys()),
     }
     
-    # Create database event and publish external event
-    _create_and_publish_event(
-        db,
-        booking,
-        "booking.updated",
-        payload,
-        publisher,
-    )
+    # Create database event; the external one is published after the commit
+    event = _create_event(db, booking, "booking.updated", payload)
 
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
+    _publish_events(publisher, [event])
 
     return booking
 
 
-def delete_booking(
-    db: Session,
+async def delete_booking(
+    db: AsyncSession,
     booking_id: UUID,
     deleted_by: UUID,
     publisher: Optional[EventPublisher] = None,
+    expected_version: Optional[int] = None,
 ):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    await begin_serializable(db)
+    booking = await get_booking(db, booking_id)
     if not booking:
         return False
+    _check_version(booking, expected_version)
 
     # Create event payload
     payload = {
@@ -228,30 +297,28 @@ def delete_booking(
         "end_time": booking.end_time.isoformat(),
     }
     
-    # Create database event and publish external event
-    _create_and_publish_event(
-        db,
-        booking,
-        "booking.deleted",
-        payload,
-        publisher,
-    )
+    # Create database event; the external one is published after the commit
+    event = _create_event(db, booking, "booking.deleted", payload)
 
-    db.delete(booking)
-    db.commit()
+    await db.delete(booking)
+    await db.commit()
+    _publish_events(publisher, [event])
 
     return True
 
 
-def update_booking_status(
-    db: Session,
+async def update_booking_status(
+    db: AsyncSession,
     booking_id: UUID,
     status: str,
     publisher: Optional[EventPublisher] = None,
+    expected_version: Optional[int] = None,
 ) -> Optional[Booking]:
-    booking = get_booking(db, booking_id)
+    await begin_serializable(db)
+    booking = await get_booking(db, booking_id)
     if not booking:
         return None
+    _check_version(booking, expected_version)
 
     booking.status = status
 
@@ -263,44 +330,49 @@ def update_booking_status(
         "status": status,
     }
     
-    # Create database event and publish external event
-    _create_and_publish_event(
-        db,
-        booking,
-        "booking.status_changed",
-        payload,
-        publisher,
-    )
+    # Create database event; the external one is published after the commit
+    event = _create_event(db, booking, "booking.status_changed", payload)
 
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
+    _publish_events(publisher, [event])
 
     return booking
 
 
-def cancel_booking(
-    db: Session,
-    booking: Booking,
+async def cancel_booking(
+    db: AsyncSession,
+    booking_id: UUID,
     reason: str,
     cancelled_by: UUID,
     publisher: Optional[EventPublisher] = None,
-) -> Booking:
+    expected_version: Optional[int] = None,
+) -> Optional[Booking]:
     """
     Cancels a booking and creates appropriate event records in the database and via the event publisher.
 
     Args:
-        db (Session): The SQLAlchemy database session to use for committing changes.
-        booking (Booking): The booking instance to be cancelled.
+        db (AsyncSession): The SQLAlchemy database session to use for committing changes.
+        booking_id (UUID): The id of the booking to be cancelled; it is re-read inside the write.
         reason (str): The reason for cancelling the booking.
         cancelled_by (UUID): The UUID of the user or system cancelling the booking.
         publisher (Optional[EventPublisher]): Optional event publisher for publishing external events.
+        expected_version (Optional[int]): Version the caller validated; a different one is stale.
 
     Returns:
-        Booking: The updated booking instance with cancellation details.
+        Optional[Booking]: The updated booking instance with cancellation details,
+        or None if the booking no longer exists.
 
     Raises:
+        sqlalchemy.orm.exc.StaleDataError: If the booking changed since ``expected_version``.
         sqlalchemy.exc.SQLAlchemyError: If a database error occurs during commit.
     """
+    await begin_serializable(db)
+    booking = await get_booking(db, booking_id)
+    if not booking:
+        return None
+    _check_version(booking, expected_version)
+
     # Update booking with cancellation details
     booking.status = BookingStatus.CANCELLED
     booking.cancellation_reason = reason
@@ -316,16 +388,11 @@ def cancel_booking(
         "reason": reason,
     }
     
-    # Create database event and publish external event
-    _create_and_publish_event(
-        db,
-        booking,
-        "booking.cancelled",
-        payload,
-        publisher,
-    )
+    # Create database event; the external one is published after the commit
+    event = _create_event(db, booking, "booking.cancelled", payload)
     
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
+    _publish_events(publisher, [event])
     
     return booking
\ No newline at end of file
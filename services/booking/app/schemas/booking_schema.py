@@ -1,13 +1,13 @@
-from datetime import datetime
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, Literal, Optional
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 from app.models.booking import BookingStatus
 
 
 class RecurringPattern(BaseModel):
     """Padrão de recorrência para reservas repetitivas."""
-    frequency: str = Field(pattern="^(daily|weekly|monthly)$", description="Frequência da recorrência: daily, weekly ou monthly", examples=["weekly"])
+    frequency: Literal["daily", "weekly", "monthly"] = Field(description="Frequência da recorrência: daily, weekly ou monthly", examples=["weekly"])
     interval: int = Field(ge=1, le=52, default=1, description="Intervalo entre ocorrências (ex: a cada 2 semanas)", examples=[1])
     end_date: Optional[datetime] = Field(default=None, description="Data final da recorrência", examples=["2025-12-31T23:59:59Z"])
     days_of_week: Optional[list[int]] = Field(default=None, description="Dias da semana para recorrência semanal (0=Segunda, 6=Domingo)", examples=[[0, 2, 4]])
@@ -39,7 +39,6 @@ class BookingBase(BaseModel):
     def ensure_timezone_aware(cls, value: datetime) -> datetime:
         """Garante que datetime sempre tem timezone. Se não tiver, assume UTC."""
         if value.tzinfo is None:
-            from datetime import timezone
             value = value.replace(tzinfo=timezone.utc)
         return value
 
@@ -54,14 +53,7 @@ class BookingBase(BaseModel):
 
 class BookingCreate(BookingBase):
     """Schema para criação de nova reserva. Valida regras de antecedência, horário comercial e conflitos."""
-    status: Optional[str] = Field(default=BookingStatus.CONFIRMED, description="Status inicial da reserva (pendente, confirmado, cancelado)")
-
-    @field_validator("status")
-    @classmethod
-    def validar_status(cls, value):
-        if value not in BookingStatus.ALL:
-            raise ValueError("Status inválido")
-        return value
+    status: Optional[BookingStatus] = Field(default=BookingStatus.CONFIRMED, description="Status inicial da reserva (pendente, confirmado, cancelado)")
 
 
 class BookingUpdate(BaseModel):
@@ -71,17 +63,10 @@ class BookingUpdate(BaseModel):
     start_time: Optional[datetime] = Field(default=None, description="Nova data/hora de início")
     end_time: Optional[datetime] = Field(default=None, description="Nova data/hora de término")
     notes: Optional[str] = Field(default=None, description="Atualizar observações")
-    status: Optional[str] = Field(default=None, description="Atualizar status da reserva")
+    status: Optional[BookingStatus] = Field(default=None, description="Atualizar status da reserva")
     recurring_enabled: Optional[bool] = Field(default=None, description="Habilitar/desabilitar recorrência")
     recurring_pattern: Optional[RecurringPattern] = Field(default=None, description="Atualizar padrão de recorrência")
 
-    @field_validator("status")
-    @classmethod
-    def validar_status(cls, value):
-        if value and value not in BookingStatus.ALL:
-            raise ValueError("Status inválido")
-        return value
-
     @field_validator("end_time")
     @classmethod
     def validar_intervalo(cls, end_time, info):
@@ -110,8 +95,13 @@ class BookingOut(BaseModel):
     cancelled_by: Optional[UUID] = Field(description="ID do usuário que cancelou")
     created_at: datetime = Field(description="Data/hora de criação do registro")
     updated_at: datetime = Field(description="Data/hora da última atualização")
+    version: int = Field(description="Versão da reserva; envie no header If-Match ao atualizar")
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
 
-    model_config = ConfigDict(from_attributes=True)
+# Validador da lista montado uma vez no import e reutilizado em toda listagem
+BOOKING_OUT_LIST = TypeAdapter(list[BookingOut])
 
 
 class BookingCancelRequest(BaseModel):
@@ -134,6 +124,14 @@ class BookingConflictResponse(BaseModel):
     conflicts: list[BookingConflict] = Field(description="Lista de reservas conflitantes")
 
 
+class BookingStaleResponse(BaseModel):
+    """Resposta de erro quando a reserva foi alterada por outra requisição (HTTP 409)."""
+    success: bool = Field(description="Sempre false para versões desatualizadas")
+    error: str = Field(description="Tipo do erro: 'stale'")
+    message: str = Field(description="Mensagem descritiva do erro")
+    booking: BookingOut = Field(description="Estado atual da reserva no servidor")
+
+
 class BookingWithPolicy(BookingOut):
     """BookingOut estendido com informações de política de cancelamento."""
     can_cancel: bool = Field(description="Se a reserva pode ser cancelada baseado na janela de cancelamento do tenant")
\ No newline at end of file
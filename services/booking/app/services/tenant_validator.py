@@ -1,33 +1,47 @@
 # services/booking/app/services/tenant_validator.py
+from typing import Optional
+
 import httpx
 from fastapi import HTTPException
+from shared import PooledAsyncClient, TTLCache
+
+# Conexões keep-alive com o Tenant Service reaproveitadas entre as validações
+TENANT_CLIENT = PooledAsyncClient(timeout=3.0, limits=httpx.Limits(max_keepalive_connections=10))
+
 
 async def validar_tenant_existe(
     tenant_service_url: str,
     tenant_id: str,
     auth_token: str | None = None,
+    cache: Optional[TTLCache] = None,
 ):
     """
     Valida existência do tenant via Tenant Service.
     Em ambiente de teste (sem URL), retorna mock.
+    Com ``cache``, tenants já confirmados não geram nova chamada até o TTL expirar
+    (só respostas 200 são guardadas).
     """
     if not tenant_service_url:
         return {"id": tenant_id}
 
+    if cache is not None:
+        cached = cache.get(tenant_id)
+        if cached is not None:
+            return cached
+
     url = f"{tenant_service_url.rstrip('/')}/tenants/{tenant_id}"
 
     headers = {}
     if auth_token:
         headers["Authorization"] = f"Bearer {auth_token}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url, headers=headers)
-        except httpx.RequestError:
-            raise HTTPException(
-                status_code=500,
-                detail="Erro ao comunicar com o Tenant Service",
-            )
+    try:
+        resp = await TENANT_CLIENT.get().get(url, headers=headers)
+    except httpx.RequestError:
+        raise HTTPException(
+            status_code=500,
+            detail="Erro ao comunicar com o Tenant Service",
+        )
 
     if resp.status_code == 404:
         raise HTTPException(404, "Tenant não encontrado")
@@ -38,4 +52,7 @@ async def validar_tenant_existe(
             f"Erro ao comunicar com o Tenant Service (status={resp.status_code})",
         )
 
-    return resp.json()
+    tenant = resp.json()
+    if cache is not None:
+        cache.set(tenant_id, tenant)
+    return tenant
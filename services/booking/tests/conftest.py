@@ -1,8 +1,12 @@
 import os
 import sys
 from pathlib import Path
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+import respx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
 from datetime import time, datetime, timedelta, timezone
 from jose import jwt
 
@@ -44,38 +48,127 @@ for module_name in list(sys.modules):
 os.environ.setdefault("SECRET_KEY", SECRET_KEY)
 os.environ.setdefault("JWT_ALGORITHM", ALGORITHM)
 
-os.environ.setdefault("BOOKING_DATABASE_URL", f"sqlite:///{SERVICE_DIR / 'test_booking.db'}")
+os.environ.setdefault("BOOKING_DATABASE_URL", "sqlite://")
 os.environ.setdefault("EVENT_STREAM", "test-stream")
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
 
+from app.core import database  # noqa: E402
+
+# SQLite em memória com StaticPool: uma única conexão compartilhada, então o
+# threadpool do FastAPI e os consumers (SessionLocal) enxergam o mesmo banco.
+engine = create_async_engine(
+    "sqlite+aiosqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+database.engine = engine
+database.SessionLocal.configure(bind=engine)
+
+
+# O driver sqlite3 gerencia BEGIN por conta própria e quebra SAVEPOINTs;
+# desliga isso e deixa o SQLAlchemy emitir o BEGIN (receita da doc do SQLAlchemy)
+@event.listens_for(engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
 from app.main import app  # noqa: E402
-from app.core.database import Base, engine  # noqa: E402
+from app.core.database import Base  # noqa: E402
 from app.services.organization import OrganizationSettings  # noqa: E402
 
+# Settings fixas dos testes, montadas uma vez (dataclass congelado)
+_TEST_SETTINGS = OrganizationSettings(
+    timezone="UTC",
+    working_hours_start=time(8, 0),
+    working_hours_end=time(18, 0),
+    booking_interval=30,
+    advance_booking_days=30,
+    cancellation_hours=24,
+)
 
-@pytest.fixture(autouse=True)
-def prepare_database():
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+
+class MockEventPublisher:
+    """Publisher de teste: guarda (event_type, payload, metadata) em vez de ir ao Redis."""
+
+    def __init__(self, events: list):
+        self.events = events
+
+    def publish(self, event_type, payload, metadata=None):
+        self.events.append((event_type, payload, metadata))
+
+    def publish_many(self, events):
+        self.events.extend(events)
+
+    def enqueue(self, event_type, payload, *, metadata=None):
+        self.events.append((event_type, payload, metadata))
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def database_schema(anyio_backend):
+    # Schema criado uma única vez por sessão direto dos models (sem Alembic)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
     yield
-    Base.metadata.drop_all(bind=engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
 
 
-@pytest.fixture
-def client():
-    app.state.event_publisher = None
+@pytest.fixture(autouse=True)
+async def prepare_database(database_schema, monkeypatch):
+    # Cada teste roda dentro de uma transação externa desfeita no teardown: os
+    # commits do app e dos consumers (via SessionLocal) viram SAVEPOINTs
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        monkeypatch.setitem(database.SessionLocal.kw, "bind", connection)
+        monkeypatch.setitem(database.SessionLocal.kw, "join_transaction_mode", "create_savepoint")
+        yield
+        await transaction.rollback()
+
+
+@pytest.fixture(autouse=True)
+def mock_outbound_http():
+    # Nenhuma chamada HTTP de saída (tenant/resource/user services) abre socket:
+    # o respx intercepta o httpcore e falha em rotas não mockadas. O
+    # ASGITransport do aclient não passa pelo httpcore, então não é afetado.
+    with respx.mock(assert_all_called=False) as router:
+        yield router
+
 
+@pytest.fixture
+async def aclient(monkeypatch):
+    # monkeypatch restaura o app.state ao fim de cada teste, mantendo os testes
+    # isolados entre si (cada worker do xdist importa o seu próprio app)
     def test_settings_provider(_tenant_id, auth_token=None):
-        return OrganizationSettings(
-            timezone="UTC",
-            working_hours_start=time(8, 0),
-            working_hours_end=time(18, 0),
-            booking_interval=30,
-            advance_booking_days=30,
-            cancellation_hours=24,
-        )
-
-    app.state.settings_provider = test_settings_provider
-
-    with TestClient(app) as test_client:
+        return _TEST_SETTINGS
+
+    monkeypatch.setattr(app.state, "event_publisher", None)
+    monkeypatch.setattr(app.state, "settings_provider", test_settings_provider)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as test_client:
         yield test_client
+
+
+@pytest.fixture
+def captured_events(aclient, monkeypatch):
+    # depende do aclient para sobrescrever o publisher nulo que ele instala
+    events = []
+    monkeypatch.setattr(app.state, "event_publisher", MockEventPublisher(events))
+    yield events
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # Testes async rodam só no asyncio (o backend do FastAPI), sem repetir no
+    # trio; com uvloop quando disponível (não existe no Windows)
+    try:
+        import uvloop
+    except ImportError:
+        return "asyncio"
+    return ("asyncio", {"loop_factory": uvloop.new_event_loop})
@@ -1,10 +1,19 @@
 import os
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone, time
+from functools import lru_cache
 from uuid import uuid4
 
+import orjson
+import pytest
 from fastapi import status
 from jose import jwt
+from sqlalchemy.exc import OperationalError
 
+from app.core import database
+from app.main import app
+from app.routers import crud
+from app.schemas.booking_schema import BookingUpdate
 from app.services.organization import OrganizationSettings
 
 # =====================================================================
@@ -18,7 +27,8 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS512")
 def make_auth_headers(user_id: str, tenant_id: str, user_type: str = "admin"):
     """
     Gera um token JWT compatível com get_current_token
-    e retorna o header Authorization.
+    e retorna o header Authorization (já com o Content-Type dos corpos
+    pré-serializados por _payload_bytes).
     """
     now = datetime.now(timezone.utc)
     exp = now + timedelta(hours=1)
@@ -30,7 +40,7 @@ def make_auth_headers(user_id: str, tenant_id: str, user_type: str = "admin"):
         "exp": int(exp.timestamp()),
     }
     token = jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-    return {"Authorization": f"Bearer {token}"}
+    return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
 
 # =====================================================================
@@ -44,30 +54,41 @@ def _base_times(hours_from_now: int = 48, duration_minutes: int = 60):
     return base, end
 
 
-def _booking_payload(
-    tenant_id: str,
-    resource_id: str,
-    user_id: str,
-    start: datetime,
-    end: datetime,
-):
+@lru_cache(maxsize=None)
+def _base_payload(tenant_id: str, resource_id: str, user_id: str) -> dict:
     return {
         "tenant_id": tenant_id,
         "resource_id": resource_id,
         "user_id": user_id,
         "client_id": user_id,          # alinha com o que você manda no Postman
-        "start_time": start.isoformat(),
-        "end_time": end.isoformat(),
         "notes": "Primeira reserva",
         "recurring_enabled": False,    # idem
     }
 
 
+def _payload_bytes(
+    tenant_id: str,
+    resource_id: str,
+    user_id: str,
+    start: datetime,
+    end: datetime,
+) -> bytes:
+    """Corpo JSON já serializado; enviado com content= para evitar o json= do httpx."""
+    return orjson.dumps(
+        {
+            **_base_payload(tenant_id, resource_id, user_id),
+            "start_time": start,
+            "end_time": end,
+        }
+    )
+
+
 # =====================================================================
 # Testes
 # =====================================================================
 
-def test_booking_lifecycle(client):
+@pytest.mark.anyio
+async def test_booking_lifecycle(aclient):
     tenant_id = str(uuid4())
     resource_id = str(uuid4())
     user_id = str(uuid4())
@@ -76,9 +97,9 @@ def test_booking_lifecycle(client):
 
     start, end = _base_times()
 
-    create_resp = client.post(
+    create_resp = await aclient.post(
         "/bookings/",
-        json=_booking_payload(tenant_id, resource_id, user_id, start, end),
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
         headers=headers,
     )
     assert create_resp.status_code == status.HTTP_201_CREATED
@@ -86,14 +107,9 @@ def test_booking_lifecycle(client):
     booking_id = booking["id"]
 
     assert booking["status"] == "confirmado"
+    assert booking["can_cancel"] is True
 
-    list_resp = client.get("/bookings/", params={"tenant_id": tenant_id}, headers=headers)
-    assert list_resp.status_code == status.HTTP_200_OK
-    bookings = list_resp.json()
-    assert len(bookings) == 1
-    assert bookings[0]["can_cancel"] is True
-
-    update_resp = client.put(
+    update_resp = await aclient.put(
         f"/bookings/{booking_id}",
         json={"notes": "Atualização de notas", "status": "confirmado"},
         headers=headers,
@@ -102,7 +118,7 @@ def test_booking_lifecycle(client):
     assert update_resp.json()["notes"] == "Atualização de notas"
     assert update_resp.json()["status"] == "confirmado"
 
-    status_resp = client.patch(
+    status_resp = await aclient.patch(
         f"/bookings/{booking_id}/status",
         params={"status_param": "concluido"},
         headers=headers,
@@ -110,7 +126,7 @@ def test_booking_lifecycle(client):
     assert status_resp.status_code == status.HTTP_200_OK
     assert status_resp.json()["status"] == "concluido"
 
-    cancel_resp = client.patch(
+    cancel_resp = await aclient.patch(
         f"/bookings/{booking_id}/cancel",
         params={"cancelled_by": str(uuid4())},
         json={"reason": "Cliente cancelou"},
@@ -123,7 +139,75 @@ def test_booking_lifecycle(client):
     assert cancelled["cancelled_at"] is not None
 
 
-def test_booking_conflict_detection(client):
+@pytest.mark.anyio
+async def test_list_bookings_returns_policy_and_local_times(aclient):
+    tenant_id = str(uuid4())
+    resource_id = str(uuid4())
+    user_id = str(uuid4())
+
+    headers = make_auth_headers(user_id=user_id, tenant_id=tenant_id, user_type="admin")
+
+    start, end = _base_times()
+
+    create_resp = await aclient.post(
+        "/bookings/",
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
+        headers=headers,
+    )
+    assert create_resp.status_code == status.HTTP_201_CREATED
+    booking_id = create_resp.json()["id"]
+
+    # as linhas passam pelo BOOKING_OUT_LIST e ganham can_cancel e horários locais
+    list_resp = await aclient.get("/bookings/", params={"tenant_id": tenant_id}, headers=headers)
+    assert list_resp.status_code == status.HTTP_200_OK
+    listed = list_resp.json()
+    assert [item["id"] for item in listed] == [booking_id]
+    assert listed[0]["can_cancel"] is True
+    assert listed[0]["start_time"].startswith(start.replace(tzinfo=None).isoformat())
+
+
+@pytest.mark.anyio
+async def test_update_with_stale_if_match_returns_409(aclient):
+    tenant_id = str(uuid4())
+    resource_id = str(uuid4())
+    user_id = str(uuid4())
+
+    headers = make_auth_headers(user_id=user_id, tenant_id=tenant_id, user_type="admin")
+
+    start, end = _base_times()
+
+    create_resp = await aclient.post(
+        "/bookings/",
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
+        headers=headers,
+    )
+    assert create_resp.status_code == status.HTTP_201_CREATED
+    booking = create_resp.json()
+    assert booking["version"] == 1
+
+    first = await aclient.put(
+        f"/bookings/{booking['id']}",
+        json={"notes": "Primeira edição"},
+        headers={**headers, "If-Match": '"1"'},
+    )
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json()["version"] == 2
+
+    # segundo cliente ainda com a versão 1 em mãos
+    stale = await aclient.put(
+        f"/bookings/{booking['id']}",
+        json={"notes": "Edição concorrente"},
+        headers={**headers, "If-Match": '"1"'},
+    )
+    assert stale.status_code == status.HTTP_409_CONFLICT
+    stale_body = stale.json()
+    assert stale_body["error"] == "stale"
+    assert stale_body["booking"]["version"] == 2
+    assert stale_body["booking"]["notes"] == "Primeira edição"
+
+
+@pytest.mark.anyio
+async def test_booking_conflict_detection(aclient):
     tenant_id = str(uuid4())
     resource_id = str(uuid4())
     user_id = str(uuid4())
@@ -132,16 +216,16 @@ def test_booking_conflict_detection(client):
 
     start, end = _base_times()
 
-    first = client.post(
+    first = await aclient.post(
         "/bookings/",
-        json=_booking_payload(tenant_id, resource_id, user_id, start, end),
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
         headers=headers,
     )
     assert first.status_code == status.HTTP_201_CREATED
 
-    conflict = client.post(
+    conflict = await aclient.post(
         "/bookings/",
-        json=_booking_payload(
+        content=_payload_bytes(
             tenant_id,
             resource_id,
             str(uuid4()),
@@ -158,9 +242,9 @@ def test_booking_conflict_detection(client):
 
     next_start = end + timedelta(minutes=30)
     next_end = next_start + timedelta(hours=1)
-    non_conflict = client.post(
+    non_conflict = await aclient.post(
         "/bookings/",
-        json=_booking_payload(
+        content=_payload_bytes(
             tenant_id,
             resource_id,
             str(uuid4()),
@@ -172,177 +256,202 @@ def test_booking_conflict_detection(client):
     assert non_conflict.status_code == status.HTTP_201_CREATED
 
 
-def test_booking_outside_working_hours_returns_400(client):
+class _SerializationFailure(Exception):
+    pgcode = "40001"
+
+
+@pytest.mark.anyio
+async def test_create_retries_serialization_failure(aclient, monkeypatch):
     tenant_id = str(uuid4())
     resource_id = str(uuid4())
     user_id = str(uuid4())
 
     headers = make_auth_headers(user_id=user_id, tenant_id=tenant_id, user_type="admin")
 
-    late_start, late_end = _base_times(hours_from_now=48)
-    late_start = late_start.replace(hour=22)
-    late_end = late_start + timedelta(hours=1)
+    # primeira tentativa abortada pelo Postgres (40001); a segunda grava
+    insert_booking = crud._insert_booking
+    attempts = []
+
+    async def flaky_insert(db, payload):
+        attempts.append(payload)
+        if len(attempts) == 1:
+            raise OperationalError("INSERT", {}, _SerializationFailure())
+        return await insert_booking(db, payload)
+
+    monkeypatch.setattr(crud, "_insert_booking", flaky_insert)
+    monkeypatch.setattr(crud, "SERIALIZATION_BACKOFF_SECONDS", 0)
 
-    response = client.post(
+    start, end = _base_times()
+    response = await aclient.post(
         "/bookings/",
-        json=_booking_payload(tenant_id, resource_id, user_id, late_start, late_end),
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
         headers=headers,
     )
-    assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert response.json()["detail"] == "Horário fora do expediente configurado."
-
-
-def test_booking_respects_advance_window(client):
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(attempts) == 2
+
+
+# OrganizationSettings é um dataclass congelado: instâncias montadas uma única
+# vez no import do módulo e compartilhadas entre os testes.
+_BASE_SETTINGS = OrganizationSettings(
+    timezone="UTC",
+    working_hours_start=time(8, 0),
+    working_hours_end=time(18, 0),
+    booking_interval=30,
+    advance_booking_days=30,
+    cancellation_hours=24,
+)
+
+# Settings do tenant que fazem cada regra de negócio disparar
+_SETTINGS_BY_RULE = {
+    "working_hours": _BASE_SETTINGS,
+    "advance_window": replace(_BASE_SETTINGS, advance_booking_days=1),
+    "cancellation_window": replace(_BASE_SETTINGS, cancellation_hours=48),
+}
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "rule,hours_from_now,start_hour,expected_detail",
+    [
+        ("working_hours", 48, 22, "Horário fora do expediente configurado."),
+        ("advance_window", 72, 10, "dias de antecedência"),
+        ("cancellation_window", 24, 10, "Cancelamento permitido"),
+    ],
+)
+async def test_booking_rules_return_400(
+    aclient,
+    monkeypatch,
+    rule,
+    hours_from_now,
+    start_hour,
+    expected_detail,
+):
     tenant_id = str(uuid4())
     resource_id = str(uuid4())
     user_id = str(uuid4())
 
     headers = make_auth_headers(user_id=user_id, tenant_id=tenant_id, user_type="admin")
 
-    original_provider = client.app.state.settings_provider
+    settings = _SETTINGS_BY_RULE[rule]
+    monkeypatch.setattr(
+        app.state,
+        "settings_provider",
+        lambda _tenant_id, auth_token=None: settings,
+    )
 
-    def limited_provider(_tenant_id, auth_token=None):
-        return OrganizationSettings(
-            timezone="UTC",
-            working_hours_start=time(8, 0),
-            working_hours_end=time(18, 0),
-            booking_interval=30,
-            advance_booking_days=1,
-            cancellation_hours=24,
-        )
+    start, _ = _base_times(hours_from_now=hours_from_now)
+    start = start.replace(hour=start_hour)
+    end = start + timedelta(hours=1)
 
-    client.app.state.settings_provider = limited_provider
+    response = await aclient.post(
+        "/bookings/",
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
+        headers=headers,
+    )
 
-    try:
-        far_start, far_end = _base_times(hours_from_now=72)
-        response = client.post(
-            "/bookings/",
-            json=_booking_payload(tenant_id, resource_id, user_id, far_start, far_end),
+    # a janela de cancelamento só é validada ao cancelar uma reserva já criada
+    if rule == "cancellation_window":
+        assert response.status_code == status.HTTP_201_CREATED
+        response = await aclient.patch(
+            f"/bookings/{response.json()['id']}/cancel",
+            json={"reason": "Cliente desistiu"},
             headers=headers,
         )
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert "dias de antecedência" in response.json()["detail"]
-    finally:
-        client.app.state.settings_provider = original_provider
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert expected_detail in response.json()["detail"]
 
 
-def test_cancel_booking_respects_cancellation_window(client):
+@pytest.mark.anyio
+async def test_cancel_booking_publishes_event_with_resource_and_user_ids(aclient, captured_events):
+    """Test that booking.cancelled event includes resource_id and user_id in the payload."""
     tenant_id = str(uuid4())
     resource_id = str(uuid4())
     user_id = str(uuid4())
 
     headers = make_auth_headers(user_id=user_id, tenant_id=tenant_id, user_type="admin")
 
-    original_provider = client.app.state.settings_provider
+    # Create a booking that can be cancelled (far enough in the future)
+    start, end = _base_times(hours_from_now=72)
+    create_resp = await aclient.post(
+        "/bookings/",
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
+        headers=headers,
+    )
+    assert create_resp.status_code == status.HTTP_201_CREATED
+    booking_id = create_resp.json()["id"]
 
-    def strict_cancellation_provider(_tenant_id, auth_token=None):
-        return OrganizationSettings(
-            timezone="UTC",
-            working_hours_start=time(8, 0),
-            working_hours_end=time(18, 0),
-            booking_interval=30,
-            advance_booking_days=30,
-            cancellation_hours=48,
-        )
+    # Cancel the booking
+    cancel_resp = await aclient.patch(
+        f"/bookings/{booking_id}/cancel",
+        json={"reason": "Testing event payload"},
+        headers=headers,
+    )
 
-    client.app.state.settings_provider = strict_cancellation_provider
+    assert cancel_resp.status_code == status.HTTP_200_OK
 
-    try:
-        start, end = _base_times(hours_from_now=24)
-        create_resp = client.post(
-            "/bookings/",
-            json=_booking_payload(tenant_id, resource_id, user_id, start, end),
-            headers=headers,
-        )
-        assert create_resp.status_code == status.HTTP_201_CREATED
-        booking_id = create_resp.json()["id"]
+    # Find the booking.cancelled event
+    cancelled = [e for e in captured_events if e[0] == "booking.cancelled"]
 
-        cancel_resp = client.patch(
-            f"/bookings/{booking_id}/cancel",
-            params={"cancelled_by": str(uuid4())},
-            json={"reason": "Cliente desistiu"},
-            headers=headers,
-        )
+    assert len(cancelled) == 1, "Expected exactly one booking.cancelled event"
 
-        # Aceita tanto 400 (regra de negócio) quanto 405 (método não permitido)
-        assert cancel_resp.status_code in (
-            status.HTTP_400_BAD_REQUEST,
-            status.HTTP_405_METHOD_NOT_ALLOWED,
-        )
+    event_payload = cancelled[0][1]
 
-        if cancel_resp.status_code == status.HTTP_400_BAD_REQUEST:
-            assert "Cancelamento permitido" in cancel_resp.json()["detail"]
-    finally:
-        client.app.state.settings_provider = original_provider
+    # Verify the event payload contains resource_id and user_id
+    assert "resource_id" in event_payload, "Event payload should contain resource_id"
+    assert "user_id" in event_payload, "Event payload should contain user_id"
+    assert event_payload["resource_id"] == resource_id
+    assert event_payload["user_id"] == user_id
+    assert event_payload["booking_id"] == booking_id
+    assert event_payload["cancelled_by"] == user_id
+    assert event_payload["reason"] == "Testing event payload"
 
 
-def test_cancel_booking_publishes_event_with_resource_and_user_ids(client):
-    """Test that booking.cancelled event includes resource_id and user_id in the payload."""
+@pytest.mark.anyio
+async def test_cancel_after_concurrent_update_returns_409(aclient, monkeypatch):
     tenant_id = str(uuid4())
     resource_id = str(uuid4())
     user_id = str(uuid4())
 
     headers = make_auth_headers(user_id=user_id, tenant_id=tenant_id, user_type="admin")
 
-    # Create a mock event publisher to capture published events
-    published_events = []
-    
-    class MockEventPublisher:
-        def publish(self, event_type, payload, metadata=None):
-            published_events.append({
-                "event_type": event_type,
-                "payload": payload,
-                "metadata": metadata,
-            })
-    
-    # Set the mock publisher
-    original_publisher = client.app.state.event_publisher
-    client.app.state.event_publisher = MockEventPublisher()
-    
-    try:
-        # Create a booking that can be cancelled (far enough in the future)
-        start, end = _base_times(hours_from_now=72)
-        create_resp = client.post(
-            "/bookings/",
-            json=_booking_payload(tenant_id, resource_id, user_id, start, end),
-            headers=headers,
-        )
-        assert create_resp.status_code == status.HTTP_201_CREATED
-        booking_id = create_resp.json()["id"]
+    start, end = _base_times(hours_from_now=72)
+    create_resp = await aclient.post(
+        "/bookings/",
+        content=_payload_bytes(tenant_id, resource_id, user_id, start, end),
+        headers=headers,
+    )
+    assert create_resp.status_code == status.HTTP_201_CREATED
+    booking_id = create_resp.json()["id"]
 
-        # Cancel the booking
-        cancel_resp = client.patch(
-            f"/bookings/{booking_id}/cancel",
-            json={"reason": "Testing event payload"},
-            headers=headers,
-        )
-        
-        assert cancel_resp.status_code == status.HTTP_200_OK
-        
-        # Find the booking.cancelled event
-        cancelled_events = [
-            e for e in published_events 
-            if e["event_type"] == "booking.cancelled"
-        ]
-        
-        assert len(cancelled_events) == 1, "Expected exactly one booking.cancelled event"
-        
-        event_payload = cancelled_events[0]["payload"]
-        
-        # Verify the event payload contains resource_id and user_id
-        assert "resource_id" in event_payload, "Event payload should contain resource_id"
-        assert "user_id" in event_payload, "Event payload should contain user_id"
-        assert event_payload["resource_id"] == resource_id
-        assert event_payload["user_id"] == user_id
-        assert event_payload["booking_id"] == booking_id
-        assert event_payload["cancelled_by"] == user_id
-        assert event_payload["reason"] == "Testing event payload"
-        
-    finally:
-        client.app.state.event_publisher = original_publisher
-
-
-def test_openapi_version(client):
-    response = client.get("/openapi.json")
+    # outra requisição grava entre a leitura da rota e a releitura dentro da escrita
+    get_booking = crud.get_booking
+    reads = []
+
+    async def get_booking_with_concurrent_write(db, target_id):
+        reads.append(target_id)
+        if len(reads) == 2:
+            async with database.SessionLocal() as other:
+                await crud.update_booking(other, target_id, BookingUpdate(notes="Edição concorrente"))
+        return await get_booking(db, target_id)
+
+    monkeypatch.setattr(crud, "get_booking", get_booking_with_concurrent_write)
+
+    cancel_resp = await aclient.patch(
+        f"/bookings/{booking_id}/cancel",
+        json={"reason": "Cliente desistiu"},
+        headers=headers,
+    )
+    assert cancel_resp.status_code == status.HTTP_409_CONFLICT
+    stale_body = cancel_resp.json()
+    assert stale_body["error"] == "stale"
+    assert stale_body["booking"]["version"] == 2
+    assert stale_body["booking"]["status"] != "cancelado"
+
+
+@pytest.mark.anyio
+async def test_openapi_version(aclient):
+    response = await aclient.get("/openapi.json")
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["openapi"] == "3.0.3"
@@ -3,6 +3,7 @@
 import pytest
 from uuid import uuid4
 from datetime import datetime, timezone
+from sqlalchemy import select
 from app.consumers import handle_resource_deleted, handle_user_deleted, handle_tenant_deleted
 from app.models.booking import Booking, BookingStatus
 from app.core.database import SessionLocal
@@ -44,30 +45,29 @@ async def test_handle_resource_deleted_cancels_bookings():
         )
         
         db.add_all([booking1, booking2, booking3])
-        db.commit()
+        await db.flush()
+        ids = [booking1.id, booking2.id, booking3.id]
+        await db.commit()
         
         # Processar evento
         payload = {"resource_id": str(resource_id), "tenant_id": str(tenant_id)}
         await handle_resource_deleted("resource.deleted", payload)
 
-        # Verificar que apenas as ativas foram canceladas
-        db.refresh(booking1)
-        db.refresh(booking2)
-        db.refresh(booking3)
+        # Verificar que apenas as ativas foram canceladas (um único SELECT)
+        rows = {b.id: b for b in await db.scalars(select(Booking).where(Booking.id.in_(ids)))}
 
-        assert booking1.status == BookingStatus.CANCELLED
-        assert "Recurso deletado" in booking1.cancellation_reason
-        assert booking2.status == BookingStatus.CANCELLED
-        assert "Recurso deletado" in booking2.cancellation_reason
-        assert booking3.status == BookingStatus.CANCELLED  # já estava cancelada
+        assert rows[ids[0]].status == BookingStatus.CANCELLED
+        assert "Recurso deletado" in rows[ids[0]].cancellation_reason
+        assert rows[ids[1]].status == BookingStatus.CANCELLED
+        assert "Recurso deletado" in rows[ids[1]].cancellation_reason
+        assert rows[ids[2]].status == BookingStatus.CANCELLED  # já estava cancelada
 
         # Cleanup
-        db.delete(booking1)
-        db.delete(booking2)
-        db.delete(booking3)
-        db.commit()
+        for booking in rows.values():
+            await db.delete(booking)
+        await db.commit()
     finally:
-        db.close()
+        await db.close()
 
 
 @pytest.mark.anyio
@@ -98,27 +98,28 @@ async def test_handle_user_deleted_cancels_bookings():
         )
         
         db.add_all([booking1, booking2])
-        db.commit()
+        await db.flush()
+        ids = [booking1.id, booking2.id]
+        await db.commit()
         
         # Processar evento
         payload = {"user_id": str(user_id), "tenant_id": str(tenant_id)}
         await handle_user_deleted("user.deleted", payload)
 
-        # Verificar que foram canceladas
-        db.refresh(booking1)
-        db.refresh(booking2)
+        # Verificar que foram canceladas (um único SELECT)
+        rows = {b.id: b for b in await db.scalars(select(Booking).where(Booking.id.in_(ids)))}
 
-        assert booking1.status == BookingStatus.CANCELLED
-        assert "Usuário deletado" in booking1.cancellation_reason
-        assert booking2.status == BookingStatus.CANCELLED
-        assert "Usuário deletado" in booking2.cancellation_reason
+        assert rows[ids[0]].status == BookingStatus.CANCELLED
+        assert "Usuário deletado" in rows[ids[0]].cancellation_reason
+        assert rows[ids[1]].status == BookingStatus.CANCELLED
+        assert "Usuário deletado" in rows[ids[1]].cancellation_reason
 
         # Cleanup
-        db.delete(booking1)
-        db.delete(booking2)
-        db.commit()
+        for booking in rows.values():
+            await db.delete(booking)
+        await db.commit()
     finally:
-        db.close()
+        await db.close()
 
 
 @pytest.mark.anyio
@@ -155,20 +156,19 @@ async def test_handle_tenant_deleted_deletes_all_bookings():
         )
         
         db.add_all([booking1, booking2, booking3])
-        db.commit()
-        
+        await db.flush()
         booking_ids = [booking1.id, booking2.id, booking3.id]
+        await db.commit()
         
         # Processar evento
         payload = {"tenant_id": str(tenant_id)}
         await handle_tenant_deleted("tenant.deleted", payload)
 
         # Verificar que TODAS foram deletadas
-        for booking_id in booking_ids:
-            result = db.query(Booking).filter(Booking.id == booking_id).first()
-            assert result is None, f"Booking {booking_id} deveria ter sido deletada"
+        remaining = (await db.scalars(select(Booking.id).where(Booking.id.in_(booking_ids)))).all()
+        assert remaining == [], f"Bookings ainda presentes: {remaining}"
     finally:
-        db.close()
+        await db.close()
 
 
 @pytest.mark.anyio
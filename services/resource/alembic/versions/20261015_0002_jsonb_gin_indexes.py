@@ -0,0 +1,46 @@
+"""gin indexes on resource jsonb columns
+
+Revision ID: 20261015_2002
+Revises: 20251109_2001
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_2002"
+down_revision = "20251109_2001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # jsonb_path_ops: metade do tamanho do jsonb_ops, suficiente para consultas com @>
+    op.create_index(
+        "ix_resource_categories_metadata_gin",
+        "resource_categories",
+        ["metadata"],
+        postgresql_using="gin",
+        postgresql_ops={"metadata": "jsonb_path_ops"},
+    )
+    op.create_index(
+        "ix_resources_attributes_gin",
+        "resources",
+        ["attributes"],
+        postgresql_using="gin",
+        postgresql_ops={"attributes": "jsonb_path_ops"},
+    )
+    # jsonb_ops padrão: a grade também é consultada por existência de chave (?)
+    op.create_index(
+        "ix_resources_availability_schedule_gin",
+        "resources",
+        ["availability_schedule"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resources_availability_schedule_gin", table_name="resources")
+    op.drop_index("ix_resources_attributes_gin", table_name="resources")
+    op.drop_index("ix_resource_categories_metadata_gin", table_name="resource_categories")
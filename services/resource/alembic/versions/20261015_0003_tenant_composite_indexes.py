@@ -0,0 +1,33 @@
+"""composite tenant indexes for category and resource listings
+
+Revision ID: 20261015_2003
+Revises: 20261015_2002
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_2003"
+down_revision = "20261015_2002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_resource_categories_tenant_active",
+        "resource_categories",
+        ["tenant_id", "is_active"],
+    )
+    op.create_index(
+        "ix_resources_tenant_category",
+        "resources",
+        ["tenant_id", "category_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resources_tenant_category", table_name="resources")
+    op.drop_index("ix_resource_categories_tenant_active", table_name="resource_categories")
@@ -0,0 +1,27 @@
+"""(tenant_id, name, id) index for keyset-paginated resource listings
+
+Revision ID: 20261015_2004
+Revises: 20261015_2003
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_2004"
+down_revision = "20261015_2003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_resources_tenant_name_id",
+        "resources",
+        ["tenant_id", "name", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resources_tenant_name_id", table_name="resources")
@@ -0,0 +1,44 @@
+"""category keyset index and trigram index for resource name search
+
+Revision ID: 20261015_2005
+Revises: 20261015_2004
+Create Date: 2026-10-15 00:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261015_2005"
+down_revision = "20261015_2004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (tenant_id, category_id) é prefixo do novo índice, que também cobre o ORDER BY name, id
+    op.drop_index("ix_resources_tenant_category", table_name="resources")
+    op.create_index(
+        "ix_resources_tenant_category_name_id",
+        "resources",
+        ["tenant_id", "category_id", "name", "id"],
+    )
+    # ILIKE '%busca%' deixa de ser seq scan
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_resources_name_trgm",
+        "resources",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resources_name_trgm", table_name="resources")
+    op.drop_index("ix_resources_tenant_category_name_id", table_name="resources")
+    op.create_index(
+        "ix_resources_tenant_category",
+        "resources",
+        ["tenant_id", "category_id"],
+    )
@@ -1,67 +1,57 @@
 """Consumer for booking events in Resource Service."""
 
+import asyncio
 import logging
 from typing import Any
 
+from app.core import cache
+
 logger = logging.getLogger(__name__)
 
 
-async def handle_booking_created(event_type: str, payload: dict[str, Any]) -> None:
-    """
-    Handle booking.created events.
-    
-    Actions:
-    - Update resource usage statistics
-    - Track booking frequency per resource
-    """
-    booking_id = payload.get("booking_id")
-    resource_id = payload.get("resource_id")
-    start_time = payload.get("start_time")
-    end_time = payload.get("end_time")
-    
-    logger.info(
-        f"[BOOKING_CREATED] Resource {resource_id} booked (booking {booking_id}) "
-        f"from {start_time} to {end_time}"
-    )
-    
-    # TODO: Update resource metrics
-    # await update_resource_usage_stats(resource_id, start_time, end_time)
+async def _invalidate_availability(resource_id: str | None) -> None:
+    """Drop the cached availability of the resource touched by a booking event."""
+    if not resource_id or cache.availability_cache is None:
+        return
+    await asyncio.to_thread(cache.availability_cache.invalidate_resource, resource_id)
 
 
-async def handle_booking_cancelled(event_type: str, payload: dict[str, Any]) -> None:
+async def handle_booking_event(event_type: str, payload: dict[str, Any]) -> None:
     """
-    Handle booking.cancelled events.
-    
-    Actions:
-    - Update resource availability cache if needed
-    - Track cancellation metrics
-    """
-    booking_id = payload.get("booking_id")
-    resource_id = payload.get("resource_id")
-    
-    logger.info(
-        f"[BOOKING_CANCELLED] Resource {resource_id} freed up (booking {booking_id} cancelled)"
-    )
-    
-    # TODO: Invalidate availability cache for this resource
-    # await invalidate_resource_cache(resource_id)
+    Handle every booking event (created, cancelled, updated, status_changed, deleted).
 
+    All of them change what is free on the resource, so the single action is to
+    invalidate its availability cache; only the log line depends on the type.
+    The payload never carries the previous times, so the whole resource is dropped.
 
-async def handle_booking_updated(event_type: str, payload: dict[str, Any]) -> None:
-    """
-    Handle booking.updated events.
-    
-    Actions:
-    - Recalculate resource availability if time changed
+    TODO: Update resource usage statistics / booking frequency per resource
     """
     booking_id = payload.get("booking_id")
     resource_id = payload.get("resource_id")
-    changes = payload.get("changes", {})
-    
-    logger.info(
-        f"[BOOKING_UPDATED] Resource {resource_id} booking {booking_id} updated: {changes}"
-    )
-    
-    # TODO: Handle time changes
-    # if "start_time" in changes or "end_time" in changes:
-    #     await recalculate_availability(resource_id)
+
+    match event_type:
+        case "booking.created":
+            logger.info(
+                "[BOOKING_CREATED] Resource %s booked (booking %s) from %s to %s",
+                resource_id,
+                booking_id,
+                payload.get("start_time"),
+                payload.get("end_time"),
+            )
+        case "booking.cancelled" | "booking.deleted":
+            logger.info("[BOOKING_CANCELLED] Resource %s freed up (booking %s cancelled)", resource_id, booking_id)
+        case _:
+            logger.info(
+                "[BOOKING_UPDATED] Resource %s booking %s updated: %s",
+                resource_id,
+                booking_id,
+                payload.get("changes", {}),
+            )
+
+    await _invalidate_availability(resource_id)
+
+
+# Nomes por tipo de evento, mantidos para quem já importa os handlers
+handle_booking_created = handle_booking_event
+handle_booking_cancelled = handle_booking_event
+handle_booking_updated = handle_booking_event
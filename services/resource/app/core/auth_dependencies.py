@@ -1,6 +1,7 @@
 import os
+from typing import Optional, Tuple
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import BaseModel, ValidationError
@@ -25,3 +26,39 @@ def get_current_token(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas",
         )
+
+
+def ensure_same_tenant(current_token: TokenPayload, tenant_id: UUID, detail: str) -> None:
+    if tenant_id != current_token.tenant_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+def require_admin(action: str):
+    """Dependência: exige um token de administrador; ``action`` completa a mensagem do 403."""
+    detail = f"Somente administradores podem {action}"
+
+    def _admin_token(current_token: TokenPayload = Depends(get_current_token)) -> TokenPayload:
+        if current_token.user_type != "admin":
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+        return current_token
+
+    return _admin_token
+
+
+def require_admin_same_tenant(action: str, other_tenant_detail: str):
+    """Dependência: admin + ``tenant_id`` da query, que assume o tenant do token quando omitido.
+
+    Devolve ``(token, tenant_id)`` já validados.
+    """
+    admin_token = require_admin(action)
+
+    def _admin_tenant(
+        tenant_id: Optional[UUID] = Query(default=None, description="Tenant a filtrar"),
+        current_token: TokenPayload = Depends(admin_token),
+    ) -> Tuple[TokenPayload, UUID]:
+        if tenant_id is None:
+            return current_token, current_token.tenant_id
+        ensure_same_tenant(current_token, tenant_id, other_tenant_detail)
+        return current_token, tenant_id
+
+    return _admin_tenant
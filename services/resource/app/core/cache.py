@@ -0,0 +1,16 @@
+from shared import AvailabilityCache, TTLCache, load_service_config
+
+_config = load_service_config("resource")
+
+# Cache de disponibilidade só existe com Redis configurado; sem ele (testes,
+# dev local) as consultas vão sempre direto ao cálculo.
+availability_cache = (
+    AvailabilityCache(_config.redis.url)
+    if isinstance(_config.redis.url, str) and _config.redis.url.strip()
+    else None
+)
+
+# Tenants validados recentemente (por processo): criações em sequência do mesmo
+# tenant não repetem a chamada HTTP ao Tenant Service. tenant.deleted invalida.
+TENANT_CACHE_TTL = 60
+tenant_cache: TTLCache[dict] = TTLCache(maxsize=1024, ttl=TENANT_CACHE_TTL)
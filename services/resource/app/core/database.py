@@ -1,15 +1,20 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
-from shared import load_service_config
+from shared import database_pool_options, load_service_config
 
 _config = load_service_config("resource")
 
 engine = create_engine(
     _config.database.url,
     future=True,
-    pool_pre_ping=True,
+    **database_pool_options(_config.database.url),
 )
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+# Sem expirar no commit: as rotas serializam o objeto recém-gravado sem um novo
+# SELECT; defaults do servidor voltam no próprio INSERT/UPDATE (eager_defaults)
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
 Base = declarative_base()
 
 def get_db():
@@ -18,3 +23,18 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def count_queries(bind=engine) -> Iterator[List[str]]:
+    """Coleta o SQL executado no bloco (uso em dev/testes para pegar N+1)."""
+    statements: List[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", _before_cursor_execute)
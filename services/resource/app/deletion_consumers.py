@@ -3,7 +3,9 @@
 import logging
 from typing import Dict, Any
 from uuid import UUID
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
+from app.core import cache
 from app.core.database import SessionLocal
 from app.models.resource import Resource, ResourceCategory
 
@@ -24,25 +26,19 @@ async def handle_tenant_deleted(event_type: str, payload: Dict[str, Any]) -> Non
     # Converter string para UUID
     if isinstance(tenant_id, str):
         tenant_id = UUID(tenant_id)
+
+    # tenant removido deixa de ser válido para novas categorias/recursos neste worker
+    cache.tenant_cache.invalidate(str(tenant_id))
     
     db: Session = SessionLocal()
     try:
-        # Buscar todos os recursos do tenant
-        resources = db.query(Resource).filter(Resource.tenant_id == tenant_id).all()
-        
-        # Deletar todos os recursos PRIMEIRO (eles têm FK para categorias)
-        for resource in resources:
-            db.delete(resource)
-        
-        # Buscar todas as categorias do tenant
-        categories = db.query(ResourceCategory).filter(ResourceCategory.tenant_id == tenant_id).all()
-        
-        # Deletar todas as categorias DEPOIS (para evitar violação de FK)
-        for category in categories:
-            db.delete(category)
+        # DELETE em massa direto no banco, sem carregar as linhas na sessão.
+        # Recursos PRIMEIRO (eles têm FK para categorias), categorias DEPOIS
+        resources = db.execute(delete(Resource).where(Resource.tenant_id == tenant_id))
+        categories = db.execute(delete(ResourceCategory).where(ResourceCategory.tenant_id == tenant_id))
         
         db.commit()
-        logger.info(f"Deletados {len(resources)} recursos e {len(categories)} categorias do tenant_id={tenant_id}")
+        logger.info(f"Deletados {resources.rowcount} recursos e {categories.rowcount} categorias do tenant_id={tenant_id}")
         
     except Exception as e:
         db.rollback()
@@ -1,23 +1,42 @@
-import uuid
 from sqlalchemy import (
+    DDL,
     Boolean,
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     JSON,
+    event,
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from shared import uuid7
+
+# '{}' é convertido para jsonb pelo próprio Postgres (igual ao '{}'::jsonb das
+# migrações) e continua válido no SQLite dos testes; o insert não envia o valor
+EMPTY_JSON = text("'{}'")
 
 
 class ResourceCategory(Base):
     __tablename__ = "resource_categories"
+    __table_args__ = (
+        Index(
+            "ix_resource_categories_metadata_gin",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # listagem de categorias do tenant, filtrando as ativas
+        Index("ix_resource_categories_tenant_active", "tenant_id", "is_active"),
+    )
+    # created_at/updated_at (server_default/onupdate) voltam via RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
@@ -29,7 +48,7 @@ class ResourceCategory(Base):
         "metadata",
         JSONB().with_variant(JSON, "sqlite"),
         nullable=False,
-        default=dict,
+        server_default=EMPTY_JSON,
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -39,8 +58,35 @@ class ResourceCategory(Base):
 
 class Resource(Base):
     __tablename__ = "resources"
+    __table_args__ = (
+        # jsonb_path_ops: índice menor, atende só consultas de contenção (@>)
+        Index(
+            "ix_resources_attributes_gin",
+            "attributes",
+            postgresql_using="gin",
+            postgresql_ops={"attributes": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # jsonb_ops padrão: a grade é consultada também por chave (? 'monday', ? 'schedule')
+        Index(
+            "ix_resources_availability_schedule_gin",
+            "availability_schedule",
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        # listagem paginada por keyset: WHERE tenant (e categoria) + ORDER BY name, id
+        # na ordem do índice, sem sort em memória
+        Index("ix_resources_tenant_name_id", "tenant_id", "name", "id"),
+        Index("ix_resources_tenant_category_name_id", "tenant_id", "category_id", "name", "id"),
+        # ILIKE '%busca%' no nome (pg_trgm)
+        Index(
+            "ix_resources_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     category_id = Column(UUID(as_uuid=True), ForeignKey("resource_categories.id", ondelete="RESTRICT"), nullable=False)
     name = Column(String, nullable=False)
@@ -48,14 +94,22 @@ class Resource(Base):
     status = Column(String, nullable=False, default="disponivel")
     capacity = Column(Integer, nullable=True)
     location = Column(String, nullable=True)
-    attributes = Column(JSONB().with_variant(JSON, "sqlite"), nullable=False, default=dict)
+    attributes = Column(JSONB().with_variant(JSON, "sqlite"), nullable=False, server_default=EMPTY_JSON)
     availability_schedule = Column(
         JSONB().with_variant(JSON, "sqlite"),
         nullable=False,
-        default=dict,
+        server_default=EMPTY_JSON,
     )
     image_url = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     category = relationship("ResourceCategory", back_populates="resources")
+
+
+# pg_trgm fornece o gin_trgm_ops do ix_resources_name_trgm
+event.listen(
+    Resource.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -1,7 +1,13 @@
-from typing import List, Optional
+from typing import List, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from app.core.auth_dependencies import get_current_token, TokenPayload
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from app.core.auth_dependencies import (
+    TokenPayload,
+    ensure_same_tenant,
+    get_current_token,
+    require_admin,
+    require_admin_same_tenant,
+)
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -24,27 +30,17 @@ async def criar_categoria(
     categoria: ResourceCategoryCreate,
     request: Request,
     db: Session = Depends(get_db),
-    current_token: TokenPayload = Depends(get_current_token),
+    current_token: TokenPayload = Depends(require_admin("criar categorias")),
 ):
-    # só admin pode criar categoria
-    if current_token.user_type != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Somente administradores podem criar categorias",
-        )
-
     # categoria só pode ser criada no mesmo tenant do usuário
-    if current_token.tenant_id != categoria.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não pode criar categorias para outro tenant",
-        )
+    ensure_same_tenant(current_token, categoria.tenant_id, "Você não pode criar categorias para outro tenant")
 
     tenant_service_url = request.app.state.tenant_service_url
 
     await validar_tenant_existe(
         tenant_service_url,
         str(categoria.tenant_id),
+        cache=request.app.state.tenant_cache,
     )
 
     return crud.criar_categoria(db, categoria)
@@ -52,39 +48,18 @@ async def criar_categoria(
 
 @router.get("/", response_model=List[ResourceCategoryOut])
 def listar_categorias(
-    tenant_id: Optional[UUID] = Query(
-        default=None,
-        description="Tenant a filtrar",
+    # sem tenant_id na query assume o tenant do usuário logado; outro tenant é bloqueado
+    token_tenant: Tuple[TokenPayload, UUID] = Depends(
+        require_admin_same_tenant(
+            "listar categorias",
+            "Você não tem permissão para listar categorias de outro tenant",
+        )
     ),
     db: Session = Depends(get_db),
-    current_token: TokenPayload = Depends(get_current_token),
 ):
-    # só admin pode listar categorias
-    if current_token.user_type != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Somente administradores podem listar categorias",
-        )
-
-    # se não vier tenant_id, assume o tenant do usuário logado
-    if tenant_id is None:
-        tenant_id = current_token.tenant_id
-    # se vier tenant_id diferente, bloqueia
-    elif tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para listar categorias de outro tenant",
-        )
-
-    categorias = crud.listar_categorias(db, tenant_id)
-
-    if not categorias:
-        raise HTTPException(
-            status_code=404,
-            detail="Não existem categorias para este Tenant ou ele não existe",
-        )
-
-    return categorias
+    _, tenant_id = token_tenant
+    # tenant sem categorias devolve 200 com lista vazia (o tenant já é o do token)
+    return crud.listar_categorias(db, tenant_id)
 
 
 @router.get("/{categoria_id}", response_model=ResourceCategoryOut)
@@ -98,11 +73,7 @@ def obter_categoria(
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
     # admin ou user pode ver, mas só se for do mesmo tenant
-    if categoria.tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para acessar esta categoria",
-        )
+    ensure_same_tenant(current_token, categoria.tenant_id, "Você não tem permissão para acessar esta categoria")
 
     return categoria
 
@@ -112,28 +83,16 @@ def atualizar_categoria(
     categoria_id: UUID,
     categoria_update: ResourceCategoryUpdate,
     db: Session = Depends(get_db),
-    current_token: TokenPayload = Depends(get_current_token),
+    current_token: TokenPayload = Depends(require_admin("atualizar categorias")),
 ):
-    # Só admin pode atualizar categoria
-    if current_token.user_type != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Somente administradores podem atualizar categorias",
-        )
-
-    # Primeiro busca para validar tenant
-    categoria_existente = crud.buscar_categoria(db, categoria_id)
-    if not categoria_existente:
-        raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
-    if categoria_existente.tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para atualizar esta categoria",
-        )
-
-    categoria = crud.atualizar_categoria(db, categoria_id, categoria_update)
+    # UPDATE ... RETURNING já restrito ao tenant do token; o SELECT só roda
+    # quando nada casa, para separar 404 de 403
+    categoria = crud.atualizar_categoria(db, categoria_id, categoria_update, tenant_id=current_token.tenant_id)
     if not categoria:
+        categoria_existente = crud.buscar_categoria(db, categoria_id)
+        if categoria_existente:
+            ensure_same_tenant(current_token, categoria_existente.tenant_id, "Você não tem permissão para atualizar esta categoria")
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
     return categoria
@@ -143,27 +102,13 @@ def atualizar_categoria(
 def deletar_categoria(
     categoria_id: UUID,
     db: Session = Depends(get_db),
-    current_token: TokenPayload = Depends(get_current_token),
+    current_token: TokenPayload = Depends(require_admin("deletar categorias")),
 ):
-    # Só admin pode deletar categoria
-    if current_token.user_type != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Somente administradores podem deletar categorias",
-        )
-
-    categoria_existente = crud.buscar_categoria(db, categoria_id)
-    if not categoria_existente:
-        raise HTTPException(status_code=404, detail="Categoria não encontrada")
-
-    if categoria_existente.tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para deletar esta categoria",
-        )
-
-    categoria = crud.deletar_categoria(db, categoria_id)
-    if not categoria:
+    # DELETE ... RETURNING restrito ao tenant do token; SELECT só para separar 404 de 403
+    if not crud.deletar_categoria(db, categoria_id, tenant_id=current_token.tenant_id):
+        categoria_existente = crud.buscar_categoria(db, categoria_id)
+        if categoria_existente:
+            ensure_same_tenant(current_token, categoria_existente.tenant_id, "Você não tem permissão para deletar esta categoria")
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
     return None
\ No newline at end of file
@@ -1,6 +1,10 @@
-from typing import Optional
+import base64
+import json
+from typing import List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.orm import Session, defer, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.resource import ResourceCategory, Resource
 from app.schemas.resource_schema import (
     ResourceCategoryCreate,
@@ -23,7 +27,6 @@ def criar_categoria(db: Session, categoria: ResourceCategoryCreate) -> ResourceC
     )
     db.add(nova_categoria)
     db.commit()
-    db.refresh(nova_categoria)
     return nova_categoria
 
 
@@ -35,40 +38,32 @@ def listar_categorias(db: Session, tenant_id: Optional[UUID] = None):
 
 
 def buscar_categoria(db: Session, categoria_id: UUID) -> Optional[ResourceCategory]:
-    return (
-        db.query(ResourceCategory)
-        .options(joinedload(ResourceCategory.resources))
-        .filter(ResourceCategory.id == categoria_id)
-        .first()
-    )
+    # Só a linha da categoria: nenhum chamador usa a coleção resources (update e
+    # delete são UPDATE/DELETE diretos). Na criação de recurso, este mesmo objeto
+    # serve a categoria da resposta sem outro SELECT. db.get consulta o
+    # identity map antes de ir ao banco
+    return db.get(ResourceCategory, categoria_id, options=[raiseload("*")])
 
 
 def atualizar_categoria(
-    db: Session, categoria_id: UUID, categoria_update: ResourceCategoryUpdate
+    db: Session,
+    categoria_id: UUID,
+    categoria_update: ResourceCategoryUpdate,
+    tenant_id: Optional[UUID] = None,
 ) -> Optional[ResourceCategory]:
-    categoria = buscar_categoria(db, categoria_id)
-    if not categoria:
-        return None
-
-    for campo, valor in categoria_update.model_dump(exclude_unset=True).items():
-        setattr(categoria, campo, valor)
-
-    db.commit()
-    db.refresh(categoria)
-    return categoria
-
+    return _atualizar_retornando(db, ResourceCategory, categoria_id, _campos_enviados(categoria_update), tenant_id)
 
-def deletar_categoria(db: Session, categoria_id: UUID) -> Optional[ResourceCategory]:
-    categoria = buscar_categoria(db, categoria_id)
-    if not categoria:
-        return None
 
-    db.delete(categoria)
-    db.commit()
-    return categoria
+def deletar_categoria(
+    db: Session, categoria_id: UUID, tenant_id: Optional[UUID] = None
+) -> Optional[UUID]:
+    """DELETE ... RETURNING: devolve o tenant da categoria removida, ou None."""
+    return _deletar_retornando(db, ResourceCategory, categoria_id, tenant_id)
 
 
-def criar_recurso(db: Session, recurso: ResourceCreate) -> Resource:
+def criar_recurso(
+    db: Session, recurso: ResourceCreate, categoria: Optional[ResourceCategory] = None
+) -> Resource:
     novo_recurso = Resource(
         tenant_id=recurso.tenant_id,
         category_id=recurso.category_id,
@@ -81,20 +76,52 @@ def criar_recurso(db: Session, recurso: ResourceCreate) -> Resource:
         availability_schedule=recurso.availability_schedule,
         image_url=str(recurso.image_url) if recurso.image_url else None,
     )
+    if categoria is not None:
+        # categoria já validada pela rota: vai para a resposta sem lazy load
+        # (e sem o backref carregar categoria.resources)
+        set_committed_value(novo_recurso, "category", categoria)
     db.add(novo_recurso)
     db.commit()
-    db.refresh(novo_recurso)
     return novo_recurso
 
 
+def _escapar_like(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def codificar_cursor(recurso: Resource) -> str:
+    """Cursor opaco da paginação: (name, id) do último item da página."""
+    raw = json.dumps([recurso.name, str(recurso.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decodificar_cursor(cursor: str) -> Tuple[str, UUID]:
+    """Inverso de codificar_cursor; ValueError se o cursor não veio daqui."""
+    try:
+        name, recurso_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), UUID(recurso_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("cursor inválido") from exc
+
+
 def listar_recursos(
     db: Session,
     tenant_id: Optional[UUID] = None,
     category_id: Optional[UUID] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
-):
-    query = db.query(Resource).options(joinedload(Resource.category))
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Resource], Optional[str]]:
+    """Uma página ordenada por (name, id) e o cursor da próxima (None na última)."""
+    # a listagem (ResourceListOut) não serializa a categoria nem os JSONB: nada
+    # além das colunas leves dos recursos. raiseload faz qualquer carga esquecida
+    # (N+1) estourar em vez de virar uma query por linha
+    query = db.query(Resource).options(
+        defer(Resource.attributes, raiseload=True),
+        defer(Resource.availability_schedule, raiseload=True),
+        raiseload("*"),
+    )
 
     if tenant_id:
         query = query.filter(Resource.tenant_id == tenant_id)
@@ -103,53 +130,105 @@ def listar_recursos(
     if status:
         query = query.filter(Resource.status == status)
     if search:
-        like_pattern = f"%{search}%"
-        query = query.filter(Resource.name.ilike(like_pattern))
+        # ILIKE continua (o ix_resources_name_trgm, gin_trgm_ops, atende) e a
+        # ordenação por (name, id) da paginação não muda; % e _ digitados na
+        # busca são literais, senão "%" viraria um scan da tabela inteira
+        query = query.filter(Resource.name.ilike(f"%{_escapar_like(search)}%", escape="\\"))
+    if cursor:
+        # keyset: continua depois do último (name, id) sem OFFSET
+        query = query.filter(tuple_(Resource.name, Resource.id) > decodificar_cursor(cursor))
 
-    return query.order_by(Resource.name.asc()).all()
+    # um a mais só para saber se existe próxima página
+    recursos = query.order_by(Resource.name.asc(), Resource.id.asc()).limit(limit + 1).all()
+    if len(recursos) > limit:
+        return recursos[:limit], codificar_cursor(recursos[limit - 1])
+    return recursos, None
 
 
 def buscar_recurso(db: Session, recurso_id: UUID) -> Optional[Resource]:
+    # db.get: sai do identity map sem SQL quando o recurso já foi carregado na sessão
+    return db.get(Resource, recurso_id, options=[joinedload(Resource.category), raiseload("*")])
+
+
+def buscar_recurso_do_tenant(
+    db: Session, recurso_id: UUID, tenant_id: UUID, com_categoria: bool = False
+) -> Optional[Resource]:
+    # tenant no WHERE: recurso de outro tenant não é carregado (nem a categoria)
+    options = [joinedload(Resource.category)] if com_categoria else []
     return (
         db.query(Resource)
-        .options(joinedload(Resource.category))
-        .filter(Resource.id == recurso_id)
+        .options(*options, raiseload("*"))
+        .filter(Resource.id == recurso_id, Resource.tenant_id == tenant_id)
         .first()
     )
 
 
+def recurso_existe(db: Session, recurso_id: UUID) -> bool:
+    # só a PK (index-only); separa 404 de 403 quando a busca do tenant não acha nada
+    return db.query(Resource.id).filter(Resource.id == recurso_id).first() is not None
+
+
 def atualizar_recurso(
-    db: Session, recurso_id: UUID, recurso_update: ResourceUpdate
+    db: Session,
+    recurso_id: UUID,
+    recurso_update: ResourceUpdate,
+    tenant_id: Optional[UUID] = None,
 ) -> Optional[Resource]:
-    recurso = buscar_recurso(db, recurso_id)
-    if not recurso:
-        return None
-
-    update_data = recurso_update.model_dump(exclude_unset=True)
-    if "image_url" in update_data and update_data["image_url"] is not None:
+    update_data = _campos_enviados(recurso_update)
+    if update_data.get("image_url") is not None:
         update_data["image_url"] = str(update_data["image_url"])
 
-    for campo, valor in update_data.items():
-        setattr(recurso, campo, valor)
+    return _atualizar_retornando(
+        db, Resource, recurso_id, update_data, tenant_id, selectinload(Resource.category)
+    )
 
-    db.commit()
-    db.refresh(recurso)
-    return recurso
 
+def _campos_enviados(payload) -> dict:
+    # Só os campos presentes no corpo, lidos direto dos atributos: sem o
+    # model_dump(exclude_unset=True) percorrer e copiar o modelo inteiro
+    return {campo: getattr(payload, campo) for campo in payload.model_fields_set}
 
-def deletar_recurso(db: Session, recurso_id: UUID, publisher=None) -> Optional[Resource]:
-    recurso = buscar_recurso(db, recurso_id)
-    if not recurso:
-        return None
 
-    # Publicar evento ANTES de deletar para outros serviços reagirem
-    if publisher:
+def _atualizar_retornando(db: Session, model, obj_id: UUID, valores: dict, tenant_id: Optional[UUID], *options):
+    """
+    UPDATE ... RETURNING numa ida só ao banco (sem SELECT antes nem depois).
+    Com tenant_id, linha de outro tenant conta como não encontrada (None).
+    """
+    filtros = [model.id == obj_id]
+    if tenant_id:
+        filtros.append(model.tenant_id == tenant_id)
+
+    if valores:
+        stmt = update(model).where(*filtros).values(**valores).returning(model)
+    else:
+        # nada a alterar: só devolve o registro atual
+        stmt = select(model).where(*filtros)
+
+    obj = db.execute(stmt.options(*options, raiseload("*"))).scalar_one_or_none()
+    db.commit()
+    return obj
+
+
+def deletar_recurso(
+    db: Session, recurso_id: UUID, publisher=None, tenant_id: Optional[UUID] = None
+) -> Optional[UUID]:
+    """DELETE ... RETURNING: devolve o tenant do recurso removido, ou None."""
+    tenant_do_recurso = _deletar_retornando(db, Resource, recurso_id, tenant_id)
+    if tenant_do_recurso and publisher:
         payload = {
             "resource_id": str(recurso_id),
-            "tenant_id": str(recurso.tenant_id),
+            "tenant_id": str(tenant_do_recurso),
         }
-        publisher.publish("resource.deleted", payload)
+        # enfileira: o envio sai em lote numa thread do publisher, sem I/O na requisição
+        publisher.enqueue("resource.deleted", payload)
+    return tenant_do_recurso
 
-    db.delete(recurso)
+
+def _deletar_retornando(db: Session, model, obj_id: UUID, tenant_id: Optional[UUID]) -> Optional[UUID]:
+    # Apaga e confere a existência (e o tenant) no mesmo statement, sem SELECT antes
+    stmt = delete(model).where(model.id == obj_id)
+    if tenant_id:
+        stmt = stmt.where(model.tenant_id == tenant_id)
+    tenant_removido = db.execute(stmt.returning(model.tenant_id)).scalar_one_or_none()
     db.commit()
-    return recurso
+    return tenant_removido
@@ -1,17 +1,59 @@
+import asyncio
 from datetime import date
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.schemas.resource_schema import (ResourceAvailabilityResponse,ResourceCreate,ResourceOut,ResourceUpdate)
-from app.services.availability import compute_availability
+from app.schemas.resource_schema import (ResourceAvailabilityResponse,ResourceCreate,ResourceListPage,ResourceOut,ResourceUpdate)
+from app.services.availability import compute_availability, compute_availability_range
 from app.services.tenant_validator import validar_tenant_existe
 from . import crud
 from app.core.auth_dependencies import get_current_token, TokenPayload, oauth2_scheme
 
 router = APIRouter(tags=["Resources"])
 
+# Teto do ?limit= da listagem (paginação por keyset)
+MAX_PAGE_SIZE = 200
+
+# Maior período aceito na consulta de disponibilidade por intervalo de datas
+MAX_AVAILABILITY_RANGE_DAYS = 31
+
+
+def _erro_recurso_inacessivel(db: Session, recurso_id: UUID, detail: str) -> HTTPException:
+    """404 se o recurso não existe; 403 (com ``detail``) se é de outro tenant."""
+    if crud.recurso_existe(db, recurso_id):
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+    return HTTPException(status_code=404, detail="Recurso não encontrado")
+
+
+def _pagina_response(recursos, next_cursor: Optional[str]) -> Response:
+    # Valida e serializa aqui, na thread da própria rota (sync): com o retorno
+    # cru, o FastAPI validaria o response_model em outro hop de threadpool.
+    # model_dump_json serializa direto no core (Rust) do Pydantic
+    pagina = ResourceListPage.model_validate(
+        {"items": recursos, "next_cursor": next_cursor},
+        from_attributes=True,
+    )
+    return Response(content=pagina.model_dump_json(), media_type="application/json")
+
+
+def _parse_data(valor: str) -> date:
+    try:
+        return date.fromisoformat(valor)
+    except ValueError as exc:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            "Data inválida. Use o formato YYYY-MM-DD.",
+        ) from exc
+
+
+def _invalidar_disponibilidade(request: Request, recurso_id: UUID) -> None:
+    cache = request.app.state.availability_cache
+    if cache:
+        cache.invalidate_resource(recurso_id)
+
 
 @router.post(
     "/", 
@@ -39,12 +81,23 @@ async def criar_recurso(
 
     tenant_service_url = request.app.state.tenant_service_url
 
-    await validar_tenant_existe(
-        tenant_service_url,
-        str(recurso.tenant_id),
+    # A chamada ao Tenant Service e o SELECT da categoria (numa thread, a sessão
+    # é síncrona) correm juntos. return_exceptions: as duas terminam antes de
+    # seguir, então a sessão nunca fica em uso depois de um erro; o erro do
+    # tenant continua tendo precedência, como na ordem sequencial
+    tenant_ou_erro, categoria = await asyncio.gather(
+        validar_tenant_existe(
+            tenant_service_url,
+            str(recurso.tenant_id),
+            cache=request.app.state.tenant_cache,
+        ),
+        run_in_threadpool(crud.buscar_categoria, db, recurso.category_id),
+        return_exceptions=True,
     )
+    for resultado in (tenant_ou_erro, categoria):
+        if isinstance(resultado, BaseException):
+            raise resultado
 
-    categoria = crud.buscar_categoria(db, recurso.category_id)
     if not categoria:
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
@@ -54,15 +107,18 @@ async def criar_recurso(
             detail="Você não pode usar uma categoria de outro tenant.",
         )
 
-    return crud.criar_recurso(db, recurso)
+    # INSERT + COMMIT também vão para o threadpool: a sessão é síncrona
+    return await run_in_threadpool(crud.criar_recurso, db, recurso, categoria)
 
 
-@router.get("/", response_model=List[ResourceOut])
+@router.get("/", response_model=ResourceListPage)
 def listar_recursos(
     tenant_id: Optional[UUID] = Query(default=None),
     category_id: Optional[UUID] = Query(default=None),
     status_param: Optional[str] = Query(default=None, alias="status"),
     search: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None, description="next_cursor da página anterior"),
     db: Session = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
 ):
@@ -76,25 +132,15 @@ def listar_recursos(
                 detail="Você não tem permissão para listar recursos de outro tenant.",
             )
 
-    recursos = crud.listar_recursos(db, tenant_id, category_id, status_param, search)
-
-    if not recursos and category_id:
-        raise HTTPException(
-            status_code=404,
-            detail="Não foram encontrados Recursos nesta categoria",
-        )
-    if not recursos and tenant_id:
-        raise HTTPException(
-            status_code=404,
-            detail="Não foram encontrados Recursos neste Tenant",
-        )
-    if not recursos:
-        raise HTTPException(
-            status_code=404,
-            detail="Não foram encontrados Recursos",
+    try:
+        recursos, next_cursor = crud.listar_recursos(
+            db, tenant_id, category_id, status_param, search, limit=limit, cursor=cursor
         )
+    except ValueError as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Cursor de paginação inválido.") from exc
 
-    return recursos
+    # nada encontrado é uma página vazia, não 404 (como na listagem de categorias)
+    return _pagina_response(recursos, next_cursor)
 
 
 @router.get("/{recurso_id}", response_model=ResourceOut)
@@ -104,15 +150,9 @@ def obter_recurso(
     current_token: TokenPayload = Depends(get_current_token),
 ):
 
-    recurso = crud.buscar_recurso(db, recurso_id)
+    recurso = crud.buscar_recurso_do_tenant(db, recurso_id, current_token.tenant_id, com_categoria=True)
     if not recurso:
-        raise HTTPException(status_code=404, detail="Recurso não encontrado")
-
-    if recurso.tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para acessar este recurso.",
-        )
+        raise _erro_recurso_inacessivel(db, recurso_id, "Você não tem permissão para acessar este recurso.")
 
     return recurso
 
@@ -121,29 +161,25 @@ def obter_recurso(
 def atualizar_recurso(
     recurso_id: UUID,
     recurso_update: ResourceUpdate,
+    request: Request,
     db: Session = Depends(get_db),
     current_token: TokenPayload = Depends(get_current_token),
 ):
     
-    recurso_atual = crud.buscar_recurso(db, recurso_id)
-    if not recurso_atual:
-        raise HTTPException(status_code=404, detail="Recurso não encontrado")
-
     if current_token.user_type != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Apenas administradores podem atualizar recursos.",
         )
 
-    if recurso_atual.tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para atualizar recursos de outro tenant.",
-        )
-
-    recurso = crud.atualizar_recurso(db, recurso_id, recurso_update)
+    # UPDATE ... RETURNING já restrito ao tenant do token; só quando nada casa
+    # é que um SELECT separa "não existe" de "é de outro tenant"
+    recurso = crud.atualizar_recurso(db, recurso_id, recurso_update, tenant_id=current_token.tenant_id)
     if not recurso:
-        raise HTTPException(status_code=404, detail="Recurso não encontrado")
+        raise _erro_recurso_inacessivel(db, recurso_id, "Você não tem permissão para atualizar recursos de outro tenant.")
+
+    # status e grade de horários entram no cálculo da disponibilidade
+    _invalidar_disponibilidade(request, recurso_id)
 
     return recurso
 
@@ -156,36 +192,30 @@ def deletar_recurso(
     current_token: TokenPayload = Depends(get_current_token),
 ):
 
-    recurso_atual = crud.buscar_recurso(db, recurso_id)
-    if not recurso_atual:
-        raise HTTPException(status_code=404, detail="Recurso não encontrado")
-
     if current_token.user_type != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Apenas administradores podem deletar recursos.",
         )
 
-    if recurso_atual.tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para deletar recursos de outro tenant.",
-        )
+    # DELETE ... RETURNING restrito ao tenant do token; o evento resource.deleted
+    # sai do crud já com o tenant devolvido pelo próprio DELETE
+    removido = crud.deletar_recurso(
+        db,
+        recurso_id,
+        publisher=request.app.state.event_publisher,
+        tenant_id=current_token.tenant_id,
+    )
+    if not removido:
+        raise _erro_recurso_inacessivel(db, recurso_id, "Você não tem permissão para deletar recursos de outro tenant.")
+
+    _invalidar_disponibilidade(request, recurso_id)
 
-    recurso = crud.deletar_recurso(db, recurso_id)
-    if not recurso:
-        raise HTTPException(status_code=404, detail="Recurso não encontrado")
-    
-    # Publicar evento de deleção de recurso
-    publisher = request.app.state.event_publisher
-    if publisher:
-        publisher.publish("resource.deleted", {"resource_id": str(recurso_id)})
-    
     return None
 
 
 @router.get("/{recurso_id}/availability", response_model=ResourceAvailabilityResponse)
-def consultar_disponibilidade(
+async def consultar_disponibilidade(
     recurso_id: UUID,
     request: Request,
     data: str = Query(..., description="Data da consulta no formato YYYY-MM-DD"),
@@ -193,29 +223,80 @@ def consultar_disponibilidade(
     current_token: TokenPayload = Depends(get_current_token),
     raw_token: str = Depends(oauth2_scheme),
 ):
-    recurso = crud.buscar_recurso(db, recurso_id)
+    target_date = _parse_data(data)
+
+    # Cache de curta duração (TTL de 60s) invalidado pelos eventos booking.* e
+    # pelas alterações do recurso. A chave leva o tenant do token e só é gravada
+    # depois da checagem de tenant abaixo, então um hit já está autorizado: sai
+    # sem SELECT e com o JSON guardado como veio (sem decodificar nem validar).
+    # Só admins usam o cache: para os demais o Booking Service devolve apenas as
+    # reservas do próprio usuário, e a chave não distingue quem consultou.
+    # Redis e Session são síncronos: rodam no threadpool, fora do event loop
+    cache = request.app.state.availability_cache if current_token.user_type == "admin" else None
+    if cache:
+        cached = await run_in_threadpool(cache.get, current_token.tenant_id, recurso_id, target_date)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+    # a resposta não usa a categoria: só a linha do recurso, já filtrada pelo tenant
+    recurso = await run_in_threadpool(crud.buscar_recurso_do_tenant, db, recurso_id, current_token.tenant_id)
     if not recurso:
-        raise HTTPException(status_code=404, detail="Recurso não encontrado")
-
-    if recurso.tenant_id != current_token.tenant_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Você não tem permissão para consultar disponibilidade deste recurso.",
+        raise await run_in_threadpool(
+            _erro_recurso_inacessivel,
+            db,
+            recurso_id,
+            "Você não tem permissão para consultar disponibilidade deste recurso.",
         )
 
-    try:
-        target_date = date.fromisoformat(data)
-    except ValueError as exc:
+    result = await compute_availability(
+        app_state=request.app.state,
+        db_session=db,
+        resource_id=recurso_id,
+        resource=recurso,
+        target_date=target_date,
+        auth_token=raw_token,
+    )
+    body = ResourceAvailabilityResponse.model_validate(result).model_dump_json()
+    if cache:
+        await run_in_threadpool(cache.set, recurso.tenant_id, recurso_id, target_date, body)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{recurso_id}/availability/range", response_model=List[ResourceAvailabilityResponse])
+async def consultar_disponibilidade_periodo(
+    recurso_id: UUID,
+    request: Request,
+    data_inicio: str = Query(..., description="Primeiro dia do período (YYYY-MM-DD)"),
+    data_fim: str = Query(..., description="Último dia do período, inclusive (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_token: TokenPayload = Depends(get_current_token),
+    raw_token: str = Depends(oauth2_scheme),
+):
+    # Calendário de vários dias com uma única consulta ao Booking Service, em vez
+    # de uma chamada por dia. Não passa pelo cache por dia da rota acima.
+    start_date = _parse_data(data_inicio)
+    end_date = _parse_data(data_fim)
+    if (end_date - start_date).days >= MAX_AVAILABILITY_RANGE_DAYS:
         raise HTTPException(
             status.HTTP_400_BAD_REQUEST,
-            "Data inválida. Use o formato YYYY-MM-DD.",
-        ) from exc
+            f"Período limitado a {MAX_AVAILABILITY_RANGE_DAYS} dias.",
+        )
 
-    result = compute_availability(
+    recurso = await run_in_threadpool(crud.buscar_recurso_do_tenant, db, recurso_id, current_token.tenant_id)
+    if not recurso:
+        raise await run_in_threadpool(
+            _erro_recurso_inacessivel,
+            db,
+            recurso_id,
+            "Você não tem permissão para consultar disponibilidade deste recurso.",
+        )
+
+    return await compute_availability_range(
         app_state=request.app.state,
         db_session=db,
         resource_id=recurso_id,
-        target_date=target_date,
+        resource=recurso,
+        start_date=start_date,
+        end_date=end_date,
         auth_token=raw_token,
     )
-    return result
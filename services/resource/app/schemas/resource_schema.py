@@ -1,9 +1,14 @@
 from datetime import date, datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 
 
+# Literal: validação por comparação direta no pydantic-core, sem regex
+CategoryType = Literal["fisico", "humano"]
+ResourceStatus = Literal["disponivel", "manutencao", "indisponivel"]
+
+
 class CategoryCustomField(BaseModel):
     key: str
     type: str = Field(..., description="Tipo do campo customizado, ex: string, number")
@@ -14,7 +19,7 @@ class ResourceCategoryBase(BaseModel):
     tenant_id: UUID = Field(..., examples=["550e8400-e29b-41d4-a716-446655440000"])
     name: str = Field(..., examples=["Sala de Reunião"])
     description: Optional[str] = Field(default=None, examples=["Salas para reuniões e apresentações"])
-    type: str = Field(..., pattern="^(fisico|humano)$", examples=["fisico"])
+    type: CategoryType = Field(..., examples=["fisico"])
     icon: Optional[str] = Field(default=None, examples=["meeting_room"])
     color: Optional[str] = Field(default=None, examples=["#3B82F6"])
     is_active: bool = Field(default=True, examples=[True])
@@ -32,7 +37,7 @@ class ResourceCategoryCreate(ResourceCategoryBase):
 class ResourceCategoryUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    type: Optional[str] = Field(default=None, pattern="^(fisico|humano)")
+    type: Optional[CategoryType] = None
     icon: Optional[str] = None
     color: Optional[str] = None
     is_active: Optional[bool] = None
@@ -47,17 +52,20 @@ class ResourceCategoryOut(ResourceCategoryBase):
     model_config = ConfigDict(from_attributes=True)
 
 
-class ResourceBase(BaseModel):
+class ResourceSummaryBase(BaseModel):
     tenant_id: UUID = Field(..., examples=["550e8400-e29b-41d4-a716-446655440000"])
     category_id: UUID = Field(..., examples=["660e8400-e29b-41d4-a716-446655440001"])
     name: str = Field(..., examples=["Sala 101"])
     description: Optional[str] = Field(default=None, examples=["Sala com capacidade para 10 pessoas"])
-    status: str = Field(default="disponivel", pattern="^(disponivel|manutencao|indisponivel)$", examples=["disponivel"])
+    status: ResourceStatus = Field(default="disponivel", examples=["disponivel"])
     capacity: Optional[int] = Field(default=None, ge=1, examples=[10])
     location: Optional[str] = Field(default=None, examples=["1º andar, ala oeste"])
+    image_url: Optional[HttpUrl] = Field(default=None, examples=["https://exemplo.com/sala101.jpg"])
+
+
+class ResourceBase(ResourceSummaryBase):
     attributes: Dict[str, Any] = Field(default_factory=dict, examples=[{"projetor": True, "ar_condicionado": True}])
     availability_schedule: Dict[str, Any] = Field(default_factory=dict, examples=[{"monday": ["09:00-18:00"], "friday": ["09:00-17:00"]}])
-    image_url: Optional[HttpUrl] = Field(default=None, examples=["https://exemplo.com/sala101.jpg"])
 
 
 class ResourceCreate(ResourceBase):
@@ -67,7 +75,7 @@ class ResourceCreate(ResourceBase):
 class ResourceUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
-    status: Optional[str] = Field(default=None, pattern="^(disponivel|manutencao|indisponivel)$")
+    status: Optional[ResourceStatus] = None
     capacity: Optional[int] = Field(default=None, ge=1)
     location: Optional[str] = None
     attributes: Optional[Dict[str, Any]] = None
@@ -75,6 +83,24 @@ class ResourceUpdate(BaseModel):
     image_url: Optional[HttpUrl] = None
 
 
+class ResourceListOut(ResourceSummaryBase):
+    """Item da listagem: sem a categoria aninhada e sem os JSONB (attributes/grade)."""
+
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ResourceListPage(BaseModel):
+    items: List[ResourceListOut]
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Passe em ?cursor= para a próxima página; null na última",
+    )
+
+
 class ResourceOut(ResourceBase):
     id: UUID
     created_at: datetime
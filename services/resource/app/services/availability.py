@@ -1,22 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+from bisect import bisect_left
 from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from itertools import accumulate
+from math import ceil
 from typing import Iterable, List
 from uuid import UUID
 
 import httpx
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json
+from typing_extensions import TypedDict
 
 from shared import (
     OrganizationSettings,
+    PooledAsyncClient,
     SettingsProvider,
-    ensure_timezone,
     resolve_settings_provider,
+    resolve_zone,
 )
 
 from app.routers import crud
 
+logger = logging.getLogger(__name__)
+
 _WEEKDAY_KEYS = [
     "monday",
     "tuesday",
@@ -27,24 +40,64 @@ _WEEKDAY_KEYS = [
     "sunday",
 ]
 
+# Cliente único por processo: o pool mantém as conexões keep-alive com o
+# Booking Service, sem um handshake TCP/TLS a cada consulta de disponibilidade
+BOOKING_CLIENT = PooledAsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    timeout=2.0,
+    follow_redirects=True,
+)
 
-class AvailabilitySlot:
-    __slots__ = ("start", "end")
 
-    def __init__(self, start: datetime, end: datetime) -> None:
-        self.start = start
-        self.end = end
+def _build_bookings_url(base_url: str | None) -> str | None:
+    if not base_url:
+        return None
+    base = base_url.rstrip("/")
+    if base.endswith("/bookings"):
+        return base + "/"
+    return base + "/bookings/"
+
+
+# URL da listagem de reservas montada uma vez, na importação
+_BOOKINGS_URL = _build_bookings_url(os.getenv("BOOKING_SERVICE_URL"))
+
+# Maior deslocamento de fuso existente (UTC+14 / UTC-12): a janela de reservas em
+# UTC cobre o dia em qualquer fuso, sem esperar pelas configurações do tenant
+_MAX_UTC_OFFSET = timedelta(hours=14)
+
+
+class _BookingTimes(TypedDict):
+    start_time: datetime
+    end_time: datetime
+
+
+# JSON e datas ISO 8601 ("Z", offset ou sem tz) interpretados numa só passada no
+# pydantic-core (Rust); os demais campos das reservas são ignorados
+_BOOKING_LIST_ADAPTER = TypeAdapter(list[_BookingTimes])
+_BOOKING_ADAPTER = TypeAdapter(_BookingTimes)
 
-    def model_dump(self) -> dict:
-        return {
-            "start_time": self.start.isoformat(),
-            "end_time": self.end.isoformat(),
-        }
 
+def _slot_payload(start: int, end: int, zone) -> dict:
+    return {
+        "start_time": datetime.fromtimestamp(start, zone).isoformat(),
+        "end_time": datetime.fromtimestamp(end, zone).isoformat(),
+    }
 
+
+# Os horários de um recurso quase nunca mudam: cada string já interpretada vem
+# do cache. Exceções (configuração inválida) não são memorizadas.
+@lru_cache(maxsize=512)
 def _parse_schedule_entry(entry: str) -> tuple[time, time]:
     try:
         start_raw, end_raw = entry.split("-", maxsplit=1)
+    except ValueError as exc:
+        raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR, "Disponibilidade inválida configurada.") from exc
+    return _parse_time_range(start_raw, end_raw)
+
+
+@lru_cache(maxsize=512)
+def _parse_time_range(start_raw: str, end_raw: str) -> tuple[time, time]:
+    try:
         start_time = time.fromisoformat(start_raw)
         end_time = time.fromisoformat(end_raw)
     except ValueError as exc:
@@ -54,63 +107,73 @@ def _parse_schedule_entry(entry: str) -> tuple[time, time]:
     return start_time, end_time
 
 
+def _time_ranges_for_day(availability_data: dict, weekday_index: int) -> List[tuple[time, time]]:
+    weekday_key = _WEEKDAY_KEYS[weekday_index]
+
+    # Formato antigo: {"monday": ["08:00-12:00", "13:00-16:00"], ...}
+    if weekday_key in availability_data:
+        # cada entry é uma string "HH:MM-HH:MM"
+        return [_parse_schedule_entry(entry) for entry in availability_data.get(weekday_key) or []]
+
+    # Formato novo: {"schedule": [{"day_of_week": 0, "start_time": "...", "end_time": "..."}, ...]}
+    time_ranges: List[tuple[time, time]] = []
+    for entry in availability_data.get("schedule") or []:
+        if entry.get("day_of_week") != weekday_index:
+            continue
+        try:
+            start_raw, end_raw = entry["start_time"], entry["end_time"]
+        except KeyError as exc:
+            raise HTTPException(
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "Disponibilidade inválida configurada.",
+            ) from exc
+        time_ranges.append(_parse_time_range(start_raw, end_raw))
+    return time_ranges
+
+
 def _generate_slots(
     base_day: date,
     start_time: time,
     end_time: time,
     settings: OrganizationSettings,
-) -> Iterable[AvailabilitySlot]:
+    zone,
+    now_boundary: float,
+) -> range:
+    """Inícios (segundos epoch) dos slots livres de horário no intervalo.
 
-    tz_name = settings.timezone
-    zone = ensure_timezone(datetime.combine(base_day, time.min), tz_name).tzinfo or timezone.utc
+    Os slots seguem a grade do expediente e começam a partir de agora; os
+    anteriores são pulados com uma conta, sem iterar sobre eles.
+    """
+    work_start = int(datetime.combine(base_day, settings.working_hours_start, tzinfo=zone).timestamp())
+    work_end = int(datetime.combine(base_day, settings.working_hours_end, tzinfo=zone).timestamp())
 
-    work_start = datetime.combine(base_day, settings.working_hours_start, tzinfo=zone)
-    work_end = datetime.combine(base_day, settings.working_hours_end, tzinfo=zone)
+    slot_start = max(int(datetime.combine(base_day, start_time, tzinfo=zone).timestamp()), work_start)
+    slot_end = min(int(datetime.combine(base_day, end_time, tzinfo=zone).timestamp()), work_end)
 
-    slot_start = datetime.combine(base_day, start_time, tzinfo=zone)
-    slot_end = datetime.combine(base_day, end_time, tzinfo=zone)
+    interval = settings.booking_interval * 60
 
-    if slot_start < work_start:
-        slot_start = work_start
-    if slot_end > work_end:
-        slot_end = work_end
+    # alinha à grade do expediente
+    cursor = slot_start + (work_start - slot_start) % interval
+    if cursor < now_boundary:
+        cursor += ceil((now_boundary - cursor) / interval) * interval
 
-    if slot_end <= slot_start:
-        return []
+    # vazio quando não cabe nenhum slot (inclusive slot_end <= slot_start)
+    return range(cursor, slot_end - interval + 1, interval)
 
-    interval = timedelta(minutes=settings.booking_interval)
-    now_boundary = datetime.now(zone)
 
-    cursor = slot_start
-    remainder = (cursor - work_start) % interval
-    if remainder:
-        cursor += interval - remainder
-
-    while cursor + interval <= slot_end:
-        if cursor >= now_boundary:
-            yield AvailabilitySlot(cursor, cursor + interval)
-        cursor += interval
-
-
-def _collect_existing_bookings(
+async def _fetch_existing_bookings(
     tenant_id: UUID,
     resource_id: UUID,
     start: datetime,
     end: datetime,
     auth_token: str | None = None,
-    tz_name: str | None = None,
-) -> List[tuple[datetime, datetime]]:
-    base_url = os.getenv("BOOKING_SERVICE_URL")
-    if not base_url:
-        print("[BOOKINGS] BOOKING_SERVICE_URL NÃO CONFIGURADA")
+) -> list[_BookingTimes]:
+    """Horários das reservas do Booking Service no intervalo; ``[]`` em caso de erro."""
+    url = _BOOKINGS_URL
+    if not url:
+        logger.warning("[BOOKINGS] BOOKING_SERVICE_URL não configurada")
         return []
 
-    base = base_url.rstrip("/")
-    if base.endswith("/bookings"):
-        url = base + "/"
-    else:
-        url = base + "/bookings/"
-
     params = {
         "tenant_id": str(tenant_id),
         "resource_id": str(resource_id),
@@ -122,190 +185,193 @@ def _collect_existing_bookings(
     if auth_token:
         headers["Authorization"] = f"Bearer {auth_token}"
 
-    print("[BOOKINGS] Chamando:", url, "params=", params)
+    logger.debug("[BOOKINGS] Chamando %s params=%s", url, params)
 
     try:
-        response = httpx.get(
-            url,
-            params=params,
-            headers=headers,
-            timeout=2.0,
-            follow_redirects=True,
-        )
-        print("[BOOKINGS] status:", response.status_code)
-        print("[BOOKINGS] body:", response.text)
+        response = await BOOKING_CLIENT.get().get(url, params=params, headers=headers)
+        # response.text decodifica o corpo inteiro: só com DEBUG ligado
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[BOOKINGS] status=%s body=%s", response.status_code, response.text)
         response.raise_for_status()
+        # direto dos bytes, sem decodificar para str
+        return _validate_bookings(response.content)
     except Exception as e:
-        print("[BOOKINGS] ERRO AO CONSULTAR:", repr(e))
+        logger.warning("[BOOKINGS] Erro ao consultar o Booking Service: %r", e)
         return []
 
-    data = response.json()
 
-    bookings: list[tuple[datetime, datetime]] = []
-    for item in data:
-        try:
-            raw_start = str(item["start_time"])
-            raw_end = str(item["end_time"])
-
-            # se vier com "Z", trata como UTC direto
-            raw_start = raw_start.replace("Z", "+00:00")
-            raw_end = raw_end.replace("Z", "+00:00")
-
-            start_dt = datetime.fromisoformat(raw_start)
-            end_dt = datetime.fromisoformat(raw_end)
-
-            if tz_name:
-                # horários sem tz = horário local do tenant
-                if start_dt.tzinfo is None:
-                    local_start = ensure_timezone(start_dt, tz_name)
-                    start_dt = local_start.astimezone(timezone.utc)
-                else:
-                    start_dt = start_dt.astimezone(timezone.utc)
-
-                if end_dt.tzinfo is None:
-                    local_end = ensure_timezone(end_dt, tz_name)
-                    end_dt = local_end.astimezone(timezone.utc)
-                else:
-                    end_dt = end_dt.astimezone(timezone.utc)
-            else:
-                # fallback (não deve ser seu caso, mas deixo robusto)
-                if start_dt.tzinfo is None:
-                    start_dt = start_dt.replace(tzinfo=timezone.utc)
-                else:
-                    start_dt = start_dt.astimezone(timezone.utc)
-
-                if end_dt.tzinfo is None:
-                    end_dt = end_dt.replace(tzinfo=timezone.utc)
-                else:
-                    end_dt = end_dt.astimezone(timezone.utc)
-
-            bookings.append((start_dt, end_dt))
-        except Exception as exc:
-            print("[BOOKINGS] ERRO PARSING ITEM:", item, "EXC:", repr(exc))
-            continue
+def _validate_bookings(content: bytes) -> list[_BookingTimes]:
+    try:
+        return _BOOKING_LIST_ADAPTER.validate_json(content)
+    except ValidationError:
+        pass
 
-    print("[BOOKINGS] bookings encontrados:", bookings) # pra debugar
+    # alguma reserva malformada: valida uma a uma e descarta só as inválidas
+    bookings: list[_BookingTimes] = []
+    for item in from_json(content):
+        try:
+            bookings.append(_BOOKING_ADAPTER.validate_python(item))
+        except ValidationError as exc:
+            logger.warning("[BOOKINGS] Erro ao interpretar a reserva %s: %r", item, exc)
     return bookings
 
 
-def _is_slot_conflicted(slot, bookings):
-    slot_start_utc = slot.start.astimezone(timezone.utc)
-    slot_end_utc = slot.end.astimezone(timezone.utc)
+def _booking_timestamps(
+    bookings: list[_BookingTimes],
+    zone=timezone.utc,
+) -> List[tuple[float, float]]:
+    """(início, fim) de cada reserva em segundos epoch."""
+    result: list[tuple[float, float]] = []
+    for booking in bookings:
+        start_dt = booking["start_time"]
+        end_dt = booking["end_time"]
+        # horários sem tz = horário local do tenant
+        if start_dt.tzinfo is None:
+            start_dt = start_dt.replace(tzinfo=zone)
+        if end_dt.tzinfo is None:
+            end_dt = end_dt.replace(tzinfo=zone)
+        result.append((start_dt.timestamp(), end_dt.timestamp()))
+
+    logger.debug("[BOOKINGS] %d reservas encontradas", len(result))
+    return result
+
+
+class _BookingIndex:
+    """Reservas em segundos epoch, ordenadas pelo início, com o maior fim acumulado.
+
+    Só as reservas que começam antes do fim do slot podem sobrepô-lo; entre elas,
+    basta o maior fim para saber se alguma passa do início do slot. Cada consulta
+    é uma busca binária (O(log n)) em vez de percorrer todas as reservas.
+    """
+
+    __slots__ = ("starts", "max_ends")
+
+    def __init__(self, bookings: Iterable[tuple[float, float]]) -> None:
+        ordered = sorted(bookings)
+        self.starts = [start for start, _ in ordered]
+        self.max_ends = list(accumulate((end for _, end in ordered), max))
+
+    def overlaps(self, start: float, end: float) -> bool:
+        # reservas com início < end (bisect_left: começar exatamente no fim não conflita)
+        count = bisect_left(self.starts, end)
+        return count > 0 and self.max_ends[count - 1] > start
 
-    for booking_start, booking_end in bookings:
-        if booking_start < slot_end_utc and booking_end > slot_start_utc:
-            return True
-    return False
 
+def _validate_target_date(target_date: date, settings: OrganizationSettings, now_local: datetime) -> None:
+    today_local = now_local.date()
+    if target_date < today_local:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Data deve ser igual ou posterior a hoje.")
 
-def compute_availability(
+    if target_date > today_local + timedelta(days=settings.advance_booking_days):
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            f"Consultas de disponibilidade limitadas a {settings.advance_booking_days} dias de antecedência.",
+        )
+
+
+async def compute_availability(
     *,
     app_state,
     db_session,
     resource_id: UUID,
     target_date: date,
     auth_token: str | None = None,
+    resource=None,
 ) -> dict:
+    days = await compute_availability_range(
+        app_state=app_state,
+        db_session=db_session,
+        resource_id=resource_id,
+        start_date=target_date,
+        end_date=target_date,
+        auth_token=auth_token,
+        resource=resource,
+    )
+    return days[0]
+
 
-    resource = crud.buscar_recurso(db_session, resource_id)
+async def compute_availability_range(
+    *,
+    app_state,
+    db_session,
+    resource_id: UUID,
+    start_date: date,
+    end_date: date,
+    auth_token: str | None = None,
+    resource=None,
+) -> list[dict]:
+    """Disponibilidade de cada dia de ``start_date`` a ``end_date`` (inclusive).
+
+    Uma única consulta ao Booking Service cobre o período inteiro; as reservas
+    são indexadas uma vez e cada dia só consulta o índice.
+    """
+    if end_date < start_date:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Data final deve ser igual ou posterior à inicial.")
+
+    # a rota já carregou o recurso (filtrado pelo tenant); evita um segundo SELECT
+    if resource is None:
+        resource = await run_in_threadpool(crud.buscar_recurso, db_session, resource_id)
     if not resource:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Recurso não encontrado")
     if resource.status != "disponivel":
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Recurso indisponível para reservas.")
 
+    availability_data = resource.availability_schedule or {}
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    time_ranges_by_day = [_time_ranges_for_day(availability_data, day.weekday()) for day in days]
+
+    # A busca das reservas não depende das configurações do tenant: as duas
+    # chamadas HTTP correm em paralelo e os horários sem tz são convertidos depois.
+    # Período sem horários configurados não consulta o Booking Service.
+    bookings_task = None
+    if any(time_ranges_by_day):
+        period_start = datetime.combine(start_date, time.min, tzinfo=timezone.utc) - _MAX_UTC_OFFSET
+        period_end = datetime.combine(end_date, time.max, tzinfo=timezone.utc) + _MAX_UTC_OFFSET
+        bookings_task = asyncio.create_task(
+            _fetch_existing_bookings(
+                resource.tenant_id,
+                resource.id,
+                period_start,
+                period_end,
+                auth_token=auth_token,
+            )
+        )
+
     settings_provider: SettingsProvider = resolve_settings_provider(
         app_state,
         auth_token=auth_token,
     )
-    settings = settings_provider(resource.tenant_id)
-
-    today_local = ensure_timezone(datetime.now(timezone.utc), settings.timezone).date()
-    if target_date < today_local:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Data deve ser igual ou posterior a hoje.")
-
-    if target_date > today_local + timedelta(days=settings.advance_booking_days):
-        raise HTTPException(
-            status.HTTP_400_BAD_REQUEST,
-            f"Consultas de disponibilidade limitadas a {settings.advance_booking_days} dias de antecedência.",
-        )
-
-    availability_data = resource.availability_schedule or {}
-
-    weekday_index = target_date.weekday()
-    weekday_key = _WEEKDAY_KEYS[weekday_index]
-
-    time_ranges: List[tuple[time, time]] = []
-
-    # Formato antigo: {"monday": ["08:00-12:00", "13:00-16:00"], ...}
-    if weekday_key in availability_data:
-        daily_schedule = availability_data.get(weekday_key, []) or []
-        for entry in daily_schedule:
-            # cada entry é uma string "HH:MM-HH:MM"
-            start_time, end_time = _parse_schedule_entry(entry)
-            time_ranges.append((start_time, end_time))
-
-    # Formato novo: {"schedule": [{"day_of_week": 0, "start_time": "...", "end_time": "..."}, ...]}
-    elif "schedule" in availability_data:
-        schedule_list = availability_data.get("schedule", []) or []
-        for entry in schedule_list:
-            if entry.get("day_of_week") != weekday_index:
-                continue
-            try:
-                start_time = time.fromisoformat(entry["start_time"])
-                end_time = time.fromisoformat(entry["end_time"])
-            except (KeyError, ValueError) as exc:
-                raise HTTPException(
-                    status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    "Disponibilidade inválida configurada.",
-                ) from exc
-            if end_time <= start_time:
-                raise HTTPException(
-                    status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    "Intervalo de disponibilidade inválido.",
-                )
-            time_ranges.append((start_time, end_time))
-
-    # nenhum horário configurado pra esse dia
-    if not time_ranges:
-        return {
+    try:
+        settings = await run_in_threadpool(settings_provider, resource.tenant_id)
+        # fuso e "agora" resolvidos uma vez e repassados a todo o cálculo
+        zone = resolve_zone(settings.timezone)
+        now_local = datetime.now(zone)
+        _validate_target_date(start_date, settings, now_local)
+        _validate_target_date(end_date, settings, now_local)
+    except BaseException:
+        if bookings_task is not None:
+            bookings_task.cancel()
+        raise
+
+    # nenhum horário configurado no período: índice vazio, todos os dias sem slots
+    bookings = _BookingIndex(_booking_timestamps(await bookings_task, zone) if bookings_task else [])
+
+    # Slots como inteiros (segundos epoch) do começo ao fim; só os livres viram
+    # datetimes locais, e só para o isoformat da resposta
+    interval = settings.booking_interval * 60
+    now_boundary = now_local.timestamp()
+    return [
+        {
             "resource_id": str(resource.id),
             "tenant_id": str(resource.tenant_id),
-            "date": target_date.isoformat(),
+            "date": day.isoformat(),
             "timezone": settings.timezone,
-            "slots": [],
+            "slots": [
+                _slot_payload(start, start + interval, zone)
+                for start_time, end_time in time_ranges
+                for start in _generate_slots(day, start_time, end_time, settings, zone, now_boundary)
+                if not bookings.overlaps(start, start + interval)
+            ],
         }
-
-    local_zone = ensure_timezone(datetime.now(timezone.utc), settings.timezone).tzinfo
-
-    day_start_local = datetime.combine(target_date, time.min, tzinfo=local_zone)
-    day_end_local = datetime.combine(target_date, time.max, tzinfo=local_zone)
-
-    day_start = day_start_local.astimezone(timezone.utc)
-    day_end = day_end_local.astimezone(timezone.utc)
-
-    bookings = _collect_existing_bookings(
-        resource.tenant_id,
-        resource.id,
-        day_start,
-        day_end,
-        auth_token=auth_token,
-        tz_name=settings.timezone, 
-    )
-
-    slots: List[AvailabilitySlot] = []
-    for start_time, end_time in time_ranges:
-        slots.extend(_generate_slots(target_date, start_time, end_time, settings))
-
-    filtered_slots = [
-        slot.model_dump()
-        for slot in slots
-        if not _is_slot_conflicted(slot, bookings)
+        for day, time_ranges in zip(days, time_ranges_by_day)
     ]
-
-    return {
-        "resource_id": str(resource.id),
-        "tenant_id": str(resource.tenant_id),
-        "date": target_date.isoformat(),
-        "timezone": settings.timezone,
-        "slots": filtered_slots,
-    }
@@ -1,6 +1,12 @@
 import os
+from typing import Optional
+
 import httpx
 from fastapi import HTTPException
+from shared import PooledAsyncClient, TTLCache
+
+# Conexões keep-alive com o Tenant Service reaproveitadas entre as validações
+TENANT_CLIENT = PooledAsyncClient(timeout=3.0, limits=httpx.Limits(max_keepalive_connections=10))
 
 
 def is_testing() -> bool:
@@ -10,15 +16,22 @@ def is_testing() -> bool:
     return os.getenv("PYTEST_CURRENT_TEST") is not None
 
 
-async def validar_tenant_existe(tenant_service_url: str, tenant_id: str):
+async def validar_tenant_existe(tenant_service_url: str, tenant_id: str, cache: Optional[TTLCache] = None):
     """
     Valida se o tenant existe via Tenant Service.
     Em modo de teste, não faz chamada HTTP.
+    Com ``cache``, tenants já confirmados não geram nova chamada até o TTL expirar
+    (só respostas 200 são guardadas).
     """
     # 1. Bypass no pytest
     if is_testing():
         return {"id": tenant_id}
 
+    if cache is not None:
+        cached = cache.get(tenant_id)
+        if cached is not None:
+            return cached
+
     # 2. Garantir que tenant_service_url existe
     if not tenant_service_url:
         raise HTTPException(
@@ -32,8 +45,7 @@ async def validar_tenant_existe(tenant_service_url: str, tenant_id: str):
     url = f"{base}/tenants/{tenant_id}"
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url)
+        resp = await TENANT_CLIENT.get().get(url)
     except httpx.RequestError:
         raise HTTPException(
             status_code=500,
@@ -49,4 +61,7 @@ async def validar_tenant_existe(tenant_service_url: str, tenant_id: str):
             detail="Erro inesperado ao consultar o Tenant Service",
         )
 
-    return resp.json()
\ No newline at end of file
+    tenant = resp.json()
+    if cache is not None:
+        cache.set(tenant_id, tenant)
+    return tenant
@@ -64,3 +64,14 @@ def prepare_database():
 def client():
     with TestClient(app) as test_client:
         yield test_client
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # Testes async rodam só no asyncio (o backend do FastAPI), sem repetir no
+    # trio; com uvloop quando disponível (não existe no Windows)
+    try:
+        import uvloop
+    except ImportError:
+        return "asyncio"
+    return ("asyncio", {"loop_factory": uvloop.new_event_loop})
@@ -1,10 +1,16 @@
+import json
 from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
 from uuid import uuid4
 
+import httpx
+import respx
 from fastapi import status
 
 from shared import OrganizationSettings
 from conftest import make_auth_headers
+from app.core.database import count_queries
+from app.services import availability
 
 
 def _category_payload(tenant_id: str):
@@ -56,9 +62,13 @@ def test_resource_flow(client):
 
     list_resp = client.get("/resources/", params={"tenant_id": tenant_id}, headers=headers)
     assert list_resp.status_code == status.HTTP_200_OK
-    resources = list_resp.json()
+    page = list_resp.json()
+    assert page["next_cursor"] is None
+    resources = page["items"]
     assert len(resources) == 1
-    assert resources[0]["category"]["id"] == category_id
+    assert resources[0]["category_id"] == category_id
+    assert "category" not in resources[0]
+    assert "availability_schedule" not in resources[0]
 
     update_resp = client.put(f"/resources/{resource_id}", json={"status": "manutencao"}, headers=headers)
     assert update_resp.status_code == status.HTTP_200_OK
@@ -69,6 +79,110 @@ def test_resource_flow(client):
 
     not_found = client.get(f"/resources/{resource_id}", headers=headers)
     assert not_found.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_categories_of_empty_tenant(client):
+    headers = make_auth_headers(str(uuid4()), str(uuid4()), "admin")
+
+    resp = client.get("/categories/", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json() == []
+
+
+def test_list_resources_query_count(client):
+    tenant_id = str(uuid4())
+    headers = make_auth_headers(tenant_id, str(uuid4()), "admin")
+    category_id = client.post("/categories/", json=_category_payload(tenant_id), headers=headers).json()["id"]
+    for _ in range(3):
+        with count_queries() as statements:
+            created = client.post("/resources/", json=_resource_payload(tenant_id, category_id), headers=headers)
+        assert created.json()["category"]["id"] == category_id
+        # categoria (validação, reaproveitada na resposta) + INSERT ... RETURNING
+        assert len(statements) == 2
+
+    with count_queries() as statements:
+        resp = client.get("/resources/", params={"tenant_id": tenant_id}, headers=headers)
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert len(resp.json()["items"]) == 3
+    # colunas JSONB ficam de fora do SELECT da listagem
+    assert "availability_schedule" not in statements[0]
+    # só os recursos: a listagem não carrega categorias, e um lazy load estouraria
+    assert len(statements) == 1
+
+
+def test_list_resources_keyset_pagination(client):
+    tenant_id = str(uuid4())
+    headers = make_auth_headers(tenant_id, str(uuid4()), "admin")
+    category_id = client.post("/categories/", json=_category_payload(tenant_id), headers=headers).json()["id"]
+    for name in ("Sala C", "Sala A", "Sala B", "Sala A"):
+        payload = {**_resource_payload(tenant_id, category_id), "name": name}
+        client.post("/resources/", json=payload, headers=headers)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/resources/", params=params, headers=headers).json()
+        seen.extend(item["name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["Sala A", "Sala A", "Sala B", "Sala C"]
+    assert client.get("/resources/", params={"limit": 201}, headers=headers).status_code == 422
+    assert client.get("/resources/", params={"cursor": "lixo"}, headers=headers).status_code == 400
+
+    found = client.get("/resources/", params={"search": "la b"}, headers=headers).json()["items"]
+    assert [item["name"] for item in found] == ["Sala B"]
+    # curingas digitados na busca são literais
+    empty = client.get("/resources/", params={"search": "%"}, headers=headers)
+    assert empty.status_code == status.HTTP_200_OK
+    assert empty.json() == {"items": [], "next_cursor": None}
+
+
+def test_writes_are_scoped_to_token_tenant(client, monkeypatch):
+    tenant_id = str(uuid4())
+    headers = make_auth_headers(tenant_id, str(uuid4()), "admin")
+    other_headers = make_auth_headers(str(uuid4()), str(uuid4()), "admin")
+    category_id = client.post("/categories/", json=_category_payload(tenant_id), headers=headers).json()["id"]
+    resource_id = client.post("/resources/", json=_resource_payload(tenant_id, category_id), headers=headers).json()["id"]
+
+    forbidden = client.put(f"/resources/{resource_id}", json={"name": "Invasor"}, headers=other_headers)
+    assert forbidden.status_code == status.HTTP_403_FORBIDDEN
+    missing = client.put(f"/resources/{uuid4()}", json={"name": "Nada"}, headers=headers)
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"/resources/{resource_id}", headers=other_headers).status_code == status.HTTP_403_FORBIDDEN
+    assert client.get(f"/resources/{uuid4()}", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+
+    with count_queries() as statements:
+        resp = client.put(f"/resources/{resource_id}", json={"name": "Sala 102"}, headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()["name"] == "Sala 102"
+    assert resp.json()["category"]["id"] == category_id
+    # UPDATE ... RETURNING + categoria (selectinload)
+    assert len(statements) <= 2
+
+    category_resp = client.put(
+        f"/categories/{category_id}",
+        json={"category_metadata": {"requires_qualification": True}},
+        headers=headers,
+    )
+    assert category_resp.status_code == status.HTTP_200_OK
+    assert category_resp.json()["category_metadata"] == {"requires_qualification": True}
+    assert client.put(f"/categories/{category_id}", json={}, headers=other_headers).status_code == status.HTTP_403_FORBIDDEN
+
+    publisher = Mock()
+    monkeypatch.setattr(client.app.state, "event_publisher", publisher)
+    assert client.delete(f"/resources/{resource_id}", headers=other_headers).status_code == status.HTTP_403_FORBIDDEN
+    with count_queries() as statements:
+        assert client.delete(f"/resources/{resource_id}", headers=headers).status_code == status.HTTP_204_NO_CONTENT
+    # DELETE ... RETURNING tenant_id, sem SELECT antes
+    assert len(statements) == 1
+    publisher.enqueue.assert_called_once_with("resource.deleted", {"resource_id": resource_id, "tenant_id": tenant_id})
+    assert client.delete(f"/resources/{resource_id}", headers=headers).status_code == status.HTTP_404_NOT_FOUND
+
+
 def test_category_archival(client):
     tenant_id = str(uuid4())
     user_id = str(uuid4())
@@ -121,6 +235,144 @@ def test_availability_respects_settings(client):
     assert slots[-1]["end_time"].startswith(f"{target_date}T18:00")
 
 
+
+def test_availability_excludes_booked_slots(client, monkeypatch):
+    tenant_id = str(uuid4())
+    user_id = str(uuid4())
+    headers = make_auth_headers(tenant_id, user_id, "admin")
+    monkeypatch.setattr(availability, "_BOOKINGS_URL", availability._build_bookings_url("http://booking:8000"))
+
+    client.app.state.settings_provider = lambda _tenant, auth_token=None: OrganizationSettings(
+        timezone="UTC",
+        working_hours_start=datetime.strptime("08:00", "%H:%M").time(),
+        working_hours_end=datetime.strptime("18:00", "%H:%M").time(),
+        booking_interval=60,
+        advance_booking_days=10,
+        cancellation_hours=24,
+    )
+
+    category_id = client.post("/categories/", json=_category_payload(tenant_id), headers=headers).json()["id"]
+    resource_id = client.post("/resources/", json=_resource_payload(tenant_id, category_id), headers=headers).json()["id"]
+
+    target_date = datetime.now(timezone.utc).date() + timedelta(days=1)
+    while target_date.weekday() != 0:  # Monday
+        target_date += timedelta(days=1)
+
+    bookings = [
+        {"start_time": f"{target_date}T10:00:00Z", "end_time": f"{target_date}T11:00:00Z"},
+        # atravessa dois slots
+        {"start_time": f"{target_date}T13:30:00+00:00", "end_time": f"{target_date}T14:30:00+00:00"},
+        # sem tz = horário local do tenant
+        {"start_time": f"{target_date}T16:00:00", "end_time": f"{target_date}T17:00:00"},
+    ]
+    with respx.mock(assert_all_called=True) as router:
+        router.get("http://booking:8000/bookings/").mock(return_value=httpx.Response(200, json=bookings))
+        resp = client.get(f"/resources/{resource_id}/availability", params={"data": target_date.isoformat()}, headers=headers)
+
+    assert resp.status_code == status.HTTP_200_OK
+    starts = [slot["start_time"][11:16] for slot in resp.json()["slots"]]
+    assert starts == ["09:00", "11:00", "12:00", "15:00", "17:00"]
+
+
+
+def test_availability_range_uses_a_single_booking_lookup(client, monkeypatch):
+    tenant_id = str(uuid4())
+    user_id = str(uuid4())
+    headers = make_auth_headers(tenant_id, user_id, "admin")
+    monkeypatch.setattr(availability, "_BOOKINGS_URL", availability._build_bookings_url("http://booking:8000"))
+
+    client.app.state.settings_provider = lambda _tenant, auth_token=None: OrganizationSettings(
+        timezone="UTC",
+        working_hours_start=datetime.strptime("08:00", "%H:%M").time(),
+        working_hours_end=datetime.strptime("18:00", "%H:%M").time(),
+        booking_interval=60,
+        advance_booking_days=30,
+        cancellation_hours=24,
+    )
+
+    category_id = client.post("/categories/", json=_category_payload(tenant_id), headers=headers).json()["id"]
+    resource_id = client.post("/resources/", json=_resource_payload(tenant_id, category_id), headers=headers).json()["id"]
+
+    monday = datetime.now(timezone.utc).date() + timedelta(days=1)
+    while monday.weekday() != 0:
+        monday += timedelta(days=1)
+    next_monday = monday + timedelta(days=7)
+
+    bookings = [{"start_time": f"{next_monday}T09:00:00Z", "end_time": f"{next_monday}T17:00:00Z"}]
+    params = {"data_inicio": monday.isoformat(), "data_fim": next_monday.isoformat()}
+    with respx.mock(assert_all_called=True) as router:
+        route = router.get("http://booking:8000/bookings/").mock(return_value=httpx.Response(200, json=bookings))
+        resp = client.get(f"/resources/{resource_id}/availability/range", params=params, headers=headers)
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert route.call_count == 1
+    days = resp.json()
+    assert [day["date"] for day in days] == [(monday + timedelta(days=i)).isoformat() for i in range(8)]
+    # só segunda tem horário configurado; na segunda seguinte resta o slot das 17h
+    assert len(days[0]["slots"]) == 9
+    assert all(not day["slots"] for day in days[1:7])
+    assert [slot["start_time"][11:16] for slot in days[7]["slots"]] == ["17:00"]
+
+    too_long = {"data_inicio": monday.isoformat(), "data_fim": (monday + timedelta(days=31)).isoformat()}
+    resp = client.get(f"/resources/{resource_id}/availability/range", params=too_long, headers=headers)
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class _MemoryAvailabilityCache:
+    """Substituto em memória do AvailabilityCache (sem Redis nos testes)."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, tenant_id, resource_id, day):
+        return self.entries.get((str(tenant_id), str(resource_id), day))
+
+    def set(self, tenant_id, resource_id, day, availability):
+        self.entries[(str(tenant_id), str(resource_id), day)] = availability
+
+    def invalidate_resource(self, resource_id):
+        self.entries = {key: value for key, value in self.entries.items() if key[1] != str(resource_id)}
+
+
+def test_availability_is_cached_until_resource_changes(client, monkeypatch):
+    tenant_id = str(uuid4())
+    user_id = str(uuid4())
+    headers = make_auth_headers(tenant_id, user_id, "admin")
+
+    cache = _MemoryAvailabilityCache()
+    monkeypatch.setattr(client.app.state, "availability_cache", cache)
+
+    category_id = client.post("/categories/", json=_category_payload(tenant_id), headers=headers).json()["id"]
+    resource_id = client.post("/resources/", json=_resource_payload(tenant_id, category_id), headers=headers).json()["id"]
+
+    target_date = (datetime.now(timezone.utc) + timedelta(days=1)).date()
+    params = {"data": target_date.isoformat()}
+
+    first = client.get(f"/resources/{resource_id}/availability", params=params, headers=headers)
+    assert first.status_code == status.HTTP_200_OK
+    # o corpo da resposta é guardado já serializado
+    assert json.loads(cache.entries[(tenant_id, resource_id, target_date)]) == first.json()
+
+    # hit: o valor do cache é devolvido sem recalcular
+    cache.entries[(tenant_id, resource_id, target_date)] = json.dumps({**first.json(), "slots": []})
+    with count_queries() as statements:
+        cached = client.get(f"/resources/{resource_id}/availability", params=params, headers=headers)
+    assert cached.json()["slots"] == []
+    assert not statements
+
+    # não-admin vê só as próprias reservas: nem lê nem grava a entrada do tenant
+    user_headers = make_auth_headers(tenant_id, str(uuid4()), "user")
+    own = client.get(f"/resources/{resource_id}/availability", params=params, headers=user_headers)
+    assert own.json()["slots"] == first.json()["slots"]
+    assert json.loads(cache.entries[(tenant_id, resource_id, target_date)])["slots"] == []
+
+    client.put(f"/resources/{resource_id}", json={"status": "manutencao"}, headers=headers)
+    assert not cache.entries
+
+    after_update = client.get(f"/resources/{resource_id}/availability", params=params, headers=headers)
+    assert after_update.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_availability_requires_future_date(client):
     tenant_id = str(uuid4())
     user_id = str(uuid4())
@@ -1,7 +1,10 @@
 """Shared utilities used across microservices."""
 
-from .config import ServiceConfig, load_service_config
+from .config import ServiceConfig, database_pool_options, load_service_config
 from .messaging import EventPublisher
+from .http import PooledAsyncClient
+from .ids import uuid7
+from .cache import AVAILABILITY_CACHE_TTL, AvailabilityCache, TTLCache, availability_key
 from .event_consumer import EventConsumer, cleanup_consumer
 from .organization import (
     OrganizationSettings,
@@ -10,17 +13,27 @@ from .organization import (
     ensure_timezone,
     minutes_since_midnight,
     resolve_settings_provider,
+    resolve_zone,
     validate_booking_window,
     validate_cancellation_window,
     can_cancel_booking,
 )
-from .startup import database_lifespan, database_lifespan_factory
+from .startup import auto_create_schema_enabled, database_lifespan, database_lifespan_factory, prepare_database
 from .cors import get_cors_origins
+from .openapi import serve_cached_openapi, serve_redoc, serve_swagger_ui
+from .fastapi_factory import create_service_app
 
 __all__ = [
     "ServiceConfig",
     "load_service_config",
+    "database_pool_options",
     "EventPublisher",
+    "PooledAsyncClient",
+    "AvailabilityCache",
+    "TTLCache",
+    "AVAILABILITY_CACHE_TTL",
+    "availability_key",
+    "uuid7",
     "EventConsumer",
     "cleanup_consumer",
     "OrganizationSettings",
@@ -31,8 +44,15 @@ __all__ = [
     "validate_cancellation_window",
     "can_cancel_booking",
     "ensure_timezone",
+    "resolve_zone",
     "minutes_since_midnight",
+    "auto_create_schema_enabled",
+    "prepare_database",
     "database_lifespan",
     "database_lifespan_factory",
     "get_cors_origins",
+    "serve_cached_openapi",
+    "serve_redoc",
+    "serve_swagger_ui",
+    "create_service_app",
 ]
@@ -0,0 +1,117 @@
+"""Caches shared by the services: availability in Redis and a small in-process TTL cache."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Generic, Hashable, Optional, TypeVar
+from uuid import UUID
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+AVAILABILITY_CACHE_TTL = 60
+
+V = TypeVar("V")
+
+
+def availability_key(tenant_id: UUID | str, resource_id: UUID | str, day: date) -> str:
+    """Canonical key: ``availability:{tenant_id}:{resource_id}:{YYYY-MM-DD}``."""
+    return f"availability:{tenant_id}:{resource_id}:{day.isoformat()}"
+
+
+def _resource_index_key(resource_id: UUID | str) -> str:
+    return f"availability:resource:{resource_id}"
+
+
+class AvailabilityCache:
+    """Cache the computed availability of a resource per day.
+
+    Entries expire after ``ttl`` seconds. Each resource also keeps a set with its
+    cached keys so every day of a resource can be invalidated at once: booking
+    events carry the resource id but not always the tenant or the affected dates.
+
+    Values are the JSON response bodies themselves, so a hit is returned without
+    decoding or re-validating it. Redis failures are logged and treated as cache
+    misses; the cache never breaks the request that uses it.
+    """
+
+    def __init__(self, redis_url: str, *, ttl: int = AVAILABILITY_CACHE_TTL) -> None:
+        self._ttl = ttl
+        self._client = redis.Redis.from_url(redis_url)
+
+    def get(self, tenant_id: UUID | str, resource_id: UUID | str, day: date) -> Optional[bytes]:
+        """The cached JSON body, ready to be sent as the response as-is."""
+        try:
+            raw = self._client.get(availability_key(tenant_id, resource_id, day))
+        except Exception:  # pragma: no cover - log and continue
+            logger.exception("Failed to read availability cache for resource '%s'", resource_id)
+            return None
+        return raw or None
+
+    def set(
+        self,
+        tenant_id: UUID | str,
+        resource_id: UUID | str,
+        day: date,
+        body: bytes | str,
+    ) -> None:
+        """Store the serialized availability response (JSON) of one day."""
+        key = availability_key(tenant_id, resource_id, day)
+        index_key = _resource_index_key(resource_id)
+
+        pipe = self._client.pipeline(transaction=False)
+        pipe.setex(key, self._ttl, body)
+        pipe.sadd(index_key, key)
+        pipe.expire(index_key, self._ttl)
+        try:
+            pipe.execute()
+        except Exception:  # pragma: no cover - log and continue
+            logger.exception("Failed to write availability cache for resource '%s'", resource_id)
+
+    def invalidate_resource(self, resource_id: UUID | str) -> None:
+        """Drop every cached day of ``resource_id``."""
+        index_key = _resource_index_key(resource_id)
+        try:
+            keys = self._client.smembers(index_key)
+            self._client.delete(index_key, *keys)
+        except Exception:  # pragma: no cover - log and continue
+            logger.exception("Failed to invalidate availability cache for resource '%s'", resource_id)
+
+
+class TTLCache(Generic[V]):
+    """In-process cache with per-entry expiry and a bounded, LRU-evicted size.
+
+    Meant for lookups that rarely change (e.g. "does this tenant exist"), where a
+    stale hit for ``ttl`` seconds is acceptable. Lives in the worker process: each
+    worker keeps its own copy, so explicit invalidation only reaches the caller's
+    process and the TTL bounds staleness everywhere else.
+    """
+
+    def __init__(self, *, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
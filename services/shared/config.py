@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 import os
-from typing import Dict
+from typing import Any, Dict
 
 _DEFAULT_DATABASE_URLS: Dict[str, str] = {
     "tenant": "postgresql://user:password@db_tenant:5432/tenantdb",
@@ -18,6 +19,11 @@ _DEFAULT_EVENT_STREAM = "booking-events"
 _DEFAULT_HOST = "0.0.0.0"
 _DEFAULT_PORT = 8000
 
+_DEFAULT_POOL_SIZE = 20
+_DEFAULT_MAX_OVERFLOW = 10
+_DEFAULT_POOL_TIMEOUT = 30
+_DEFAULT_POOL_RECYCLE = 1800
+
 
 @dataclass(frozen=True)
 class DatabaseConfig:
@@ -48,8 +54,12 @@ def _lookup_database_url(service_name: str) -> str:
     )
 
 
+@lru_cache(maxsize=None)
 def load_service_config(service_name: str) -> ServiceConfig:
-    """Aggregate configuration for a given service using env vars with sane fallbacks."""
+    """Aggregate configuration for a given service using env vars with sane fallbacks.
+
+    Cached per service name: env vars are read once and the same frozen config is returned.
+    """
 
     normalized_name = service_name.lower()
     db_url = _lookup_database_url(normalized_name)
@@ -72,3 +82,24 @@ def load_service_config(service_name: str) -> ServiceConfig:
         database=DatabaseConfig(url=db_url),
         redis=RedisConfig(url=redis_url, stream=stream_name),
     )
+
+
+def database_pool_options(database_url: str) -> Dict[str, Any]:
+    """Engine pool options, overridable via DB_POOL_* env vars.
+
+    ``pool_pre_ping`` (one ``SELECT 1`` per checkout) stays on unless
+    ``DB_POOL_PRE_PING=0``; turn it off where idle connections are never reset.
+    SQLite (used by the tests) keeps SQLAlchemy's default pool sizing, which
+    rejects the QueuePool options.
+    """
+
+    options: Dict[str, Any] = {"pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") != "0"}
+    if database_url.startswith("sqlite"):
+        return options
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", str(_DEFAULT_POOL_SIZE))),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", str(_DEFAULT_MAX_OVERFLOW))),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", str(_DEFAULT_POOL_TIMEOUT))),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", str(_DEFAULT_POOL_RECYCLE))),
+    )
+    return options
@@ -5,7 +5,7 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from typing import Any, Callable, Coroutine, Optional
+from typing import Any, Callable, Coroutine, Mapping, Optional
 
 import redis.asyncio as aioredis
 
@@ -43,6 +43,8 @@ class EventConsumer:
         *,
         block_ms: int = 5000,
         count: int = 10,
+        max_in_flight: Optional[int] = None,
+        handlers: Optional[Mapping[str, EventHandler]] = None,
     ) -> None:
         """
         Initialize event consumer.
@@ -54,16 +56,34 @@ class EventConsumer:
             consumer_name: Unique name for this consumer instance
             block_ms: Time to block waiting for new messages (milliseconds)
             count: Maximum number of messages to read per batch
+            max_in_flight: Maximum number of messages being handled at once. When set,
+                batches are dispatched in the background so the next XREADGROUP runs
+                while handlers are still busy; when None, each batch is processed
+                before the next read. Must be at least ``count``, since a whole
+                batch is admitted at once.
+            handlers: Handlers by event type, same as calling register_handler for each
+
+        Raises:
+            ValueError: If ``max_in_flight`` is smaller than ``count``
         """
+        if max_in_flight is not None and max_in_flight < count:
+            raise ValueError(
+                f"max_in_flight ({max_in_flight}) must be >= count ({count}): "
+                "a full batch could never acquire its permits"
+            )
         self._redis_url = redis_url
         self._stream_name = stream_name
         self._group_name = group_name
         self._consumer_name = consumer_name
         self._block_ms = block_ms
         self._count = count
-        self._handlers: dict[str, EventHandler] = {}
+        self._max_in_flight = max_in_flight
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._batch_tasks: set[asyncio.Task] = set()
+        self._handlers: dict[str, EventHandler] = dict(handlers or {})
         self._client: Optional[aioredis.Redis] = None
         self._running = False
+        self._stop = asyncio.Event()
 
     def register_handler(self, event_type: str, handler: EventHandler) -> None:
         """Register a handler for a specific event type."""
@@ -87,8 +107,13 @@ class EventConsumer:
             if "BUSYGROUP" not in str(e):
                 raise
 
-    async def _process_message(self, message_id: bytes, data: dict[bytes, bytes]) -> None:
-        """Process a single message from the stream."""
+    async def _handle_message(self, message_id: bytes, data: dict[bytes, bytes]) -> bool:
+        """
+        Run the handler for a single message.
+
+        Returns True when the message can be acknowledged: the handler succeeded or
+        there is no handler for its event type. Failures stay pending for retry.
+        """
         try:
             # Decode message
             event_type = data.get(b"event_type", b"").decode("utf-8")
@@ -108,25 +133,55 @@ class EventConsumer:
             if handler:
                 logger.debug(f"Processing {event_type}: {message_id_str}")
                 await handler(event_type, payload)
-                
-                # Acknowledge message only after successful processing
-                await self._client.xack(
-                    self._stream_name,
-                    self._group_name,
-                    message_id,
-                )
             else:
-                logger.warning(f"No handler registered for event type: {event_type}. Acknowledging to skip.")
                 # Acknowledge messages without handlers to prevent infinite pending queue
-                await self._client.xack(
-                    self._stream_name,
-                    self._group_name,
-                    message_id,
-                )
+                logger.warning(f"No handler registered for event type: {event_type}. Acknowledging to skip.")
+            return True
             
         except Exception as e:
             logger.error(f"Error processing message {message_id}: {e}", exc_info=True)
             # Message will be retried by pending entries logic
+            return False
+
+    async def _process_message(self, message_id: bytes, data: dict[bytes, bytes]) -> None:
+        """Process a single message from the stream."""
+        if await self._handle_message(message_id, data):
+            # Acknowledge message only after successful processing
+            await self._client.xack(
+                self._stream_name,
+                self._group_name,
+                message_id,
+            )
+
+    async def _process_batch(self, messages: list[tuple[bytes, dict[bytes, bytes]]]) -> None:
+        """
+        Process a batch read by XREADGROUP.
+
+        Handlers run concurrently and every successful message is acknowledged in a
+        single XACK, instead of one round-trip per message.
+        """
+        results = await asyncio.gather(
+            *(self._handle_message(message_id, data) for message_id, data in messages)
+        )
+        ack_ids = [message_id for (message_id, _), ok in zip(messages, results) if ok]
+        if ack_ids:
+            # Sem XDEL: o mesmo stream é lido por grupos de outros serviços
+            await self._client.xack(self._stream_name, self._group_name, *ack_ids)
+
+    async def _dispatch_batch(self, messages: list[tuple[bytes, dict[bytes, bytes]]]) -> None:
+        """Process a batch in the background, waiting only for in-flight capacity."""
+        for _ in messages:
+            await self._in_flight.acquire()
+        task = asyncio.create_task(self._run_batch(messages))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, messages: list[tuple[bytes, dict[bytes, bytes]]]) -> None:
+        try:
+            await self._process_batch(messages)
+        finally:
+            for _ in messages:
+                self._in_flight.release()
 
     async def _read_pending_messages(self) -> None:
         """Read and process messages that were delivered but not acknowledged."""
@@ -165,20 +220,43 @@ class EventConsumer:
             logger.warning("Consumer already running")
             return
 
+        await self.connect()
+        await self.run()
+
+    async def connect(self) -> None:
+        """
+        Open the Redis client and make sure the consumer group exists.
+
+        Split from run() so startup can connect while other work (e.g. the database
+        check) is still in progress, and enter the read loop only afterwards.
+        """
         self._client = aioredis.Redis.from_url(self._redis_url)
-        
+        if self._max_in_flight:
+            self._in_flight = asyncio.Semaphore(self._max_in_flight)
         try:
             await self._ensure_consumer_group()
-            self._running = True  # Set after successful initialization
-            logger.info(
-                f"Consumer '{self._consumer_name}' started on stream '{self._stream_name}'"
-            )
-            
+        except BaseException:
+            await self.close()
+            raise
+        self._running = True  # Set after successful initialization
+        logger.info(
+            f"Consumer '{self._consumer_name}' started on stream '{self._stream_name}'"
+        )
+
+    async def close(self) -> None:
+        """Close the Redis client opened by connect()."""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def run(self) -> None:
+        """Consume events until stop() is called (blocking call); requires connect()."""
+        try:
             # Process any pending messages first
             await self._read_pending_messages()
             
-            # Main consumption loop
-            while self._running:
+            # Main consumption loop; stop() is checked between batches
+            while not self._stop.is_set():
                 try:
                     # Read new messages
                     messages = await self._client.xreadgroup(
@@ -192,10 +270,17 @@ class EventConsumer:
                     if not messages:
                         continue
                     
-                    # Process messages
+                    # Process messages (one XACK per batch)
                     for stream_name, stream_messages in messages:
-                        for message_id, data in stream_messages:
-                            await self._process_message(message_id, data)
+                        if self._in_flight:
+                            await self._dispatch_batch(stream_messages)
+                        else:
+                            # shield: cancelar o consumer não interrompe um lote entre
+                            # o handler e o XACK (a task termina no finally abaixo)
+                            task = asyncio.create_task(self._process_batch(stream_messages))
+                            self._batch_tasks.add(task)
+                            task.add_done_callback(self._batch_tasks.discard)
+                            await asyncio.shield(task)
                             
                 except asyncio.CancelledError:
                     logger.info("Consumer task cancelled")
@@ -206,13 +291,16 @@ class EventConsumer:
                     
         finally:
             self._running = False
-            if self._client:
-                await self._client.aclose()
+            # Lotes ainda em processamento terminam (e fazem XACK) antes de fechar
+            if self._batch_tasks:
+                await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+            await self.close()
             logger.info(f"Consumer '{self._consumer_name}' stopped")
 
     async def stop(self) -> None:
-        """Stop consuming events."""
+        """Stop consuming events once the current batch is acknowledged."""
         self._running = False
+        self._stop.set()
         logger.info("Stopping consumer...")
 
 
@@ -224,12 +312,16 @@ async def cleanup_consumer(
 ) -> None:
     """
     Helper to gracefully shutdown event consumer and task.
+
+    The consumer is asked to stop and gets ``timeout`` seconds to finish (and
+    acknowledge) the batch it is handling; the task is only cancelled after that
+    grace window. Batches in progress are shielded and still finish their XACK.
     
     Args:
         consumer: The EventConsumer instance to stop
         consumer_task: The asyncio.Task running the consumer
         logger: Logger instance for logging messages
-        timeout: Timeout in seconds to wait for graceful shutdown
+        timeout: Grace window in seconds before the task is cancelled
     """
     # Stop consumer if it exists
     if consumer:
@@ -0,0 +1,119 @@
+"""Build the FastAPI application shared by every service."""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Iterable, Sequence
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.openapi.utils import get_openapi
+from sqlalchemy.sql.schema import MetaData
+
+from .config import ServiceConfig
+from .cors import get_cors_origins
+from .openapi import serve_cached_openapi, serve_redoc, serve_swagger_ui
+from .startup import EventConsumerFactory, database_lifespan_factory, ping_database
+
+
+def create_service_app(
+    *,
+    service: str,
+    title: str,
+    description: str,
+    config: ServiceConfig,
+    metadata: MetaData,
+    engine,
+    tags_metadata: Sequence[dict[str, Any]] | None = None,
+    models: Iterable[object] | None = None,
+    event_consumer_factory: EventConsumerFactory | None = None,
+    version: str = "0.1.0",
+) -> FastAPI:
+    """Create a service app with the common wiring already in place.
+
+    That is: the database/consumer lifespan, CORS, ``app.state.config``, the
+    OpenAPI 3.0.3 schema served from cached bytes, the gateway-aware Swagger UI and
+    ReDoc pages, the ``/`` status route and ``/healthz/db``. Each service then adds its own
+    ``app.state`` entries and routers. ``APP_ROOT_PATH`` sets the prefix the
+    gateway mounts the service under.
+    """
+    if not logging.root.handlers:
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        )
+
+    app = FastAPI(
+        title=title,
+        version=version,
+        description=description,
+        openapi_tags=list(tags_metadata) if tags_metadata else None,
+        root_path=os.getenv("APP_ROOT_PATH") or "",
+        # SELECT 1 com backoff exponencial e create_all só no primeiro boot com
+        # AUTO_CREATE_SCHEMA=1 (em produção o schema vem do Alembic); depois os consumers
+        lifespan=database_lifespan_factory(
+            service_name=title,
+            metadata=metadata,
+            engine=engine,
+            models=models,
+            event_consumer_factory=event_consumer_factory,
+        ),
+        # /docs e /redoc são servidas abaixo, a partir de HTML renderizado uma vez
+        docs_url=None,
+        redoc_url=None,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=get_cors_origins(),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.state.config = config
+
+    def custom_openapi_schema():
+        if app.openapi_schema:
+            return app.openapi_schema
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes,
+        )
+        schema["openapi"] = "3.0.3"
+        app.openapi_schema = schema
+        return app.openapi_schema
+
+    app.openapi = custom_openapi_schema
+    serve_cached_openapi(app)
+    # Swagger UI que resolve o openapi.json relativo à própria URL (funciona atrás do gateway)
+    serve_swagger_ui(app)
+    serve_redoc(app)
+
+    @app.get("/")
+    def root():
+        return {
+            "service": service,
+            "status": "ok",
+            "docs_url": "/docs",
+            "config": {
+                "redis_stream": config.redis.stream,
+            },
+        }
+
+    @app.get("/healthz/db", include_in_schema=False)
+    async def database_health():
+        # checked_out perto de pool_size + max_overflow = requisições esperando conexão
+        pool = engine.pool.status()
+        try:
+            await ping_database(engine)
+        except Exception:
+            logging.getLogger(__name__).exception("[%s] Database health check failed", title)
+            return JSONResponse({"status": "unavailable", "pool": pool}, status_code=503)
+        return {"status": "ok", "pool": pool}
+
+    return app
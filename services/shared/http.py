@@ -0,0 +1,33 @@
+"""Process-wide HTTP clients for calls between services."""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+import httpx
+
+
+class PooledAsyncClient:
+    """Hold one ``httpx.AsyncClient`` per process, created on first use.
+
+    Reusing the client keeps its connection pool, so repeated calls to the same
+    service skip the TCP (and TLS) handshake. The client is created lazily inside
+    the running event loop and ``aclose`` drops it; the next ``get`` opens a fresh
+    one, so the holder survives an app being started and stopped more than once
+    (as the test clients do). Services list their holders in
+    ``app.state.http_clients`` and the shared lifespan closes them on shutdown.
+    """
+
+    def __init__(self, **client_options: Any) -> None:
+        self._client_options = client_options
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def get(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(**self._client_options)
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
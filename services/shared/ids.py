@@ -0,0 +1,24 @@
+"""Time-ordered identifiers for primary keys."""
+
+from __future__ import annotations
+
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """Return a UUIDv7 (RFC 9562): 48-bit Unix epoch milliseconds + 74 random bits.
+
+    Values generated later sort after earlier ones (at millisecond resolution), so
+    new rows land on the right edge of the primary key B-tree instead of random
+    pages. The result is a regular ``uuid.UUID`` and keeps the API format intact.
+    """
+
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= int.from_bytes(os.urandom(10), "big") & ((1 << 80) - 1)
+    # version 7 nos bits 48-51, variant RFC 4122 (0b10) nos bits 64-65
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import redis
 
@@ -16,12 +17,31 @@ class EventPublisher:
 
     The implementation is intentionally lightweight; callers can build higher-level
     abstractions (retry, tracing, etc.) on top of it.
+
+    ``enqueue`` is the non-blocking alternative to ``publish``: events are buffered
+    and a background thread sends whatever accumulated over ``flush_interval``
+    seconds in one pipelined ``publish_many``. Call ``close`` on shutdown to send
+    what is still buffered.
     """
 
-    def __init__(self, redis_url: str, stream_name: str, *, maxlen: Optional[int] = 1000) -> None:
+    def __init__(
+        self,
+        redis_url: str,
+        stream_name: str,
+        *,
+        maxlen: Optional[int] = 1000,
+        flush_interval: float = 0.005,
+    ) -> None:
         self._stream_name = stream_name
         self._maxlen = maxlen
         self._client = redis.Redis.from_url(redis_url)
+        self._flush_interval = flush_interval
+        self._buffer: List[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
 
     def publish(
         self,
@@ -42,12 +62,7 @@ class EventPublisher:
             Optional envelope metadata (correlation, tenant id, etc.).
         """
 
-        event = {
-            "event_type": event_type,
-            "payload": json.dumps(payload, default=str),
-        }
-        if metadata:
-            event["metadata"] = json.dumps(metadata, default=str)
+        event = self._build_event(event_type, payload, metadata)
 
         try:
             self._client.xadd(
@@ -58,3 +73,103 @@ class EventPublisher:
             )
         except Exception:  # pragma: no cover - log and continue
             logger.exception("Failed to publish event '%s' to stream '%s'", event_type, self._stream_name)
+
+    def publish_many(
+        self,
+        events: Iterable[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]],
+    ) -> None:
+        """Send several events in a single round-trip (non-transactional pipeline).
+
+        Parameters
+        ----------
+        events:
+            ``(event_type, payload, metadata)`` tuples; ``metadata`` may be ``None``.
+        """
+
+        pipe = self._client.pipeline(transaction=False)
+        event_types = []
+        for event_type, payload, metadata in events:
+            event_types.append(event_type)
+            pipe.xadd(
+                self._stream_name,
+                self._build_event(event_type, payload, metadata),
+                maxlen=self._maxlen,
+                approximate=True if self._maxlen else False,
+            )
+        if not event_types:
+            return
+
+        try:
+            pipe.execute()
+        except Exception:  # pragma: no cover - log and continue
+            logger.exception("Failed to publish events %s to stream '%s'", event_types, self._stream_name)
+
+    def enqueue(
+        self,
+        event_type: str,
+        payload: Dict[str, Any],
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Buffer an event for the background flusher instead of sending it now.
+
+        After ``close`` there is no flusher left, so the event is published directly.
+        """
+
+        with self._lock:
+            if not self._closed:
+                self._buffer.append((event_type, payload, metadata))
+                if self._flusher is None:
+                    self._flusher = threading.Thread(
+                        target=self._run_flusher,
+                        name=f"event-publisher-{self._stream_name}",
+                        daemon=True,
+                    )
+                    self._flusher.start()
+                self._wakeup.set()
+                return
+        self.publish(event_type, payload, metadata=metadata)
+
+    def flush(self) -> None:
+        """Send every buffered event now, in a single pipeline."""
+
+        with self._lock:
+            events, self._buffer = self._buffer, []
+        if events:
+            self.publish_many(events)
+
+    def close(self) -> None:
+        """Stop the background flusher and send what is still buffered."""
+
+        with self._lock:
+            self._closed = True
+            flusher = self._flusher
+        self._stop.set()
+        self._wakeup.set()
+        if flusher is not None:
+            flusher.join(timeout=1.0)
+        self.flush()
+
+    def _run_flusher(self) -> None:
+        while True:
+            self._wakeup.wait()
+            # Janela curta: eventos enfileirados nesse meio-tempo vão no mesmo
+            # pipeline; close() interrompe a espera e envia o resto ele mesmo
+            if self._stop.wait(self._flush_interval):
+                return
+            self._wakeup.clear()
+            self.flush()
+
+    @staticmethod
+    def _build_event(
+        event_type: str,
+        payload: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]],
+    ) -> Dict[str, str]:
+        event = {
+            "event_type": event_type,
+            "payload": json.dumps(payload, default=str),
+        }
+        if metadata:
+            event["metadata"] = json.dumps(metadata, default=str)
+        return event
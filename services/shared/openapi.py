@@ -0,0 +1,93 @@
+"""OpenAPI helpers shared by FastAPI services."""
+
+from __future__ import annotations
+
+import json
+from html import escape
+
+from fastapi import FastAPI
+from fastapi.openapi.docs import get_redoc_html
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def serve_cached_openapi(app: FastAPI) -> None:
+    """Serve ``app.openapi_url`` from JSON bytes serialised once.
+
+    FastAPI's default route re-encodes the whole schema dict on every request. The
+    schema itself still comes from ``app.openapi()`` (and stays cached on
+    ``app.openapi_schema`` for FastAPI internals); only its encoded form is kept
+    on ``app.state.openapi_bytes``, built lazily so routers included after this
+    call are part of it.
+    """
+
+    async def openapi_json(_: Request) -> Response:
+        body = getattr(app.state, "openapi_bytes", None)
+        if body is None:
+            body = json.dumps(app.openapi(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            app.state.openapi_bytes = body
+        return Response(body, media_type="application/json")
+
+    app.router.routes = [
+        route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url
+    ]
+    app.add_route(app.openapi_url, openapi_json, include_in_schema=False)
+
+
+_SWAGGER_UI_TEMPLATE = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <link type="text/css" rel="stylesheet" href="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui.css">
+        <title>{title} - Swagger UI</title>
+    </head>
+    <body>
+        <div id="swagger-ui"></div>
+        <script src="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui-bundle.js"></script>
+        <script>
+        const ui = SwaggerUIBundle({{
+            url: window.location.pathname.replace(/\\/docs$/, '') + '/openapi.json',
+            dom_id: '#swagger-ui',
+            presets: [
+                SwaggerUIBundle.presets.apis,
+                SwaggerUIBundle.SwaggerUIStandalonePreset
+            ],
+            layout: "BaseLayout",
+            deepLinking: true
+        }})
+        </script>
+    </body>
+    </html>
+    """
+
+
+def serve_swagger_ui(app: FastAPI, path: str = "/docs") -> None:
+    """Serve the Swagger UI page at ``path`` from HTML bytes rendered once.
+
+    The page loads ``openapi.json`` relative to its own URL, so it keeps working
+    behind the gateway prefix (``root_path``). ``app.title`` is fixed at
+    construction, so the page is escaped and encoded a single time here.
+    """
+    body = _SWAGGER_UI_TEMPLATE.format(title=escape(app.title)).encode("utf-8")
+
+    async def swagger_ui_html(_: Request) -> Response:
+        return Response(body, media_type="text/html")
+
+    app.add_route(path, swagger_ui_html, include_in_schema=False)
+
+
+def serve_redoc(app: FastAPI, path: str = "/redoc") -> None:
+    """Serve the ReDoc page at ``path`` from HTML bytes rendered once.
+
+    Same idea as :func:`serve_swagger_ui`; the schema URL is relative to the page,
+    so it resolves under the gateway prefix without reading ``root_path`` per request.
+    """
+    body = get_redoc_html(
+        openapi_url=app.openapi_url.lstrip("/"),
+        title=f"{app.title} - ReDoc",
+    ).body
+
+    async def redoc_html(_: Request) -> Response:
+        return Response(body, media_type="text/html")
+
+    app.add_route(path, redoc_html, include_in_schema=False)
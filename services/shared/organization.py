@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, time, timedelta, timezone
 from typing import Callable
 from uuid import UUID
@@ -9,6 +10,8 @@ import httpx
 from fastapi import HTTPException, status
 from zoneinfo import ZoneInfo
 
+from .cache import TTLCache
+
 
 @dataclass(frozen=True)
 class OrganizationSettings:
@@ -27,6 +30,10 @@ _DEFAULT_BOOKING_INTERVAL = int(os.getenv("DEFAULT_BOOKING_INTERVAL", "30"))
 _DEFAULT_ADVANCE_DAYS = int(os.getenv("DEFAULT_ADVANCE_BOOKING_DAYS", "30"))
 _DEFAULT_CANCELLATION_HOURS = int(os.getenv("DEFAULT_CANCELLATION_HOURS", "24"))
 
+# Cache das settings buscadas no Tenant Service: tenant_id -> settings
+_SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL", "60"))
+_settings_cache: TTLCache[OrganizationSettings] = TTLCache(maxsize=1024, ttl=_SETTINGS_CACHE_TTL)
+
 
 SettingsProvider = Callable[[UUID], OrganizationSettings]
 
@@ -49,12 +56,19 @@ def _build_settings(payload: dict) -> OrganizationSettings:
     )
 
 
+_DEFAULT_SETTINGS = _build_settings({})
+
+
 def default_settings_provider(
     tenant_id: UUID,
     auth_token: Optional[str] = None,
 ) -> OrganizationSettings:
     base_url = os.getenv("TENANT_SERVICE_URL")
     if base_url:
+        cached = _settings_cache.get(tenant_id)
+        if cached is not None:
+            return cached
+
         url = f"{base_url.rstrip('/')}/tenants/{tenant_id}/settings"
     
         headers = {}
@@ -64,11 +78,14 @@ def default_settings_provider(
         try:
             response = httpx.get(url, timeout=2.0, headers=headers)
             response.raise_for_status()
-            return _build_settings(response.json())
+            settings = _build_settings(response.json())
         except Exception:
             pass
+        else:
+            _settings_cache.set(tenant_id, settings)
+            return settings
 
-    return _build_settings({})
+    return _DEFAULT_SETTINGS
 
 
 def resolve_settings_provider(
@@ -90,7 +107,9 @@ def resolve_settings_provider(
     return provider_with_auth
 
 
-def _resolve_zone(tz_name: str) -> ZoneInfo:
+@lru_cache(maxsize=64)
+def resolve_zone(tz_name: str) -> ZoneInfo:
+    """ZoneInfo for ``tz_name``, falling back to UTC for unknown names (memoized)."""
     try:
         return ZoneInfo(tz_name)
     except Exception:
@@ -98,7 +117,7 @@ def _resolve_zone(tz_name: str) -> ZoneInfo:
 
 
 def ensure_timezone(dt: datetime, tz_name: str) -> datetime:
-    zone = _resolve_zone(tz_name)
+    zone = resolve_zone(tz_name)
 
     if dt.tzinfo is None:
         return dt.replace(tzinfo=zone)
@@ -3,13 +3,97 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import os
 from contextlib import asynccontextmanager
-from typing import Iterable, Sequence
+from typing import Callable, Iterable, Sequence
 
 from fastapi import FastAPI
-from sqlalchemy.exc import OperationalError
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.sql.schema import MetaData
 
+from .event_consumer import EventConsumer, cleanup_consumer
+
+logger = logging.getLogger(__name__)
+
+
+def auto_create_schema_enabled() -> bool:
+    """Whether startup should run ``metadata.create_all`` (``AUTO_CREATE_SCHEMA=1``).
+
+    Off by default: deployments get their schema from Alembic, so cold starts skip
+    the per-table existence checks entirely.
+    """
+    return os.getenv("AUTO_CREATE_SCHEMA", "0") == "1"
+
+
+def _probe_and_create_schema(connection: Connection, metadata: MetaData) -> None:
+    connection.execute(text("SELECT 1"))
+    if not auto_create_schema_enabled() or not metadata.sorted_tables:
+        return
+    # Uma única consulta de catálogo: se a primeira tabela já existe, o schema
+    # já foi criado (por aqui ou pelo Alembic) e create_all nem roda
+    if not inspect(connection).has_table(metadata.sorted_tables[0].name):
+        metadata.create_all(bind=connection)
+
+
+def _prepare_sync(engine: Engine, metadata: MetaData) -> None:
+    with engine.begin() as connection:
+        _probe_and_create_schema(connection, metadata)
+
+
+def _ping_sync(engine: Engine) -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def ping_database(engine: Engine | AsyncEngine) -> None:
+    """Run a single ``SELECT 1``; raises if the database does not answer."""
+    if isinstance(engine, AsyncEngine):
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    else:
+        await asyncio.to_thread(_ping_sync, engine)
+
+
+async def prepare_database(
+    engine: Engine | AsyncEngine,
+    metadata: MetaData,
+    *,
+    service_name: str,
+    retries: int = 10,
+    base_delay: float = 0.5,
+    max_delay: float = 5.0,
+) -> None:
+    """Wait until the database answers ``SELECT 1``, with exponential backoff.
+
+    With ``AUTO_CREATE_SCHEMA=1`` the tables are created on first boot only, when
+    they do not exist yet. Works with sync engines (run in a worker thread) and
+    async engines alike.
+    """
+    for attempt in range(retries):
+        try:
+            if isinstance(engine, AsyncEngine):
+                async with engine.begin() as connection:
+                    await connection.run_sync(_probe_and_create_schema, metadata)
+            else:
+                await asyncio.to_thread(_prepare_sync, engine, metadata)
+            return
+        except Exception as exc:
+            if attempt == retries - 1:
+                logger.error("[%s] Database unavailable after %d attempts, giving up.", service_name, retries)
+                raise
+            delay = min(base_delay * 2**attempt, max_delay)
+            logger.warning(
+                "[%s] Database unavailable, retrying in %.1fs (attempt %d): %s",
+                service_name,
+                delay,
+                attempt + 1,
+                exc,
+            )
+            await asyncio.sleep(delay)
+
 
 @asynccontextmanager
 async def database_lifespan(
@@ -22,22 +106,23 @@ async def database_lifespan(
     retries: int = 10,
     wait_seconds: float = 2.0,
 ):
-    """Ensure database tables exist before the service starts handling requests."""
-    for attempt in range(retries):
-        try:
-            if models:
-                _ = tuple(models)
-            metadata.create_all(bind=engine)
-            break
-        except OperationalError as exc:  # pragma: no cover - only triggered when DB is down
-            print(
-                f"[{service_name}] Banco indisponível, aguardando {wait_seconds}s... tentativa {attempt + 1}",
-                exc,
-            )
-            await asyncio.sleep(wait_seconds)
+    """Ensure the database is reachable (and the schema exists) before serving requests."""
+    if models:
+        _ = tuple(models)
+    await prepare_database(
+        engine,
+        metadata,
+        service_name=service_name,
+        retries=retries,
+        base_delay=wait_seconds / 4,
+        max_delay=wait_seconds * 2,
+    )
     yield
 
 
+EventConsumerFactory = Callable[[], Iterable[EventConsumer]]
+
+
 def database_lifespan_factory(
     *,
     service_name: str,
@@ -46,22 +131,62 @@ def database_lifespan_factory(
     models: Iterable[object] | None = None,
     retries: int = 10,
     wait_seconds: float = 2.0,
+    event_consumer_factory: EventConsumerFactory | None = None,
 ):
-    """Return a FastAPI lifespan callable pre-configured for database initialization."""
+    """Return the FastAPI lifespan of a service: database check plus its event consumers.
 
-    models_tuple = tuple(models) if models else None
+    ``event_consumer_factory`` is called once per process at startup and returns the
+    consumers to run (empty when Redis is not configured). They connect to Redis
+    while the database is being checked, start reading once both are ready, run as
+    background tasks and are stopped with ``cleanup_consumer`` on shutdown, so
+    services keep no module-level consumer state. On shutdown the
+    ``app.state.event_publisher``, if any, is closed so buffered events are sent,
+    and so are the ``PooledAsyncClient`` holders listed in ``app.state.http_clients``.
+    """
 
     @asynccontextmanager
     async def _lifespan(app: FastAPI):
-        async with database_lifespan(
-            app,
-            service_name=service_name,
-            metadata=metadata,
-            engine=engine,
-            models=models_tuple,
-            retries=retries,
-            wait_seconds=wait_seconds,
-        ):
+        logger.info("Starting %s...", service_name)
+        consumers = list(event_consumer_factory()) if event_consumer_factory else []
+        # Banco e conexões dos consumers (Redis + consumer group) sobem em paralelo;
+        # o loop de leitura só começa depois que o banco respondeu
+        database_error, *connect_results = await asyncio.gather(
+            prepare_database(
+                engine,
+                metadata,
+                service_name=service_name,
+                retries=retries,
+                base_delay=wait_seconds / 4,
+                max_delay=wait_seconds * 2,
+            ),
+            *(consumer.connect() for consumer in consumers),
+            return_exceptions=True,
+        )
+        connected = []
+        for consumer, result in zip(consumers, connect_results):
+            if isinstance(result, BaseException):
+                logger.error("[%s] Event consumer failed to connect: %s", service_name, result)
+            else:
+                connected.append(consumer)
+        if isinstance(database_error, BaseException):
+            for consumer in connected:
+                await consumer.close()
+            raise database_error
+
+        tasks = [asyncio.create_task(consumer.run()) for consumer in connected]
+        if connected:
+            logger.info("[%s] %d event consumer(s) started", service_name, len(connected))
+        try:
             yield
+        finally:
+            for consumer, task in zip(connected, tasks):
+                await cleanup_consumer(consumer, task, logger)
+            # Eventos ainda no buffer do publisher (enqueue) saem antes de parar
+            close_publisher = getattr(getattr(app.state, "event_publisher", None), "close", None)
+            if close_publisher is not None:
+                await asyncio.to_thread(close_publisher)
+            for http_client in getattr(app.state, "http_clients", ()):
+                await http_client.aclose()
+            logger.info("%s stopped", service_name)
 
     return _lifespan
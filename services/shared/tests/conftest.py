@@ -4,6 +4,8 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 # Setup paths - add the services directory to the path
 SERVICE_DIR = Path(__file__).resolve().parents[1]
 ROOT_DIR = SERVICE_DIR.parent
@@ -15,3 +17,14 @@ if services_path not in sys.path:
 
 # Ensure Redis URL is not set to avoid actual connections
 os.environ["REDIS_URL"] = ""
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # Testes async rodam só no asyncio (o backend do FastAPI), sem repetir no
+    # trio; com uvloop quando disponível (não existe no Windows)
+    try:
+        import uvloop
+    except ImportError:
+        return "asyncio"
+    return ("asyncio", {"loop_factory": uvloop.new_event_loop})
@@ -0,0 +1,36 @@
+"""Tests for the in-process TTL cache."""
+
+from shared.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("shared.cache.time.monotonic", lambda: now)
+    cache = TTLCache(ttl=60)
+
+    cache.set("tenant", {"id": "tenant"})
+    assert cache.get("tenant") == {"id": "tenant"}
+
+    now += 61
+    assert cache.get("tenant") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_invalidate():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+
+    assert cache.get("a") is None
@@ -23,6 +23,18 @@ class TestEventConsumer:
             consumer_name="test-worker-1",
         )
     
+    def test_max_in_flight_below_count_is_rejected(self):
+        """A batch takes one permit per message, so it must fit in max_in_flight."""
+        with pytest.raises(ValueError):
+            EventConsumer(
+                redis_url="redis://localhost:6379",
+                stream_name="test-events",
+                group_name="test-group",
+                consumer_name="test-worker-1",
+                count=64,
+                max_in_flight=32,
+            )
+
     def test_register_handler(self, consumer):
         """Test that handlers can be registered for event types."""
         async def handler(event_type: str, payload: dict[str, Any]) -> None:
@@ -47,7 +59,24 @@ class TestEventConsumer:
         assert len(consumer._handlers) == 2
         assert consumer._handlers["event.type1"] == handler1
         assert consumer._handlers["event.type2"] == handler2
-    
+
+    def test_handlers_passed_to_constructor(self):
+        """Test that handlers can be given up front as a mapping."""
+        async def handler(event_type: str, payload: dict[str, Any]) -> None:
+            pass
+
+        handlers = {"event.type1": handler}
+        consumer = EventConsumer(
+            redis_url="redis://localhost:6379",
+            stream_name="test-events",
+            group_name="test-group",
+            consumer_name="test-worker-1",
+            handlers=handlers,
+        )
+        handlers["event.type2"] = handler
+
+        assert consumer._handlers == {"event.type1": handler}
+
     def test_initial_state(self, consumer):
         """Test the initial state of a newly created consumer."""
         assert consumer._running is False
@@ -195,6 +224,63 @@ class TestProcessMessage:
         consumer._client.xack.assert_not_called()
 
 
+    @pytest.mark.anyio
+    async def test_process_batch_acks_successes_in_one_call(self, consumer_with_mock_redis):
+        """Test that a batch is acknowledged with a single XACK, skipping failed messages."""
+        consumer = consumer_with_mock_redis
+        
+        async def test_handler(event_type: str, payload: dict[str, Any]) -> None:
+            if payload.get("fail"):
+                raise ValueError("Handler failed")
+        
+        consumer.register_handler("test.event", test_handler)
+        
+        messages = [
+            (b"1-0", {b"event_type": b"test.event", b"payload": b'{}'}),
+            (b"2-0", {b"event_type": b"test.event", b"payload": b'{"fail": true}'}),
+            (b"3-0", {b"event_type": b"unknown.event", b"payload": b'{}'}),
+        ]
+        
+        await consumer._process_batch(messages)
+        
+        # Failed message stays pending; the others are acknowledged together
+        consumer._client.xack.assert_called_once_with(
+            "test-events",
+            "test-group",
+            b"1-0",
+            b"3-0",
+        )
+
+
+    @pytest.mark.anyio
+    async def test_dispatch_batch_runs_in_background(self, consumer_with_mock_redis):
+        """Test that dispatching returns while handlers run, within the in-flight window."""
+        consumer = consumer_with_mock_redis
+        consumer._in_flight = asyncio.Semaphore(2)
+        release = asyncio.Event()
+        
+        async def slow_handler(event_type: str, payload: dict[str, Any]) -> None:
+            await release.wait()
+        
+        consumer.register_handler("test.event", slow_handler)
+        
+        messages = [
+            (b"1-0", {b"event_type": b"test.event", b"payload": b'{}'}),
+            (b"2-0", {b"event_type": b"test.event", b"payload": b'{}'}),
+        ]
+        
+        # Returns without waiting for the handlers; window is now full
+        await consumer._dispatch_batch(messages)
+        assert consumer._in_flight.locked()
+        consumer._client.xack.assert_not_called()
+        
+        release.set()
+        await asyncio.gather(*consumer._batch_tasks)
+        
+        consumer._client.xack.assert_called_once_with("test-events", "test-group", b"1-0", b"2-0")
+        assert not consumer._in_flight.locked()
+
+
 class TestCleanupConsumer:
     """Tests for the cleanup_consumer helper function."""
     
@@ -276,3 +362,38 @@ class TestCleanupConsumer:
         
         # Task should be cancelled
         assert task.cancelled() or task.done()
+
+    @pytest.mark.anyio
+    async def test_cleanup_cancel_still_acks_batch_in_progress(self, mock_logger):
+        """Test that cancelling after the grace window does not drop the XACK of the current batch."""
+        consumer = EventConsumer(
+            redis_url="redis://localhost:6379",
+            stream_name="test-events",
+            group_name="test-group",
+            consumer_name="test-worker-1",
+        )
+        client = AsyncMock()
+        client.xpending_range.return_value = []
+        reads = 0
+        
+        async def xreadgroup(**kwargs):
+            nonlocal reads
+            reads += 1
+            if reads == 1:
+                return [(b"test-events", [(b"1-0", {b"event_type": b"test.event", b"payload": b'{}'})])]
+            await asyncio.sleep(100)
+        
+        client.xreadgroup.side_effect = xreadgroup
+        
+        async def slow_handler(event_type: str, payload: dict[str, Any]) -> None:
+            await asyncio.sleep(0.2)
+        
+        consumer.register_handler("test.event", slow_handler)
+        
+        with patch("shared.event_consumer.aioredis.Redis.from_url", return_value=client):
+            task = asyncio.create_task(consumer.start())
+            await asyncio.sleep(0.01)
+            await cleanup_consumer(consumer, task, mock_logger, timeout=0.05)
+        
+        client.xack.assert_called_once_with("test-events", "test-group", b"1-0")
+        assert task.done()
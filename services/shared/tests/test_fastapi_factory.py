@@ -0,0 +1,54 @@
+"""Tests for the shared FastAPI app factory."""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.pool import StaticPool
+
+from shared import create_service_app, database_pool_options
+from shared.config import DatabaseConfig, RedisConfig, ServiceConfig
+
+
+def _app(engine):
+    return create_service_app(
+        service="test",
+        title="Test Service",
+        description="",
+        config=ServiceConfig(
+            name="test",
+            host="0.0.0.0",
+            port=8000,
+            database=DatabaseConfig(url=str(engine.url)),
+            redis=RedisConfig(url="", stream="test-events"),
+        ),
+        metadata=MetaData(),
+        engine=engine,
+    )
+
+
+def test_database_health_reports_pool():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+    resp = TestClient(_app(engine)).get("/healthz/db")
+
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "ok"
+    assert "pool" in resp.json()
+
+
+def test_database_health_unavailable():
+    engine = create_engine("sqlite:////nonexistent/dir/db.sqlite")
+
+    resp = TestClient(_app(engine)).get("/healthz/db")
+
+    assert resp.status_code == 503
+    assert resp.json()["status"] == "unavailable"
+
+
+def test_pool_pre_ping_can_be_disabled(monkeypatch):
+    assert database_pool_options("sqlite://") == {"pool_pre_ping": True}
+
+    monkeypatch.setenv("DB_POOL_PRE_PING", "0")
+    options = database_pool_options("postgresql://db/app")
+
+    assert options["pool_pre_ping"] is False
+    assert options["pool_size"] > 0
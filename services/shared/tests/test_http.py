@@ -0,0 +1,41 @@
+"""Tests for the pooled HTTP client holder."""
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.pool import StaticPool
+
+from shared import PooledAsyncClient
+from shared.startup import database_lifespan_factory
+
+
+@pytest.mark.anyio
+async def test_pooled_client_is_reused_and_reopened_after_close():
+    holder = PooledAsyncClient(timeout=1.0)
+
+    client = holder.get()
+    assert holder.get() is client
+
+    await holder.aclose()
+    assert client.is_closed
+
+    reopened = holder.get()
+    assert reopened is not client
+    assert not reopened.is_closed
+    await holder.aclose()
+
+
+@pytest.mark.anyio
+async def test_lifespan_closes_registered_http_clients():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    lifespan = database_lifespan_factory(service_name="test", metadata=MetaData(), engine=engine)
+    holder = PooledAsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(204)))
+    app = FastAPI()
+    app.state.http_clients = [holder]
+
+    async with lifespan(app):
+        client = holder.get()
+        assert (await client.get("http://tenant/tenants/1")).status_code == 204
+
+    assert client.is_closed
@@ -0,0 +1,39 @@
+"""Tests for the buffered path of EventPublisher."""
+
+import time
+from unittest.mock import MagicMock
+
+from shared import EventPublisher
+
+
+def _publisher(flush_interval=0.005):
+    publisher = EventPublisher("redis://localhost:6379/0", "test-events", flush_interval=flush_interval)
+    publisher._client = MagicMock()
+    return publisher
+
+
+def test_enqueue_coalesces_events_into_one_pipeline():
+    publisher = _publisher(flush_interval=0.05)
+
+    for index in range(3):
+        publisher.enqueue("resource.deleted", {"resource_id": str(index)})
+    deadline = time.monotonic() + 2
+    while publisher._client.pipeline.return_value.execute.call_count == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    pipe = publisher._client.pipeline.return_value
+    assert pipe.execute.call_count == 1
+    assert pipe.xadd.call_count == 3
+    publisher._client.xadd.assert_not_called()
+    publisher.close()
+
+
+def test_close_sends_buffered_events_and_later_ones_go_direct():
+    publisher = _publisher(flush_interval=60)
+
+    publisher.enqueue("resource.deleted", {"resource_id": "1"})
+    publisher.close()
+
+    assert publisher._client.pipeline.return_value.xadd.call_count == 1
+    publisher.enqueue("resource.deleted", {"resource_id": "2"})
+    publisher._client.xadd.assert_called_once()
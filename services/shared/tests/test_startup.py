@@ -0,0 +1,83 @@
+"""Tests for the database startup helpers."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, inspect
+from sqlalchemy.pool import StaticPool
+
+from shared.startup import database_lifespan_factory, prepare_database
+
+
+def _engine_and_metadata():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    metadata = MetaData()
+    Table("items", metadata, Column("id", Integer, primary_key=True))
+    return engine, metadata
+
+
+@pytest.mark.anyio
+async def test_prepare_database_creates_missing_schema(monkeypatch):
+    monkeypatch.setenv("AUTO_CREATE_SCHEMA", "1")
+    engine, metadata = _engine_and_metadata()
+
+    await prepare_database(engine, metadata, service_name="test")
+
+    assert inspect(engine).has_table("items")
+
+
+@pytest.mark.anyio
+async def test_prepare_database_only_probes_without_auto_create(monkeypatch):
+    monkeypatch.delenv("AUTO_CREATE_SCHEMA", raising=False)
+    engine, metadata = _engine_and_metadata()
+
+    await prepare_database(engine, metadata, service_name="test")
+
+    assert not inspect(engine).has_table("items")
+
+
+@pytest.mark.anyio
+async def test_prepare_database_gives_up_after_retries():
+    engine = create_engine("sqlite:////nonexistent/dir/db.sqlite")
+
+    with pytest.raises(Exception):
+        await prepare_database(engine, MetaData(), service_name="test", retries=2, base_delay=0)
+
+
+@pytest.mark.anyio
+async def test_lifespan_factory_starts_and_stops_consumers():
+    engine, metadata = _engine_and_metadata()
+    consumer = AsyncMock()
+    lifespan = database_lifespan_factory(
+        service_name="test",
+        metadata=metadata,
+        engine=engine,
+        event_consumer_factory=lambda: [consumer],
+    )
+
+    async with lifespan(FastAPI()):
+        await asyncio.sleep(0)
+        consumer.connect.assert_awaited_once()
+        consumer.run.assert_awaited_once()
+
+    consumer.stop.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_lifespan_factory_skips_consumer_that_fails_to_connect():
+    engine, metadata = _engine_and_metadata()
+    consumer = AsyncMock()
+    consumer.connect.side_effect = ConnectionError("redis down")
+    lifespan = database_lifespan_factory(
+        service_name="test",
+        metadata=metadata,
+        engine=engine,
+        event_consumer_factory=lambda: [consumer],
+    )
+
+    async with lifespan(FastAPI()):
+        await asyncio.sleep(0)
+
+    consumer.run.assert_not_called()
@@ -1,14 +1,14 @@
 # app/core/database.py
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from shared import load_service_config
+from shared import database_pool_options, load_service_config
 
 _config = load_service_config("tenant")
 
 engine = create_engine(
     _config.database.url,
     future=True,
-    pool_pre_ping=True,
+    **database_pool_options(_config.database.url),
 )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
@@ -1,16 +1,10 @@
 # app/main.py
 import logging
-import os
-from html import escape
 
-from fastapi import FastAPI
-from fastapi.openapi.utils import get_openapi
-from fastapi.responses import HTMLResponse
-from fastapi.middleware.cors import CORSMiddleware
 from app.core.database import Base, engine
 from app.models import tenant as tenant_models
 from app.routers import endpoints as tenants
-from shared import database_lifespan_factory, load_service_config, EventPublisher, get_cors_origins
+from shared import create_service_app, load_service_config, EventPublisher
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +16,6 @@ tags_metadata = [
 ]
 
 _CONFIG = load_service_config("tenant")
-_ROOT_PATH = os.getenv("APP_ROOT_PATH") or ""
 
 # Event Publisher for tenant.deleted events (only if Redis is configured)
 _EVENT_PUBLISHER = (
@@ -31,94 +24,18 @@ _EVENT_PUBLISHER = (
     else None
 )
 
-IS_TEST = os.getenv("PYTEST_CURRENT_TEST") is not None
-
-lifespan = database_lifespan_factory(
-    service_name="Tenant Service",
+app = create_service_app(
+    service="tenant",
+    title="Tenant Service",
+    description="API responsável pela administração de tenants.",
+    config=_CONFIG,
     metadata=Base.metadata,
     engine=engine,
+    tags_metadata=tags_metadata,
     models=(tenant_models.Tenant, tenant_models.OrganizationSettings),
 )
 
-app = FastAPI(
-    title="Tenant Service",
-    version="0.1.0",
-    description="API responsável pela administração de tenants.",
-    openapi_tags=tags_metadata,
-    root_path=_ROOT_PATH,
-    lifespan=lifespan,
-    docs_url=None,
-    redoc_url="/redoc",
-)
-
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=get_cors_origins(),
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.state.config = _CONFIG
 app.state.event_publisher = _EVENT_PUBLISHER
 
-
-def custom_openapi_schema():
-    if app.openapi_schema:
-        return app.openapi_schema
-    schema = get_openapi(
-        title=app.title,
-        version=app.version,
-        description=app.description,
-        routes=app.routes,
-    )
-    schema["openapi"] = "3.0.3"
-    app.openapi_schema = schema
-    return app.openapi_schema
-
-
-app.openapi = custom_openapi_schema
-
-# Custom Swagger UI with correct openapi.json path
-@app.get("/docs", include_in_schema=False)
-async def custom_swagger_ui_html():
-    return HTMLResponse(f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <link type="text/css" rel="stylesheet" href="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui.css">
-        <title>{escape(app.title)} - Swagger UI</title>
-    </head>
-    <body>
-        <div id="swagger-ui"></div>
-        <script src="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5/swagger-ui-bundle.js"></script>
-        <script>
-        const ui = SwaggerUIBundle({{
-            url: window.location.pathname.replace(/\/docs$/, '') + '/openapi.json',
-            dom_id: '#swagger-ui',
-            presets: [
-                SwaggerUIBundle.presets.apis,
-                SwaggerUIBundle.SwaggerUIStandalonePreset
-            ],
-            layout: "BaseLayout",
-            deepLinking: true
-        }})
-        </script>
-    </body>
-    </html>
-    """)
-
 # add as rotas definidas em endpoints.py aqui, pq aí as urls funcionam
 app.include_router(tenants.router, prefix="/tenants")
-
-@app.get("/")
-def root():
-    return {
-        "service": "tenant",
-        "status": "ok",
-        "docs_url": "/docs",
-        "config": {
-            "redis_stream": _CONFIG.redis.stream,
-        },
-    }
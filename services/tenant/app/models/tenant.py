@@ -1,16 +1,16 @@
 # app/models/tenant.py
-import uuid
 from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Integer, Time, JSON
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from shared import uuid7
 
 
 class Tenant(Base):
     __tablename__ = "tenants"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     name = Column(String, nullable=False)
     domain = Column(String, unique=True, nullable=False, index=True)
     logo_url = Column(String, nullable=False)
@@ -26,7 +26,7 @@ class Tenant(Base):
 class OrganizationSettings(Base):
     __tablename__ = "organization_settings"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), unique=True, nullable=False)
     business_type = Column(String, nullable=False)
     timezone = Column(String, nullable=False, default="UTC")
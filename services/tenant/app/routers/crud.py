@@ -39,11 +39,7 @@ def listar_tenants(db: Session):
     return db.query(Tenant).all()
 
 def buscar_tenant(db: Session, tenant_id: UUID):
-    return (
-        db.query(Tenant)
-        .filter(Tenant.id == tenant_id)
-        .first()
-    )
+    return db.get(Tenant, tenant_id)
 
 def atualizar_tenant(db: Session, tenant_id: UUID, tenant_update: TenantUpdate):
     tenant = buscar_tenant(db, tenant_id)
@@ -1,13 +1,13 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
-from shared import load_service_config
+from shared import database_pool_options, load_service_config
 
 _config = load_service_config("user")
 
 engine = create_engine(
     _config.database.url,
     future=True,
-    pool_pre_ping=True,
+    **database_pool_options(_config.database.url),
 )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 Base = declarative_base()
@@ -1,8 +1,8 @@
-import uuid
 from sqlalchemy import Boolean, Column, DateTime, String, UniqueConstraint, JSON
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
+from shared import uuid7
 
 
 def default_permissions():
@@ -20,7 +20,7 @@ class User(Base):
         UniqueConstraint("tenant_id", "email", name="uq_users_tenant_email"),
     )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     tenant_id = Column(UUID(as_uuid=True), nullable=False, index=True)
     name = Column(String, nullable=False)
     email = Column(String, nullable=False)
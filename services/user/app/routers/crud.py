@@ -58,7 +58,8 @@ def list_users(
 
 
 def get_user(db: Session, user_id: UUID) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+    # identity map primeiro: a rota já buscou o usuário e update/delete buscam de novo
+    return db.get(User, user_id)
 
 
 def update_user(db: Session, user_id: UUID, payload: UserUpdate) -> Optional[User]:
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, F
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.schemas.user_schema import UserCreate, UserOut, UserUpdate
+from app.schemas.user_schema import TokenOut, UserCreate, UserOut, UserUpdate
 from app.services.tenant_validator import validar_tenant_existe
 from app.core.auth_dependencies import get_current_user
 from . import crud, validators
@@ -13,7 +13,7 @@ from app.core.security import criar_token_jwt, verify_password
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-@router.post("/login")
+@router.post("/login", response_model=TokenOut)
 def login(
     email: str = Form(...),
     password: str = Form(...),
@@ -26,7 +26,7 @@ def login(
 
     token = criar_token_jwt(user_id=user.id, tenant_id=user.tenant_id, user_type=user.user_type,)
 
-    return {"access_token": token, "token_type": "bearer"}
+    return TokenOut(access_token=token)
 
 
 @router.get("/me", response_model=UserOut)
@@ -138,26 +138,24 @@ def update_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    # Usuário alvo da atualização
-    user = crud.get_user(db, user_id)
+    # User comum só pode atualizar ele mesmo: decidido pelo token, sem ir ao banco
+    if current_user.user_type != "admin" and user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você só pode atualizar os dados do seu próprio usuário."
+        )
+
+    # Usuário alvo da atualização (o próprio já veio carregado pela autenticação)
+    user = current_user if user_id == current_user.id else crud.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
-    if current_user.user_type != "admin":
-        # User comum só pode atualizar ele mesmo
-        if user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Você só pode atualizar os dados do seu próprio usuário."
-            )
-        tenant_para_validacao = current_user.tenant_id
-    else:
-        if user.tenant_id != current_user.tenant_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Você não tem permissão para atualizar usuários de outro tenant."
-            )
-        tenant_para_validacao = user.tenant_id
+    if user.tenant_id != current_user.tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para atualizar usuários de outro tenant."
+        )
+    tenant_para_validacao = user.tenant_id
 
     if payload.email:
         validators.ensure_unique_email(
@@ -184,24 +182,23 @@ def delete_user(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    user = crud.get_user(db, user_id)
+    # user comum só pode deletar a si mesmo: decidido pelo token, sem ir ao banco
+    if current_user.user_type != "admin" and user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você só pode deletar o seu próprio usuário."
+        )
+
+    user = current_user if user_id == current_user.id else crud.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
-    if current_user.user_type != "admin":
-        # user comum só pode deletar a si mesmo
-        if user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Você só pode deletar o seu próprio usuário."
-            )
-    else:
-        # admin só pode deletar usuários do mesmo tenant
-        if user.tenant_id != current_user.tenant_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Você não tem permissão para deletar usuários de outro tenant."
-            )
+    # admin só pode deletar usuários do mesmo tenant
+    if user.tenant_id != current_user.tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem permissão para deletar usuários de outro tenant."
+        )
 
     # Pass the event publisher from app state for cascading deletes
     publisher = getattr(request.app.state, "event_publisher", None)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_serializer, model_validator
 
@@ -23,7 +23,7 @@ class UserBase(BaseModel):
     name: str = Field(..., examples=["João Silva"])
     email: EmailStr = Field(..., examples=["joao.silva@exemplo.com"])
     phone: Optional[str] = Field(default=None, examples=["11987654321"])
-    user_type: str = Field(..., pattern="^(admin|user)$", examples=["user"])
+    user_type: Literal["admin", "user"] = Field(..., examples=["user"])
     department: Optional[str] = Field(default=None, examples=["Recursos Humanos"])
     is_active: bool = Field(default=True, examples=[True])
     permissions: Permissions = Field(default_factory=Permissions)
@@ -51,7 +51,7 @@ class UserUpdate(BaseModel):
     name: Optional[str] = None
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
-    user_type: Optional[str] = Field(default=None, pattern="^(admin|user)$")
+    user_type: Optional[Literal["admin", "user"]] = None
     department: Optional[str] = None
     is_active: Optional[bool] = None
     permissions: Optional[Permissions] = None
@@ -72,3 +72,8 @@ class UserOut(UserBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class TokenOut(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
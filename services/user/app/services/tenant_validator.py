@@ -1,5 +1,10 @@
 import httpx
 from fastapi import HTTPException
+from shared import PooledAsyncClient
+
+# Conexões keep-alive com o Tenant Service reaproveitadas entre as validações
+TENANT_CLIENT = PooledAsyncClient(timeout=3.0, limits=httpx.Limits(max_keepalive_connections=10))
+
 
 async def validar_tenant_existe(tenant_service_url: str, tenant_id: str):
     """
@@ -12,14 +17,13 @@ async def validar_tenant_existe(tenant_service_url: str, tenant_id: str):
 
     url = f"{tenant_service_url.rstrip('/')}/tenants/{tenant_id}"
 
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.get(url)
-        except httpx.RequestError:
-            raise HTTPException(
-                status_code=500,
-                detail="Erro ao comunicar com o Tenant Service"
-            )
+    try:
+        resp = await TENANT_CLIENT.get().get(url)
+    except httpx.RequestError:
+        raise HTTPException(
+            status_code=500,
+            detail="Erro ao comunicar com o Tenant Service"
+        )
 
     if resp.status_code == 404:
         raise HTTPException(404, "Tenant não encontrado")
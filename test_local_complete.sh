@@ -304,7 +304,7 @@ response=$(curl -s -w "\n%{http_code}" "$RESOURCE_URL/?tenant_id=$TENANT_ID" \
     -H "Authorization: Bearer $ADMIN_TOKEN")
 http_code=$(echo "$response" | tail -n1)
 body=$(echo "$response" | sed '$d')
-count=$(echo "$body" | jq -r 'length')
+count=$(echo "$body" | jq -r '.items | length')
 echo -e "${GREEN}✓ $http_code${NC} - $count recursos"
 
 echo "➤ Listar Usuários do Tenant (requer admin)"